@@ -4,10 +4,56 @@ from pathlib import Path
 class Settings(BaseSettings):
     runtime_dir: Path = Path(__file__).parents[2] / "runtime"
     originals_dir: Path = Path(__file__).parents[2] / "scripts" / "originals"
-    copies_dir: Path = runtime_dir / "copies"
     outputs_dir: Path = runtime_dir / "outputs"
+    jobs_db_path: Path = runtime_dir / "jobs.sqlite3"
     headless: bool = False
+    # Lean browsing for job browsers: eager page loads, these resource types
+    # blocked, and background Chrome features switched off.
+    lean_browser: bool = True
+    lean_block_resources: list[str] = ["image", "font", "stylesheet"]
+    # Pre-launched Chrome browsers lent to jobs (0 disables the pool)
+    browser_pool_size: int = 2
+    browser_max_jobs: int = 50
+    browser_health_interval_seconds: float = 30.0
+    browser_launch_timeout_seconds: float = 20.0
+    chrome_binary: str | None = None
+    # chromedriver is resolved once at startup; set this to pin a binary.
+    chromedriver_path: str | None = None
+    # Download a matching chromedriver via webdriver_manager if none is found.
+    chromedriver_auto_install: bool = True
     script_timeout_seconds: int = 300
+    # Job output is streamed into the log: flush at least this often, and hold
+    # back at most this much of an unfinished line.
+    log_flush_seconds: float = 0.5
+    log_buffer_bytes: int = 64 * 1024
+    # Largest slice of a log returned by one GET /tasks/{job_id}/log
+    log_max_read_bytes: int = 1024 * 1024
+    stream_keepalive_seconds: float = 15.0
+    # How often /metrics samples event-loop lag (0 turns the sampler off)
+    loop_lag_interval_seconds: float = 0.5
+    worker_count: int = 4
+    # Upper bound on the `parallelism` a job may ask for (browsers per job)
+    max_parallelism: int = 8
+    queue_max_size: int = 200
+    # Retry-After sent with the 503 that a submission gets while the queue is full
+    queue_full_retry_after_seconds: int = 30
+    # A submission identical to a queued/running job, or to one that finished
+    # successfully this recently, attaches to it instead of running again (0: only
+    # in-flight jobs). Idempotency keys are remembered for idempotency_key_ttl_seconds.
+    coalesce_window_seconds: float = 300.0
+    idempotency_key_ttl_seconds: float = 24 * 3600.0
+    # Warm workers: long-lived preloaders that import these once and fork per job.
+    warm_workers: bool = True
+    warm_worker_max_jobs: int = 50
+    preload_modules: list[str] = [
+        "selenium.webdriver",
+        "selenium.webdriver.chrome.service",
+        "selenium.webdriver.support.ui",
+        "selenium.webdriver.support.expected_conditions",
+        "webdriver_manager.chrome",
+        "flask",
+        "fastapi",
+    ]
 
     class Config:
         env_file = ".env"
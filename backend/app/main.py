@@ -1,8 +1,10 @@
 # backend/app/main.py
 
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.concurrency import run_in_threadpool
 from pathlib import Path
 import traceback
 import logging
@@ -10,13 +12,34 @@ import json
 from uuid import uuid4
 import json
 from pathlib import Path
-from app.services.runner import create_job_and_run
+from contextlib import asynccontextmanager
+from datetime import datetime
+import asyncio
+import time
+from app.services.runner import (submit_job, resume_job, job_journal, start_workers, stop_workers, get_job_status,
+                                 watch_job, unwatch_job, queue_stats, QueueFull)
+from app.services import logs, job_store, journal, chromedriver, timings, metrics
+from app.services.browser_pool import pool as browser_pool
 from app.core.settings import settings
 
+# -------------------------------------------------
+# Lifespan: background job workers
+# -------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(chromedriver.resolve)
+    await start_workers()
+    await browser_pool.start()
+    metrics.start()
+    yield
+    await metrics.stop()
+    await stop_workers()
+    await browser_pool.stop()
+
 # -------------------------------------------------
 # Create app and enable CORS
 # -------------------------------------------------
-app = FastAPI(title="Config Ops Hub Backend")
+app = FastAPI(title="Config Ops Hub Backend", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,7 +47,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],   # GET, POST, OPTIONS, etc.
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # -------------------------------------------------
 # Logger setup
@@ -39,10 +64,60 @@ logging.basicConfig(level=logging.INFO)
 async def root():
     return {"message": "Backend is running."}
 
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition: jobs, queue, durations, items, browser pool, logins, loop lag."""
+    job_counts = await asyncio.to_thread(job_store.count_by_task_status)
+    queue = queue_stats()
+    body = metrics.render(job_counts, queue["depth"], queue["capacity"], queue["workers"], browser_pool.stats())
+    return Response(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # -------------------------------------------------
 # TASK ENDPOINTS
 # -------------------------------------------------
 
+def _parallelism(body: dict) -> int:
+    """Optional `parallelism` (browser workers for the job's items); defaults to 1."""
+    value = body.get("parallelism", 1)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError("'parallelism' must be a positive integer")
+    return value
+
+
+def _idempotency_key(request: Request, body: dict):
+    """Optional client key from the Idempotency-Key header or an `idempotency_key` field."""
+    key = request.headers.get("Idempotency-Key") or body.get("idempotency_key")
+    if key is None:
+        return None
+    if not isinstance(key, str) or not key.strip() or len(key) > 200:
+        raise ValueError("'idempotency_key' must be a non-empty string of at most 200 characters")
+    return key.strip()
+
+
+def _queue_full(e: QueueFull) -> JSONResponse:
+    return JSONResponse({"detail": str(e)}, status_code=503,
+                        headers={"Retry-After": str(settings.queue_full_retry_after_seconds)})
+
+
+async def _submit(request: Request, body: dict, script_key: str, injects: dict, parallelism: int = 1):
+    """Queue the job, or attach to the one this submission duplicates.
+
+    `"coalesce": false` in the body runs the inputs again even if an identical
+    job is in flight or just finished; an idempotency key is honoured either way.
+    A full queue answers 503 with Retry-After.
+    """
+    coalesce = body.get("coalesce", True)
+    if not isinstance(coalesce, bool):
+        raise ValueError("'coalesce' must be a boolean")
+    try:
+        job_id, out_path, status, coalesced = await submit_job(
+            script_key, injects, parallelism, idempotency_key=_idempotency_key(request, body), coalesce=coalesce)
+    except QueueFull as e:
+        return _queue_full(e)
+    return JSONResponse({"job_id": job_id, "status": status, "coalesced": coalesced})
+
+
 @app.post("/tasks/ppt-to-video")
 async def ppt_to_video(request: Request):
     """Convert PPT to video."""
@@ -54,8 +129,7 @@ async def ppt_to_video(request: Request):
 
         injects = {"uuid_list": uuids}
         script_key = "ppt_to_video_updater.py"
-        job_id, out_path, status = create_job_and_run(script_key, injects)
-        return JSONResponse({"job_id": job_id, "status": status})
+        return await _submit(request, body, script_key, injects, _parallelism(body))
     except Exception as e:
         tb = traceback.format_exc()
         logger.error("ppt-to-video failed: %s", tb)
@@ -73,8 +147,7 @@ async def sheet_loading(request: Request):
 
         injects = {"GOOGLE_SHEET_URL": url}
         script_key = "sheet_loading.py"
-        job_id, out_path, status = create_job_and_run(script_key, injects)
-        return JSONResponse({"job_id": job_id, "status": status})
+        return await _submit(request, body, script_key, injects)
     except Exception as e:
         tb = traceback.format_exc()
         logger.error("sheet-loading failed: %s", tb)
@@ -92,8 +165,7 @@ async def s3_updater(request: Request):
 
         injects = {"multimedia_data": pairs}
         script_key = "s3_url_updater.py"
-        job_id, out_path, status = create_job_and_run(script_key, injects)
-        return JSONResponse({"job_id": job_id, "status": status})
+        return await _submit(request, body, script_key, injects, _parallelism(body))
     except Exception as e:
         tb = traceback.format_exc()
         logger.error("s3-updater failed: %s", tb)
@@ -105,14 +177,21 @@ async def Getting_QuestionIDs_using_tag_names(request: Request):
     """Getting Question IDs for Tag Names."""
     try:
         body = await request.json()
-        pairs = body.get("pairs") or []
-        if not isinstance(pairs, list):
-            raise ValueError("'pairs' must be an array")
+        tags = body.get("tags") or body.get("pairs") or []
+        if not isinstance(tags, list):
+            raise ValueError("'tags' must be an array")
 
-        injects = {"multimedia_data": pairs}
+        injects = {"tags": [str(t) for t in tags]}
+        # Tag lookups are cached per admin; these let a caller bypass or bound the cache.
+        if "force_refresh" in body:
+            injects["force_refresh"] = bool(body["force_refresh"])
+        if "cache_ttl_seconds" in body:
+            ttl = body["cache_ttl_seconds"]
+            if isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl < 0:
+                raise ValueError("'cache_ttl_seconds' must be a non-negative number")
+            injects["cache_ttl_seconds"] = ttl
         script_key = "getting_question_ids_for_tags.py"
-        job_id, out_path, status = create_job_and_run(script_key, injects)
-        return JSONResponse({"job_id": job_id, "status": status})
+        return await _submit(request, body, script_key, injects)
     except Exception as e:
         tb = traceback.format_exc()
         logger.error("get-question-ids-by-tags failed: %s", tb)
@@ -135,8 +214,7 @@ async def duration_remover(request: Request):
         # 1) Write injects JSON to a file the job can read (same outputs dir used for logs).
         injects = {"uuid_list": uuids}
         script_key = "duration_remover.py"
-        job_id, out_path, status = create_job_and_run(script_key, injects)
-        return JSONResponse({"job_id": job_id, "status": status})
+        return await _submit(request, body, script_key, injects, _parallelism(body))
     except Exception as e:
         tb = traceback.format_exc()
         logger.error("duration-remover failed: %s", tb)
@@ -157,8 +235,7 @@ async def unlock_resources(request: Request):
 
         injects = {"uuid_list": uuids}
         script_key = "unlock_resources_for_users.py"
-        job_id, out_path, status = create_job_and_run(script_key, injects)
-        return JSONResponse({"job_id": job_id, "status": status})
+        return await _submit(request, body, script_key, injects)
     except Exception as e:
         tb = traceback.format_exc()
         logger.error("unlock-resources failed: %s", tb)
@@ -184,27 +261,187 @@ async def oldppt_to_newppt(request: Request):
 
         injects = {"pairs": pairs}
         script_key = "oldppt_to_newppt.py"
-        job_id, out_path, status = create_job_and_run(script_key, injects)
-        return JSONResponse({"job_id": job_id, "status": status})
+        return await _submit(request, body, script_key, injects)
     except Exception as e:
         tb = traceback.format_exc()
         logger.error("oldppt-to-newppt failed: %s", tb)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# -------------------------------------------------
+# Job registry
+# -------------------------------------------------
+def _parse_since(value: str):
+    """Epoch seconds or an ISO-8601 timestamp."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+@app.get("/tasks")
+async def list_tasks(status: str | None = None, since: str | None = None, limit: int = 50, offset: int = 0):
+    """List jobs newest first, optionally filtered by status and creation time."""
+    try:
+        since_ts = _parse_since(since) if since else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="'since' must be epoch seconds or an ISO-8601 timestamp")
+    limit = max(1, min(limit, 500))
+    offset = max(0, offset)
+    jobs = await asyncio.to_thread(job_store.list_jobs, status=status, since=since_ts, limit=limit, offset=offset)
+    return {"jobs": jobs, "next_offset": offset + limit if len(jobs) == limit else None}
+
+
+@app.get("/tasks/{job_id}")
+async def get_task(job_id: str):
+    """Return the registry record for a job."""
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job_id")
+    return job
+
+
+@app.get("/tasks/{job_id}/timings")
+async def get_task_timings(job_id: str):
+    """Per-phase timings (p50/p95/max) and items/sec of a job, so far if it is still running."""
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job_id")
+    started = job["started_at"]
+    wall = ((job["finished_at"] or time.time()) - started) if started else 0.0
+    return await asyncio.to_thread(timings.job_summary, job_id, wall)
+
+
+@app.get("/tasks/{job_id}/journal")
+async def get_task_journal(job_id: str, items: bool = False):
+    """Checkpoint journal of a job: how many of its items are done, failed or not run yet.
+
+    ?items=true also lists the entries in each group.
+    """
+    if await asyncio.to_thread(job_store.get, job_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown job_id")
+    split = await asyncio.to_thread(job_journal, job_id)
+    if split is None:
+        raise HTTPException(status_code=404, detail="Job has no item list")
+    result = journal.summary(split)
+    if items:
+        result["items"] = split
+    return result
+
+
+@app.post("/tasks/{job_id}/resume")
+async def resume_task(job_id: str, request: Request):
+    """Queue a new job with the items this one left unfinished (pending, and failed unless
+    `"retry_failed": false`). Takes the same `parallelism` / idempotency options as a submission.
+    """
+    try:
+        body = await request.json() if await request.body() else {}
+        retry_failed = body.get("retry_failed", True)
+        if not isinstance(retry_failed, bool):
+            raise ValueError("'retry_failed' must be a boolean")
+        new_id, out_path, status, coalesced = await resume_job(
+            job_id, retry_failed, _parallelism(body), idempotency_key=_idempotency_key(request, body))
+    except QueueFull as e:
+        return _queue_full(e)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse({"job_id": new_id, "status": status, "coalesced": coalesced, "resumed_from": job_id})
+
+
 # -------------------------------------------------
 # Logs
 # -------------------------------------------------
 @app.get("/tasks/{job_id}/log")
-async def get_job_log(job_id: str):
-    """Return the job log for a given job ID."""
+async def get_job_log(job_id: str, request: Request, since: int | None = None, tail: int | None = None):
+    """Return the job log for a given job ID.
+
+    ?since=<offset> returns only what was written after that byte offset and
+    ?tail=N the last N lines; either way the response carries the offset to
+    pass as `since` on the next poll. Unchanged logs answer 304 to If-None-Match.
+    """
     try:
-        log_path = Path(settings.outputs_dir) / f"{job_id}.log"
-        if not log_path.exists():
+        log_path = logs.log_path(job_id)
+        try:
+            st = log_path.stat()
+        except FileNotFoundError:
             raise HTTPException(status_code=404, detail="Log file not found")
-        text = log_path.read_text(encoding="utf-8", errors="replace")
-        return {"log": text}
+
+        # The status is part of the body, so it is part of the validator too: a job can
+        # finish without its log changing again.
+        status = await asyncio.to_thread(get_job_status, job_id)
+        max_bytes = settings.log_max_read_bytes
+        window = f"t{max(tail, 0)}" if tail is not None else f"s{max(since or 0, 0)}"
+        etag = logs.log_etag(st, f"{window}-{max_bytes:x}-{status}")
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+
+        if tail is not None:
+            body = await run_in_threadpool(logs.read_tail, log_path, max(tail, 0), max_bytes)
+        else:
+            body = await run_in_threadpool(logs.read_since, log_path, since or 0, max_bytes)
+        body["status"] = status
+        return JSONResponse(body, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    except HTTPException:
+        raise
     except Exception as e:
         tb = traceback.format_exc()
         logger.error("Error reading log for %s: %s", job_id, tb)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# -------------------------------------------------
+# Live log stream (Server-Sent Events)
+# -------------------------------------------------
+def _sse(event: str, data: dict, event_id=None) -> str:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.get("/tasks/{job_id}/stream")
+async def stream_job_log(job_id: str, request: Request, since: int | None = None):
+    """Push log output and status changes for a job as they happen.
+
+    Events: `log` ({log, offset}), `status` ({status}) and a final `end`.
+    Reconnecting EventSources resume from Last-Event-ID (the log offset).
+    """
+    log_path = logs.log_path(job_id)
+    if not log_path.exists():
+        raise HTTPException(status_code=404, detail="Log file not found")
+    last_id = request.headers.get("last-event-id")
+    offset = int(last_id) if last_id and last_id.isdigit() else (since or 0)
+
+    async def events():
+        nonlocal offset
+        changed = watch_job(job_id)
+        sent_status = None
+        try:
+            while True:
+                changed.clear()
+                status = await asyncio.to_thread(get_job_status, job_id)
+                while True:
+                    chunk = await run_in_threadpool(logs.read_since, log_path, offset, settings.log_max_read_bytes)
+                    if chunk["offset"] > offset:
+                        offset = chunk["offset"]
+                        yield _sse("log", {"log": chunk["log"], "offset": offset}, offset)
+                    if not chunk["more"]:
+                        break
+                if status != sent_status:
+                    sent_status = status
+                    yield _sse("status", {"status": status})
+                if status not in ("queued", "running"):
+                    # Finished, or unknown to this backend (e.g. started before a restart)
+                    yield _sse("end", {"status": status, "offset": offset})
+                    return
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=settings.stream_keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            unwatch_job(job_id, changed)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
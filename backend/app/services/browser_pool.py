@@ -0,0 +1,233 @@
+# backend/app/services/browser_pool.py
+"""
+Pool of pre-launched Chrome browsers owned by the backend.
+
+Each pooled browser is a Chrome process started with remote debugging on its
+own profile directory. A job leases one and gets its DevTools address in
+OPSHUB_DEBUGGER_ADDRESS; the script's chromedriver then attaches to the running
+browser (toolkit.browser.make_chrome) instead of launching a new one, which
+saves the several seconds of Chrome startup per job. quit() on an attached
+session leaves the browser running; on release the pool closes the job's tabs
+and hands the browser to the next job.
+
+Idle browsers are health-checked in the background and relaunched when they
+stop answering, and every browser is recycled after browser_max_jobs leases.
+"""
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import shutil
+import sys
+import urllib.request
+
+from ..core.settings import settings
+
+logger = logging.getLogger("config_ops_hub.browser_pool")
+
+_CHROME_NAMES = ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome")
+_CHROME_WINDOWS = (
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+)
+
+
+def _lean_args() -> list:
+    """Launch flags for settings.lean_browser, shared with the scripts (toolkit/chrome_flags.py).
+
+    Fonts and stylesheets are blocked per page by toolkit.browser over CDP.
+    """
+    spec = importlib.util.spec_from_file_location(
+        "opshub_chrome_flags", settings.originals_dir / "toolkit" / "chrome_flags.py")
+    flags = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(flags)
+    args = list(flags.LEAN_ARGS)
+    if "image" in settings.lean_block_resources:
+        args.insert(0, flags.NO_IMAGES_ARG)
+    return args
+
+
+def find_chrome():
+    """Path of the Chrome/Chromium binary to launch, or None."""
+    if settings.chrome_binary:
+        return settings.chrome_binary
+    for name in _CHROME_NAMES:
+        path = shutil.which(name)
+        if path:
+            return path
+    if sys.platform == "win32":
+        for path in _CHROME_WINDOWS:
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def _devtools(port: int, path: str, method: str = "GET", timeout: float = 3.0):
+    req = urllib.request.Request(f"http://127.0.0.1:{port}{path}", method=method)
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        body = resp.read()
+    return json.loads(body) if body.strip().startswith((b"{", b"[")) else None
+
+
+class PooledBrowser:
+    def __init__(self, slot: int):
+        self.slot = slot
+        self.proc = None
+        self.port = None
+        self.profile_dir = settings.runtime_dir / "browsers" / f"slot{slot}"
+        self.leased = False
+        self.leases = 0
+
+    @property
+    def address(self) -> str:
+        return f"127.0.0.1:{self.port}"
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    async def launch(self, chrome: str):
+        await self.kill()
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        port_file = self.profile_dir / "DevToolsActivePort"
+        port_file.unlink(missing_ok=True)
+        args = [
+            chrome,
+            "--remote-debugging-port=0",
+            f"--user-data-dir={self.profile_dir}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--no-sandbox",
+            "--disable-dev-shm-usage",
+            "--disable-gpu",
+            "--window-size=1400,1000",
+        ]
+        if settings.headless:
+            args.append("--headless=new")
+        if settings.lean_browser:
+            args.extend(_lean_args())
+        args.append("about:blank")
+        self.proc = await asyncio.create_subprocess_exec(
+            *args, stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+        )
+        # Chrome writes the port it picked to DevToolsActivePort once DevTools is up.
+        deadline = asyncio.get_running_loop().time() + settings.browser_launch_timeout_seconds
+        while asyncio.get_running_loop().time() < deadline:
+            if not self.alive:
+                break
+            try:
+                self.port = int(port_file.read_text().splitlines()[0])
+                self.leases = 0
+                return
+            except (FileNotFoundError, IndexError, ValueError):
+                await asyncio.sleep(0.1)
+        await self.kill()
+        raise RuntimeError(f"Chrome in browser slot {self.slot} did not start")
+
+    async def kill(self):
+        if self.alive:
+            self.proc.kill()
+            await self.proc.wait()
+        self.proc = None
+        self.port = None
+
+    async def healthy(self) -> bool:
+        if not self.alive or self.port is None:
+            return False
+        try:
+            await asyncio.to_thread(_devtools, self.port, "/json/version")
+            return True
+        except Exception:
+            return False
+
+    async def reset(self):
+        """Close the previous job's tabs, leaving a single blank one."""
+        def _reset(port):
+            pages = [t for t in _devtools(port, "/json/list") if t.get("type") == "page"]
+            _devtools(port, "/json/new?about:blank", method="PUT")
+            for page in pages:
+                _devtools(port, f"/json/close/{page['id']}")
+        await asyncio.to_thread(_reset, self.port)
+
+
+class BrowserPool:
+    def __init__(self):
+        self.browsers = []
+        self.chrome = None
+        self._health_task = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.browsers)
+
+    def stats(self) -> dict:
+        in_use = sum(1 for b in self.browsers if b.leased)
+        return {"size": len(self.browsers), "in_use": in_use, "idle": len(self.browsers) - in_use}
+
+    async def start(self):
+        if settings.browser_pool_size <= 0:
+            return
+        self.chrome = find_chrome()
+        if not self.chrome:
+            logger.warning("Browser pool disabled: no Chrome/Chromium binary found")
+            return
+        self.browsers = [PooledBrowser(slot) for slot in range(settings.browser_pool_size)]
+        results = await asyncio.gather(*(b.launch(self.chrome) for b in self.browsers), return_exceptions=True)
+        for b, result in zip(self.browsers, results):
+            if isinstance(result, Exception):
+                logger.warning("Browser slot %d failed to launch: %s", b.slot, result)
+        self._health_task = asyncio.create_task(self._health_loop())
+        logger.info("Browser pool started with %d browsers", sum(1 for b in self.browsers if b.alive))
+
+    async def stop(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        await asyncio.gather(*(b.kill() for b in self.browsers), return_exceptions=True)
+        self.browsers = []
+
+    def acquire(self):
+        """Lease an idle, running browser, or None if there is none right now."""
+        for b in self.browsers:
+            if not b.leased and b.alive and b.port is not None:
+                b.leased = True
+                b.leases += 1
+                return b
+        return None
+
+    async def release(self, browser: PooledBrowser):
+        try:
+            if browser.leases >= settings.browser_max_jobs or not await browser.healthy():
+                await browser.launch(self.chrome)
+            else:
+                await browser.reset()
+        except Exception:
+            logger.exception("Browser slot %d could not be reset; relaunching", browser.slot)
+            try:
+                await browser.launch(self.chrome)
+            except Exception:
+                logger.exception("Browser slot %d could not be relaunched", browser.slot)
+        finally:
+            browser.leased = False
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(settings.browser_health_interval_seconds)
+            for b in self.browsers:
+                if b.leased:
+                    continue
+                b.leased = True  # keep it out of rotation while it is checked and restarted
+                try:
+                    if not await b.healthy():
+                        logger.warning("Browser slot %d is unhealthy; relaunching", b.slot)
+                        await b.launch(self.chrome)
+                except Exception:
+                    logger.exception("Browser slot %d could not be relaunched", b.slot)
+                finally:
+                    b.leased = False
+
+
+pool = BrowserPool()
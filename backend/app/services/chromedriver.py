@@ -0,0 +1,130 @@
+# backend/app/services/chromedriver.py
+"""
+chromedriver resolution, done once at backend startup.
+
+A driver pinned in settings.chromedriver_path is used as-is (a version
+mismatch with Chrome is only logged); startup fails if it is missing or does
+not run. Otherwise the driver is looked up on PATH, then in the
+webdriver_manager cache under ~/.wdm, on Linux and Windows alike, and a
+candidate is only accepted when its major version matches the installed
+Chrome. If nothing matches, webdriver_manager downloads one, once. Jobs get
+the result in OPSHUB_CHROMEDRIVER, so scripts never repeat the discovery.
+"""
+import logging
+import re
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from ..core.settings import settings
+from .browser_pool import find_chrome
+
+logger = logging.getLogger("config_ops_hub.chromedriver")
+
+_DRIVER_NAME = "chromedriver.exe" if sys.platform == "win32" else "chromedriver"
+_VERSION_RE = re.compile(r"(\d+)\.\d+\.\d+(?:\.\d+)?")
+
+_resolved = None
+
+
+def _version(binary) -> str | None:
+    """Full version string reported by `<binary> --version`, or None."""
+    try:
+        out = subprocess.run([str(binary), "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    m = _VERSION_RE.search(out or "")
+    return m.group(0) if m else None
+
+
+def _chrome_version() -> str | None:
+    chrome = find_chrome()
+    if not chrome:
+        return None
+    if sys.platform == "win32":
+        # chrome.exe --version prints nothing on Windows; the install dir is named after the version.
+        for entry in sorted(Path(chrome).parent.iterdir(), key=lambda p: _version_key(p.name), reverse=True):
+            if _VERSION_RE.fullmatch(entry.name):
+                return entry.name
+        return None
+    return _version(chrome)
+
+
+def _version_key(text: str):
+    m = _VERSION_RE.search(text)
+    return tuple(int(n) for n in m.group(0).split(".")) if m else ()
+
+
+def _major(version: str | None) -> str | None:
+    return version.split(".", 1)[0] if version else None
+
+
+def _candidates():
+    on_path = shutil.which("chromedriver")
+    if on_path:
+        yield Path(on_path)
+    wdm_root = Path.home() / ".wdm" / "drivers" / "chromedriver"
+    if wdm_root.is_dir():
+        # e.g. linux64/131.0.6778.85/chromedriver-linux64/chromedriver, newest first
+        found = [p for p in wdm_root.rglob(_DRIVER_NAME) if p.is_file()]
+        yield from sorted(found, key=lambda p: _version_key(str(p.relative_to(wdm_root))), reverse=True)
+
+
+def _install():
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        return Path(ChromeDriverManager().install())
+    except Exception:
+        logger.exception("webdriver_manager could not install chromedriver")
+        return None
+
+
+def _pinned(path: Path, chrome_major):
+    """The operator's chromedriver_path, checked only for being runnable."""
+    version = _version(path)
+    if version is None:
+        raise RuntimeError(f"chromedriver_path {path} does not exist or does not run "
+                           "(`--version` failed); fix or unset CHROMEDRIVER_PATH")
+    if chrome_major is not None and _major(version) != chrome_major:
+        logger.warning("Using pinned chromedriver %s (%s) although Chrome is %s", path, version, chrome_major)
+    else:
+        logger.info("Using pinned chromedriver %s (%s)", path, version)
+    return path
+
+
+def resolve():
+    """Find the chromedriver matching the installed Chrome. Call once at startup.
+
+    Raises RuntimeError when settings.chromedriver_path names an unusable driver.
+    """
+    global _resolved
+    chrome_major = _major(_chrome_version())
+    if settings.chromedriver_path:
+        _resolved = _pinned(Path(settings.chromedriver_path), chrome_major)
+        return _resolved
+    for path in _candidates():
+        version = _version(path)
+        if version is None:
+            continue
+        if chrome_major is None or _major(version) == chrome_major:
+            _resolved = path
+            logger.info("Using chromedriver %s (%s) for Chrome %s", path, version, chrome_major or "unknown")
+            return _resolved
+        logger.info("Skipping chromedriver %s (%s): Chrome is %s", path, version, chrome_major)
+
+    if settings.chromedriver_auto_install:
+        path = _install()
+        if path is not None and _version(path) is not None:
+            _resolved = path
+            logger.info("Installed chromedriver %s (%s)", path, _version(path))
+            return _resolved
+
+    _resolved = None
+    logger.warning("No chromedriver matching Chrome %s found; scripts will resolve their own", chrome_major or "unknown")
+    return None
+
+
+def driver_path():
+    """The chromedriver resolved at startup, or None."""
+    return _resolved
@@ -0,0 +1,181 @@
+# backend/app/services/job_store.py
+"""
+SQLite-backed job registry.
+
+One row per job with its script, a digest of its inputs, status, timestamps,
+item counts and exit code, so status/listing endpoints never have to read log
+files. All access goes through a single connection guarded by a lock; every
+statement is a short indexed read or write.
+
+The inputs digest and the caller's optional idempotency key let a repeated
+submission find the job it duplicates (see find_duplicate).
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from ..core.settings import settings
+
+ACTIVE_STATUSES = ("queued", "running")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id        TEXT PRIMARY KEY,
+    script_key    TEXT NOT NULL,
+    inputs_digest TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    created_at    REAL NOT NULL,
+    started_at    REAL,
+    finished_at   REAL,
+    item_total    INTEGER NOT NULL DEFAULT 0,
+    items_done    INTEGER NOT NULL DEFAULT 0,
+    items_failed  INTEGER NOT NULL DEFAULT 0,
+    exit_code     INTEGER
+);
+CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created_at);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_digest_created ON jobs (inputs_digest, created_at);
+"""
+
+
+def _migrate(conn: sqlite3.Connection):
+    """Columns added after the first release; existing databases get them in place."""
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+    if "idempotency_key" not in cols:
+        conn.execute("ALTER TABLE jobs ADD COLUMN idempotency_key TEXT")
+    if "resumed_from" not in cols:
+        conn.execute("ALTER TABLE jobs ADD COLUMN resumed_from TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS jobs_idempotency ON jobs (idempotency_key, created_at)")
+
+
+_conn = None
+_lock = threading.Lock()
+
+
+def _db() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        settings.jobs_db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(settings.jobs_db_path), check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _migrate(conn)
+        _conn = conn
+    return _conn
+
+
+def _normalize(value):
+    """Inputs as the scripts will see them: surrounding whitespace on strings does not count."""
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def inputs_digest(script_key: str, injects: dict) -> str:
+    canonical = json.dumps({"script": script_key, "inputs": _normalize(injects)},
+                           sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def create(job_id: str, script_key: str, digest: str, item_total: int, idempotency_key=None, resumed_from=None):
+    with _lock:
+        _db().execute(
+            "INSERT INTO jobs (job_id, script_key, inputs_digest, status, created_at, item_total, "
+            "idempotency_key, resumed_from) VALUES (?, ?, ?, 'queued', ?, ?, ?, ?)",
+            (job_id, script_key, digest, time.time(), item_total, idempotency_key, resumed_from),
+        )
+
+
+def find_duplicate(script_key: str, digest: str, idempotency_key=None, coalesce: bool = True):
+    """The job a new submission repeats, as (job_id, status), or None.
+
+    An idempotency key already used for this script maps to its job whatever the
+    inputs (for idempotency_key_ttl_seconds).
+    Otherwise, with coalesce, the same script + inputs map to a job that is still
+    queued/running or finished successfully within coalesce_window_seconds.
+    """
+    now = time.time()
+    with _lock:
+        db = _db()
+        if idempotency_key:
+            row = db.execute(
+                "SELECT job_id, status FROM jobs WHERE idempotency_key = ? AND script_key = ? AND created_at >= ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (idempotency_key, script_key, now - settings.idempotency_key_ttl_seconds),
+            ).fetchone()
+            if row:
+                return tuple(row)
+        if not coalesce:
+            return None
+        row = db.execute(
+            "SELECT job_id, status FROM jobs WHERE inputs_digest = ? "
+            "AND (status IN ('queued', 'running') OR (status = 'finished' AND finished_at >= ?)) "
+            "ORDER BY created_at DESC LIMIT 1",
+            (digest, now - settings.coalesce_window_seconds),
+        ).fetchone()
+    return tuple(row) if row else None
+
+
+def update(job_id: str, **fields):
+    if not fields:
+        return
+    cols = ", ".join(f"{name} = ?" for name in fields)
+    with _lock:
+        _db().execute(f"UPDATE jobs SET {cols} WHERE job_id = ?", (*fields.values(), job_id))
+
+
+def get(job_id: str):
+    with _lock:
+        row = _db().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def get_status(job_id: str):
+    with _lock:
+        row = _db().execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+    return row[0] if row else None
+
+
+def list_jobs(status=None, since=None, limit: int = 50, offset: int = 0):
+    """Newest first. `since` is an epoch timestamp on created_at."""
+    where, args = [], []
+    if status:
+        where.append("status = ?")
+        args.append(status)
+    if since is not None:
+        where.append("created_at >= ?")
+        args.append(since)
+    sql = "SELECT * FROM jobs"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+    with _lock:
+        rows = _db().execute(sql, (*args, limit, offset)).fetchall()
+    return [dict(r) for r in rows]
+
+
+def count_by_task_status():
+    """[(script_key, status, count)] over the whole registry."""
+    with _lock:
+        rows = _db().execute(
+            "SELECT script_key, status, COUNT(*) FROM jobs GROUP BY script_key, status ORDER BY script_key, status"
+        ).fetchall()
+    return [tuple(r) for r in rows]
+
+
+def mark_interrupted() -> int:
+    """Jobs left queued/running by a previous backend process can never finish."""
+    with _lock:
+        cur = _db().execute(
+            "UPDATE jobs SET status = 'interrupted', finished_at = ? WHERE status IN ('queued', 'running')",
+            (time.time(),),
+        )
+    return cur.rowcount
@@ -0,0 +1,46 @@
+# backend/app/services/journal.py
+"""
+Per-item checkpoint journal of a job.
+
+Scripts append an "item" record to the job's spans file the moment each item
+ends (toolkit.spans, one flushed line per item), so the file outlives a
+timeout kill or a Chrome crash. Read against the job's item list it tells
+which items are done, which failed and which never ran; the runner resumes a
+job by queueing a new one with only the unfinished entries.
+
+An item is keyed by its UUID, multimedia_id or tag, as the scripts report it.
+When an item has several records (a retry), the last one wins.
+"""
+from . import timings
+
+
+def item_key(entry) -> str:
+    """The key a script reports for one entry of its item list."""
+    if isinstance(entry, dict):
+        entry = entry.get("uuid") or entry.get("multimedia_id") or entry.get("tag")
+    elif isinstance(entry, (list, tuple)):
+        entry = entry[0] if entry else None
+    return "" if entry is None else str(entry).strip()
+
+
+def outcomes(job_id: str) -> dict:
+    """item key -> True (done) / False (failed), from the job's item records."""
+    results = {}
+    for r in timings.read_spans(timings.spans_path(job_id)):
+        if r.get("phase") == "item" and r.get("item") is not None:
+            results[str(r["item"]).strip()] = bool(r.get("ok", True))
+    return results
+
+
+def state(job_id: str, entries: list) -> dict:
+    """Split a job's item list into done / failed / pending entries (input order kept)."""
+    results = outcomes(job_id)
+    split = {"done": [], "failed": [], "pending": []}
+    for entry in entries:
+        ok = results.get(item_key(entry))
+        split["pending" if ok is None else "done" if ok else "failed"].append(entry)
+    return split
+
+
+def summary(split: dict) -> dict:
+    return {name: len(entries) for name, entries in split.items()}
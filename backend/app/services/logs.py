@@ -0,0 +1,63 @@
+# backend/app/services/logs.py
+import codecs
+import os
+from pathlib import Path
+
+from ..core.settings import settings
+
+
+def log_path(job_id: str) -> Path:
+    return Path(settings.outputs_dir) / f"{job_id}.log"
+
+
+def log_etag(st: os.stat_result, window: str = "") -> str:
+    """Validator for one read of the log: the file's size and mtime plus whatever else shaped
+    the response (the since/tail window, read limit), so different windows never match."""
+    return f'W/"{st.st_size:x}-{st.st_mtime_ns:x}-{window}"'
+
+
+def _decode_complete(data: bytes):
+    """Decode UTF-8, leaving a multi-byte character cut at the end for the next read."""
+    dec = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    text = dec.decode(data, final=False)
+    leftover = len(dec.getstate()[0])
+    return text, len(data) - leftover
+
+
+def read_since(path: Path, since: int, max_bytes: int) -> dict:
+    """Read up to max_bytes of the log starting at byte offset `since`."""
+    with path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        since = max(0, min(since, size))
+        f.seek(since)
+        data = f.read(min(max_bytes, size - since))
+    text, used = _decode_complete(data)
+    offset = since + used
+    return {"log": text, "offset": offset, "size": size, "more": offset < size}
+
+
+def _separators(data: bytes) -> int:
+    """Newlines between the lines of data, not counting one that ends it."""
+    return data.count(b"\n") - data.endswith(b"\n")
+
+
+def read_tail(path: Path, lines: int, max_bytes: int) -> dict:
+    """Read the last `lines` lines of the log (bounded by max_bytes)."""
+    block = 8192
+    with path.open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        start = size
+        data = b""
+        # The last `lines` lines are complete once `lines` newlines precede the
+        # final one (a trailing newline ends the last line, it does not start one).
+        while start > 0 and _separators(data) < lines and size - start < max_bytes:
+            step = min(block, start, max_bytes - (size - start))
+            start -= step
+            f.seek(start)
+            data = f.read(step) + data
+    if start > 0 or _separators(data) >= lines:
+        body, end = (data[:-1], b"\n") if data.endswith(b"\n") else (data, b"")
+        keep = body.split(b"\n")[-lines:] if lines > 0 and data else []
+        data = b"\n".join(keep) + (end if keep else b"")
+    text = data.decode("utf-8", errors="replace")
+    return {"log": text, "offset": size, "size": size, "more": False}
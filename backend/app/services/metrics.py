@@ -0,0 +1,165 @@
+# backend/app/services/metrics.py
+"""
+Prometheus text-format metrics for GET /metrics.
+
+Counters and histograms live in this process and start from zero on every
+restart, as Prometheus expects; job counts per task/status come from the job
+registry, so they include jobs from earlier runs. Script-side numbers (items,
+logins, cached-session reuse) come from each job's spans when it ends.
+
+No client library: the exposition format is a few lines of text.
+"""
+import asyncio
+import math
+import time
+
+from ..core.settings import settings
+
+_STARTED = time.time()
+
+JOB_DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+_job_duration = {}     # task -> _Histogram
+_jobs_finished = {}    # (task, status) -> count
+_items = {}            # (task, result) -> count
+_logins = {}           # task -> browser/HTTP logins performed by jobs
+_login_reuse = {}      # task -> cached admin sessions reused instead of logging in
+_loop_lag = _Histogram(LOOP_LAG_BUCKETS)
+_loop_lag_last = 0.0
+_lag_task = None
+
+
+def _inc(table: dict, key, by: int = 1):
+    table[key] = table.get(key, 0) + by
+
+
+def observe_job(task: str, status: str, seconds: float, summary=None):
+    """Record a finished job; summary is its timings.summarize() result, if it had spans."""
+    _job_duration.setdefault(task, _Histogram(JOB_DURATION_BUCKETS)).observe(seconds)
+    _inc(_jobs_finished, (task, status))
+    if not summary:
+        return
+    _inc(_items, (task, "ok"), summary["items_done"])
+    _inc(_items, (task, "failed"), summary["items_failed"])
+    phases = summary["phases"]
+    _inc(_logins, task, phases.get("login", {}).get("count", 0))
+    _inc(_login_reuse, task, phases.get("login_reused", {}).get("count", 0))
+
+
+async def _watch_loop_lag():
+    global _loop_lag_last
+    loop = asyncio.get_running_loop()
+    interval = settings.loop_lag_interval_seconds
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        _loop_lag_last = max(0.0, loop.time() - expected)
+        _loop_lag.observe(_loop_lag_last)
+
+
+def start():
+    global _lag_task
+    if _lag_task is None and settings.loop_lag_interval_seconds > 0:
+        _lag_task = asyncio.create_task(_watch_loop_lag())
+
+
+async def stop():
+    global _lag_task
+    if _lag_task is not None:
+        _lag_task.cancel()
+        await asyncio.gather(_lag_task, return_exceptions=True)
+        _lag_task = None
+
+
+# -- exposition ------------------------------------------------------------------
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels.items():
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _num(value) -> str:
+    if isinstance(value, float):
+        return "+Inf" if math.isinf(value) else repr(value)
+    return str(value)
+
+
+def _head(out: list, name: str, kind: str, help_text: str):
+    out.append(f"# HELP {name} {help_text}")
+    out.append(f"# TYPE {name} {kind}")
+
+
+def _histogram(out: list, name: str, hist: _Histogram, **labels):
+    for bound, count in zip(hist.buckets, hist.counts):
+        out.append(f"{name}_bucket{_labels(**labels, le=_num(float(bound)))} {count}")
+    out.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {hist.count}")
+    out.append(f"{name}_sum{_labels(**labels)} {_num(round(hist.sum, 6))}")
+    out.append(f"{name}_count{_labels(**labels)} {hist.count}")
+
+
+def render(job_counts, queue_depth: int, queue_capacity: int, workers: int, pool_stats: dict) -> str:
+    """The full exposition. job_counts is [(task, status, count)] from the job registry."""
+    out = []
+    _head(out, "opshub_jobs", "gauge", "Jobs in the registry by task and status.")
+    for task, status, count in job_counts:
+        out.append(f"opshub_jobs{_labels(task=task, status=status)} {count}")
+
+    _head(out, "opshub_jobs_finished_total", "counter", "Jobs finished by this process, by task and final status.")
+    for (task, status), count in sorted(_jobs_finished.items()):
+        out.append(f"opshub_jobs_finished_total{_labels(task=task, status=status)} {count}")
+
+    _head(out, "opshub_queue_depth", "gauge", "Jobs waiting in the queue.")
+    out.append(f"opshub_queue_depth {queue_depth}")
+    _head(out, "opshub_queue_capacity", "gauge", "Maximum number of queued jobs.")
+    out.append(f"opshub_queue_capacity {queue_capacity}")
+    _head(out, "opshub_workers", "gauge", "Job worker tasks.")
+    out.append(f"opshub_workers {workers}")
+
+    _head(out, "opshub_job_duration_seconds", "histogram", "Wall time of finished jobs.")
+    for task, hist in sorted(_job_duration.items()):
+        _histogram(out, "opshub_job_duration_seconds", hist, task=task)
+
+    _head(out, "opshub_items_total", "counter", "Items processed by finished jobs, by task and result.")
+    for (task, result), count in sorted(_items.items()):
+        out.append(f"opshub_items_total{_labels(task=task, result=result)} {count}")
+
+    _head(out, "opshub_browser_pool_browsers", "gauge", "Pooled Chrome browsers by state.")
+    out.append(f"opshub_browser_pool_browsers{_labels(state='in_use')} {pool_stats['in_use']}")
+    out.append(f"opshub_browser_pool_browsers{_labels(state='idle')} {pool_stats['idle']}")
+
+    _head(out, "opshub_admin_logins_total", "counter", "Admin logins performed by jobs.")
+    for task, count in sorted(_logins.items()):
+        out.append(f"opshub_admin_logins_total{_labels(task=task)} {count}")
+    _head(out, "opshub_admin_session_reuse_total", "counter", "Cached admin sessions reused instead of logging in.")
+    for task, count in sorted(_login_reuse.items()):
+        out.append(f"opshub_admin_session_reuse_total{_labels(task=task)} {count}")
+
+    _head(out, "opshub_event_loop_lag_seconds", "histogram", "How late the event loop woke up for a timed sleep.")
+    _histogram(out, "opshub_event_loop_lag_seconds", _loop_lag)
+    _head(out, "opshub_event_loop_lag_last_seconds", "gauge", "Most recent event-loop lag sample.")
+    out.append(f"opshub_event_loop_lag_last_seconds {_num(round(_loop_lag_last, 6))}")
+
+    _head(out, "opshub_process_start_time_seconds", "gauge", "Start time of this backend process (epoch).")
+    out.append(f"opshub_process_start_time_seconds {_num(_STARTED)}")
+    return "\n".join(out) + "\n"
@@ -0,0 +1,244 @@
+# backend/app/services/preloader.py
+"""
+Warm script workers.
+
+A preloader is a long-lived Python process that imports the heavy modules the
+scripts need (selenium, webdriver_manager, flask, ...) once, then forks a fresh
+child for every job it is handed. The child inherits the already-imported
+modules, runs the script with its stdout/stderr on a pipe owned by the backend
+and exits, so a crashing script never takes the preloader down with it.
+
+The backend talks to a preloader over a unix socketpair using newline-delimited
+JSON; the job's output pipe is passed along with the request (SCM_RIGHTS).
+Scripts run unmodified: their inputs arrive through the params file named in
+the job env (see templating.py), and each original is compiled once per
+preloader and cached by content hash.
+
+This file is both the backend-side client (WarmWorker) and, when executed
+directly, the preloader process itself. It must only import the stdlib at
+module level.
+"""
+import asyncio
+import builtins
+import hashlib
+import importlib
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+
+
+def supported() -> bool:
+    return hasattr(os, "fork") and hasattr(socket, "send_fds")
+
+
+# -------------------------------------------------
+# Preloader process side
+# -------------------------------------------------
+def _preload(modules):
+    loaded = []
+    for name in modules:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception:
+            # Missing optional deps only cost the warm start, not the job.
+            pass
+    return loaded
+
+
+_code_cache = {}
+
+
+def _load_code(script: str):
+    """Compile a script, reusing the code object while its content is unchanged."""
+    with open(script, "rb") as f:
+        source = f.read()
+    key = (script, hashlib.sha256(source).hexdigest())
+    code = _code_cache.get(key)
+    if code is None:
+        code = compile(source, script, "exec")
+        _code_cache[key] = code
+    return code
+
+
+def _send(sock, msg: dict):
+    sock.sendall((json.dumps(msg) + "\n").encode("utf-8"))
+
+
+def _run_child(sock, req: dict, out_fd: int, compiled, compile_error):
+    """Runs inside the forked child; never returns."""
+    code = 1
+    try:
+        sock.close()
+        os.setsid()
+        os.dup2(out_fd, 1)
+        os.dup2(out_fd, 2)
+        os.close(out_fd)
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        os.close(devnull)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        sys.stdout.reconfigure(line_buffering=True)
+        sys.stderr.reconfigure(line_buffering=True)
+
+        os.environ.update(req.get("env") or {})
+        script = req["script"]
+        sys.argv = [script]
+        sys.path[0] = os.path.dirname(script)
+        if compile_error is not None:
+            raise compile_error
+        code = 0
+        exec(compiled, {"__name__": "__main__", "__file__": script, "__builtins__": builtins})
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+
+
+def serve(sock_fd: int, modules):
+    sock = socket.socket(fileno=sock_fd)
+    loaded = _preload(modules)
+    _send(sock, {"ready": True, "pid": os.getpid(), "preloaded": loaded})
+
+    buf = b""
+    while True:
+        msg, fds, _flags, _addr = socket.recv_fds(sock, 1 << 16, 1)
+        if not msg:
+            return
+        buf += msg
+        if b"\n" not in buf:
+            continue
+        line, buf = buf.split(b"\n", 1)
+        req = json.loads(line)
+        if not fds:
+            _send(sock, {"error": "missing output fd"})
+            continue
+        out_fd = fds[0]
+        compiled, compile_error = None, None
+        try:
+            compiled = _load_code(req["script"])
+        except Exception as e:
+            compile_error = e
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            _run_child(sock, req, out_fd, compiled, compile_error)
+        os.close(out_fd)
+        _send(sock, {"pid": pid})
+        _, status = os.waitpid(pid, 0)
+        _send(sock, {"exit": os.waitstatus_to_exitcode(status)})
+
+
+# -------------------------------------------------
+# Backend side
+# -------------------------------------------------
+class WarmWorker:
+    """One preloader process; runs one job at a time."""
+
+    def __init__(self, modules, max_jobs: int):
+        self.modules = list(modules)
+        self.max_jobs = max_jobs
+        self.proc = None
+        self.sock = None
+        self.jobs_run = 0
+        self._buf = b""
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    async def start(self):
+        parent, child = socket.socketpair()
+        try:
+            self.proc = await asyncio.create_subprocess_exec(
+                sys.executable, os.path.abspath(__file__), str(child.fileno()), *self.modules,
+                pass_fds=(child.fileno(),),
+                stdin=asyncio.subprocess.DEVNULL,
+            )
+        finally:
+            child.close()
+        parent.setblocking(False)
+        self.sock = parent
+        self.jobs_run = 0
+        self._buf = b""
+        ready = await self._recv()
+        if not ready.get("ready"):
+            raise RuntimeError(f"Preloader failed to start: {ready}")
+        return ready
+
+    async def stop(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        if self.alive:
+            self.proc.terminate()
+            try:
+                await asyncio.wait_for(self.proc.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                self.proc.kill()
+                await self.proc.wait()
+        self.proc = None
+
+    async def ensure_started(self):
+        if self.alive and self.jobs_run < self.max_jobs:
+            return
+        await self.stop()
+        await self.start()
+
+    async def _recv(self) -> dict:
+        loop = asyncio.get_running_loop()
+        while b"\n" not in self._buf:
+            chunk = await loop.sock_recv(self.sock, 4096)
+            if not chunk:
+                raise ConnectionError("Preloader exited")
+            self._buf += chunk
+        line, self._buf = self._buf.split(b"\n", 1)
+        return json.loads(line)
+
+    async def spawn(self, script: str, env: dict, out_fd: int) -> int:
+        """Hand a job to the preloader; returns the child's pid."""
+        data = (json.dumps({"script": script, "env": env}) + "\n").encode("utf-8")
+        socket.send_fds(self.sock, [data], [out_fd])
+        self.jobs_run += 1
+        reply = await self._recv()
+        if "pid" not in reply:
+            raise RuntimeError(f"Preloader refused job: {reply}")
+        return reply["pid"]
+
+    async def wait_exit(self) -> int:
+        reply = await self._recv()
+        return reply["exit"]
+
+
+def kill_job(pid: int):
+    """Kill a job child and everything it started (chromedriver, Chrome)."""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+if __name__ == "__main__":
+    serve(int(sys.argv[1]), sys.argv[2:])
@@ -1,95 +1,608 @@
 # backend/app/services/runner.py
-import re
+import os
+import json
 import uuid
-import subprocess
+import asyncio
 import sys
-import json
-import os
+import logging
+import threading
 import time
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from ..core.settings import settings
 from ..core.paths import ensure_runtime_dirs
+from . import preloader, job_store, chromedriver, timings, metrics, journal
+from .browser_pool import pool as browser_pool
+from .templating import write_params, params_env
 
 ensure_runtime_dirs()
 
-def _replace_constant(content: str, name: str, new_value_code: str) -> str:
-    pattern = re.compile(r'(^\s*' + re.escape(name) + r'\s*=\s*)([\s\S]*?)(\n)', re.MULTILINE)
-    m = pattern.search(content)
-    if not m:
-        return content
-    return content[:m.start(2)] + new_value_code + content[m.end(2):]
+logger = logging.getLogger("config_ops_hub.runner")
+
+
+@dataclass
+class Job:
+    job_id: str
+    script_key: str
+    script_path: Path
+    params_path: Path
+    out_path: Path
+    extra_env: dict = field(default_factory=dict)
+    # Number of browser workers the item list is split across (see _run_sharded)
+    parallelism: int = 1
+
+
+# Background queue + workers. Created on app startup (see start_workers) so they
+# bind to uvicorn's event loop.
+_queue = None
+_workers = []
+# Idle workers warm their preloaders one at a time, so the first is ready quickly
+_warmup_lock = None
+# job_id -> events set whenever the job's log grows or its status changes
+_watchers = {}
+# Submissions are prepared off the event loop, one at a time, so the duplicate
+# check and the registry insert stay atomic; _reserved counts queue slots held
+# by jobs prepared but not yet put on the queue.
+_submit_lock = threading.Lock()
+_slots_lock = threading.Lock()
+_reserved = 0
+
+
+class QueueFull(RuntimeError):
+    """The job queue has no room; the caller should retry later."""
+
+
+def _job_env(job: Job) -> dict:
+    env = params_env(job.params_path)
+    env["OPSHUB_RUNTIME_DIR"] = str(settings.runtime_dir)
+    env["OPSHUB_SPANS"] = str(timings.spans_path(job.job_id))
+    env["OPSHUB_HEADLESS"] = "1" if settings.headless else "0"
+    env["OPSHUB_LEAN_BROWSER"] = "1" if settings.lean_browser else "0"
+    env["OPSHUB_BLOCK_RESOURCES"] = ",".join(settings.lean_block_resources)
+    env.update(job.extra_env)
+    driver_path = chromedriver.driver_path()
+    if driver_path:
+        env["OPSHUB_CHROMEDRIVER"] = str(driver_path)
+    return env
+
+
+# Inputs that hold the per-item work list, in the order they are looked up.
+ITEM_INPUTS = ("uuid_list", "multimedia_data", "pairs", "tags")
+
+
+def _item_input(injects: dict):
+    for name in ITEM_INPUTS:
+        if isinstance(injects.get(name), list):
+            return name
+    return None
+
+
+def _count_items(injects: dict) -> int:
+    name = _item_input(injects)
+    return len(injects[name]) if name else 1
+
+
+def _split(items: list, n: int) -> list:
+    """n contiguous slices whose sizes differ by at most one."""
+    size, extra = divmod(len(items), n)
+    slices, start = [], 0
+    for i in range(n):
+        end = start + size + (1 if i < extra else 0)
+        slices.append(items[start:end])
+        start = end
+    return slices
+
+
+def get_job_status(job_id: str):
+    return job_store.get_status(job_id)
+
+
+def _set_status(job_id: str, status: str, **fields):
+    job_store.update(job_id, status=status, **fields)
+    _notify(job_id)
+
+
+def _notify(job_id: str):
+    for event in _watchers.get(job_id, ()):
+        event.set()
+
+
+def watch_job(job_id: str) -> asyncio.Event:
+    """Event that is set each time the job's log is flushed or its status changes."""
+    event = asyncio.Event()
+    _watchers.setdefault(job_id, set()).add(event)
+    return event
 
-def create_job_and_run(script_key: str, injects: dict):
+
+def unwatch_job(job_id: str, event: asyncio.Event):
+    events = _watchers.get(job_id)
+    if events is not None:
+        events.discard(event)
+        if not events:
+            del _watchers[job_id]
+
+
+def _reserve_slot():
+    global _reserved
+    with _slots_lock:
+        if _queue.qsize() + _reserved >= settings.queue_max_size:
+            raise QueueFull(f"Job queue is full ({settings.queue_max_size} jobs waiting); try again later")
+        _reserved += 1
+
+
+def _release_slot():
+    global _reserved
+    with _slots_lock:
+        _reserved -= 1
+
+
+def _prepare_job(script_key: str, injects: dict, parallelism: int, idempotency_key, coalesce: bool,
+                 resumed_from):
+    """Blocking half of submit_job (runs in a thread): dedup, files, registry row.
+
+    Returns (job, result); job is None when the submission repeats an existing
+    job. A returned job holds a reserved queue slot.
+    """
     orig = settings.originals_dir / script_key
     if not orig.exists():
         raise FileNotFoundError(f"Original script not found: {orig}")
-    job_id = uuid.uuid4().hex[:16]
-    job_dir = settings.runtime_dir / job_id
-    job_dir.mkdir(parents=True, exist_ok=True)
-    copy_path = settings.copies_dir / f"{job_id}_{orig.name}"
-    content = orig.read_text(encoding='utf-8')
-
-    # injections
-    if 'GOOGLE_SHEET_URL' in injects:
-        val = json.dumps(injects['GOOGLE_SHEET_URL'], ensure_ascii=False)
-        content = _replace_constant(content, 'GOOGLE_SHEET_URL', val)
-    if 'multimedia_data' in injects:
-        val = repr(injects['multimedia_data'])
-        content = _replace_constant(content, 'multimedia_data', val)
-    if 'uuid_list' in injects:
-        val = repr(injects['uuid_list'])
-        content = _replace_constant(content, 'uuid_list', val)
-
-    # attempt to locate webdriver_manager cache and patch the temp copy
+    with _submit_lock:
+        digest = job_store.inputs_digest(script_key, injects)
+        duplicate = job_store.find_duplicate(script_key, digest, idempotency_key, coalesce)
+        if duplicate:
+            dup_id, dup_status = duplicate
+            logger.info("Submission for %s coalesced into job %s (%s)", script_key, dup_id, dup_status)
+            return None, (dup_id, str(settings.outputs_dir / f"{dup_id}.log"), dup_status, True)
+
+        _reserve_slot()
+        try:
+            job_id = uuid.uuid4().hex[:16]
+            job_dir = settings.runtime_dir / job_id
+            job_dir.mkdir(parents=True, exist_ok=True)
+            params_path = write_params(job_dir / "params.json", injects)
+
+            out_path = settings.outputs_dir / f"{job_id}.log"
+            shards = 1
+            if _item_input(injects):
+                shards = max(1, min(parallelism, settings.max_parallelism, _count_items(injects)))
+            job = Job(job_id=job_id, script_key=script_key, script_path=orig,
+                      params_path=params_path, out_path=out_path, parallelism=shards)
+
+            resuming = f" (resuming {resumed_from})" if resumed_from else ""
+            out_path.write_text(f"--- JOB {job_id} QUEUED {time.asctime()}{resuming}\n", encoding='utf-8')
+            job_store.create(job_id, script_key, digest, _count_items(injects), idempotency_key, resumed_from)
+        except BaseException:
+            _release_slot()
+            raise
+    return job, (job_id, str(out_path), 'queued', False)
+
+
+def _enqueue_prepared(fut):
+    # A done-callback, so a prepared job is queued even if the request that
+    # submitted it was cancelled meanwhile.
+    if fut.cancelled() or fut.exception() is not None:
+        return
+    job, _ = fut.result()
+    if job is None:
+        return
+    _release_slot()
+    if _queue is None:
+        # Workers stopped meanwhile; the next start marks the job interrupted.
+        return
+    _queue.put_nowait(job)
+    _notify(job.job_id)
+
+
+async def submit_job(script_key: str, injects: dict, parallelism: int = 1, idempotency_key=None,
+                     coalesce: bool = True, resumed_from=None):
+    """Prepare a job and put it on the background queue; returns once it is queued.
+
+    parallelism > 1 splits the job's item list across that many script
+    processes, each driving its own browser (capped by max_parallelism and by
+    the number of items).
+
+    A repeat submission (same idempotency key, or with coalesce the same script
+    and inputs as a queued, running or just-finished job) starts nothing and
+    returns that job instead. Returns (job_id, out_path, status, coalesced);
+    raises QueueFull when queue_max_size jobs are already waiting.
+    """
+    if _queue is None:
+        raise RuntimeError("Job workers are not running")
+    fut = asyncio.ensure_future(asyncio.to_thread(
+        _prepare_job, script_key, injects, parallelism, idempotency_key, coalesce, resumed_from))
+    fut.add_done_callback(_enqueue_prepared)
+    _, result = await asyncio.shield(fut)
+    return result
+
+
+def _job_inputs(job_id: str):
     try:
-        home = Path.home()
-        wdm_root = home / ".wdm" / "drivers" / "chromedriver"
-        if wdm_root.exists() and any(wdm_root.iterdir()):
-            versions = [p for p in wdm_root.iterdir() if p.is_dir()]
-            versions_sorted = sorted(versions, key=lambda p: p.name, reverse=True)
-            found_exec = None
-            for ver in versions_sorted:
-                candidates = [
-                    ver / "chromedriver-win32" / "chromedriver.exe",
-                    ver / "chromedriver-win64" / "chromedriver.exe",
-                    ver / "chromedriver" / "chromedriver.exe",
-                    ver / "chromedriver.exe",
-                ]
-                for c in candidates:
-                    if c.exists():
-                        found_exec = c
-                        break
-                if found_exec:
-                    break
-            if found_exec:
-                path_literal = "r" + repr(str(found_exec))
-                content = content.replace("ChromeDriverManager().install()", path_literal)
-                content = content.replace("ChromeDriverManager().install( )", path_literal)
-    except Exception:
-        pass
+        return json.loads((settings.runtime_dir / job_id / "params.json").read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return None
+
+
+def job_journal(job_id: str):
+    """Done / failed / pending entries of the job's item list, or None if it has none."""
+    injects = _job_inputs(job_id)
+    name = _item_input(injects) if injects else None
+    if name is None:
+        return None
+    return journal.state(job_id, injects[name])
+
+
+def _resume_inputs(job_id: str, retry_failed: bool):
+    """(script_key, injects) of the job that finishes what job_id left undone."""
+    record = job_store.get(job_id)
+    if record is None:
+        raise LookupError("Unknown job_id")
+    if record["status"] in job_store.ACTIVE_STATUSES:
+        raise RuntimeError(f"Job is still {record['status']}")
+    injects = _job_inputs(job_id)
+    name = _item_input(injects) if injects else None
+    if name is None:
+        raise ValueError("Job has no item list to resume")
+    split = journal.state(job_id, injects[name])
+    unfinished = split["pending"] + (split["failed"] if retry_failed else [])
+    if not unfinished:
+        raise ValueError("Job has no unfinished items")
+    # Input order, so the resumed job walks the list the way the original did.
+    keys = {journal.item_key(e) for e in unfinished}
+    items = [e for e in injects[name] if journal.item_key(e) in keys]
+    return record["script_key"], {**injects, name: items}
+
+
+async def resume_job(job_id: str, retry_failed: bool = True, parallelism: int = 1, idempotency_key=None):
+    """Queue a new job with the items job_id did not finish; returns submit_job's result.
+
+    Items that failed run again unless retry_failed is False. Raises LookupError
+    for an unknown job, RuntimeError while it is still queued/running and
+    ValueError when it has no item list or nothing left to do.
+    """
+    script_key, injects = await asyncio.to_thread(_resume_inputs, job_id, retry_failed)
+    return await submit_job(script_key, injects, parallelism, idempotency_key=idempotency_key,
+                            resumed_from=job_id)
 
-    # write copy
-    copy_path.parent.mkdir(parents=True, exist_ok=True)
-    copy_path.write_text(content, encoding='utf-8')
 
-    # run and capture
-    out_path = settings.outputs_dir / f"{job_id}.log"
-    with out_path.open('w', encoding='utf-8') as fout:
-        fout.write(f"--- JOB {job_id} START {time.asctime()}\n")
+async def _pipe_reader(fd: int):
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(fd, 'rb', 0))
+    return reader, transport
+
+
+async def _pump_output(reader: asyncio.StreamReader, fout, on_flush=None):
+    """Copy a job's output into its log as it arrives, a whole line at a time.
+
+    At most log_buffer_bytes of an unfinished line is held back, and the file is
+    flushed every log_flush_seconds (or as soon as the child goes quiet), so the
+    log can be followed while the job runs and memory stays flat.
+    """
+    pending = b""
+    last_flush = time.monotonic()
+    try:
+        while True:
+            try:
+                chunk = await asyncio.wait_for(reader.read(settings.log_buffer_bytes),
+                                               timeout=settings.log_flush_seconds)
+            except asyncio.TimeoutError:
+                chunk = None
+            if chunk == b"":
+                break
+            if chunk:
+                head, sep, pending = (pending + chunk).rpartition(b"\n")
+                if sep:
+                    fout.write(head + sep)
+                if len(pending) >= settings.log_buffer_bytes:
+                    fout.write(pending)
+                    pending = b""
+            now = time.monotonic()
+            if chunk is None or now - last_flush >= settings.log_flush_seconds:
+                fout.flush()
+                last_flush = now
+                if on_flush is not None:
+                    on_flush()
+    finally:
+        if pending:
+            fout.write(pending)
         fout.flush()
+        if on_flush is not None:
+            on_flush()
+
+
+def _kill_cold(proc):
+    """Kill a cold job process and, on POSIX, its session (chromedriver, Chrome)."""
+    if os.name == 'posix':
+        preloader.kill_job(proc.pid)
+    elif proc.returncode is None:
+        proc.kill()
+
+
+async def _exec_cold(job: Job, fout):
+    """Run the script in a fresh interpreter; returns (status, exit_code).
+
+    Like a warm child, it leads its own session, so a timeout or cancel kills
+    the browsers it started along with it.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, str(job.script_path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        stdin=asyncio.subprocess.DEVNULL,
+        env={**os.environ, "PYTHONUNBUFFERED": "1", **_job_env(job)},
+        start_new_session=(os.name == 'posix'),
+    )
+    try:
+        await asyncio.wait_for(_pump_output(proc.stdout, fout, lambda: _notify(job.job_id)), timeout=settings.script_timeout_seconds)
+        code = await proc.wait()
+        return _exit_status(code), code
+    except asyncio.TimeoutError:
+        _kill_cold(proc)
+        return 'timeout', await proc.wait()
+    except asyncio.CancelledError:
+        _kill_cold(proc)
+        raise
+
+
+async def _exec_warm(job: Job, warm: preloader.WarmWorker, fout):
+    """Run the script in a child forked from an already-warm preloader; returns (status, exit_code)."""
+    r_fd, w_fd = os.pipe()
+    try:
+        pid = await warm.spawn(str(job.script_path), _job_env(job), w_fd)
+    except BaseException:
+        os.close(r_fd)
+        raise
+    finally:
+        os.close(w_fd)
+
+    reader, transport = await _pipe_reader(r_fd)
+    pump = asyncio.create_task(_pump_output(reader, fout, lambda: _notify(job.job_id)))
+    try:
         try:
-            proc = subprocess.run([sys.executable, str(copy_path)],
-                      stdout=subprocess.PIPE,
-                      stderr=subprocess.STDOUT,
-                      timeout=settings.script_timeout_seconds)
-            fout.write(proc.stdout.decode('utf-8', errors='replace'))
-            status = 'finished'
-        except subprocess.TimeoutExpired:
-            fout.write('\n--- TIMEOUT (killed) ---\n')
+            code = await asyncio.wait_for(warm.wait_exit(), timeout=settings.script_timeout_seconds)
+            status = _exit_status(code)
+        except asyncio.TimeoutError:
+            preloader.kill_job(pid)
+            code = await warm.wait_exit()
             status = 'timeout'
-        except Exception as e:
-            fout.write(f"\n--- ERROR: {e} ---\n")
-            status = 'error'
-        fout.write(f"\n--- JOB {job_id} END {time.asctime()} status={status}\n")
-    return job_id, str(out_path), status
\ No newline at end of file
+        # The script is gone; anything it left running may still hold the pipe open.
+        await asyncio.wait_for(asyncio.shield(pump), timeout=2)
+    except asyncio.TimeoutError:
+        pass
+    except BaseException:
+        preloader.kill_job(pid)
+        await warm.stop()
+        raise
+    finally:
+        pump.cancel()
+        await asyncio.gather(pump, return_exceptions=True)
+        transport.close()
+    return status, code
+
+
+def _exit_status(code: int) -> str:
+    return 'finished' if code == 0 else 'failed'
+
+
+async def _exec(job: Job, warm, fout):
+    """Run one script process for the job, warm if possible; returns (status, exit_code)."""
+    if warm is not None:
+        try:
+            # Normally a no-op: the worker warmed it while idle. Restarts it if it died since.
+            await warm.ensure_started()
+        except Exception:
+            logger.exception("Warm worker unavailable; running %s in a fresh interpreter", job.job_id)
+            await warm.stop()
+            warm = None
+    try:
+        if warm is not None:
+            return await _exec_warm(job, warm, fout)
+        return await _exec_cold(job, fout)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        fout.write(f"\n--- ERROR: {e} ---\n".encode('utf-8'))
+        return 'error', None
+
+
+async def _write_timings(job: Job, status: str, started: float, fout) -> dict:
+    """Append the job's per-phase timing summary to its log and record its metrics.
+
+    Returns the item counts for the registry.
+    """
+    wall = time.monotonic() - started
+    summary = await asyncio.to_thread(timings.job_summary, job.job_id, wall)
+    if not summary["phases"]:
+        metrics.observe_job(job.script_key, status, wall)
+        return {}
+    metrics.observe_job(job.script_key, status, wall, summary)
+    fout.write(timings.format_summary(summary).encode('utf-8'))
+    return {"items_done": summary["items_done"], "items_failed": summary["items_failed"]}
+
+
+async def _write_checkpoint(job: Job, status: str, fout):
+    """After a job that did not finish cleanly, say how much of its item list is left."""
+    if status == 'finished':
+        return
+    split = await asyncio.to_thread(job_journal, job.job_id)
+    if split is None or not (split["pending"] or split["failed"]):
+        return
+    counts = journal.summary(split)
+    fout.write(f"--- CHECKPOINT {counts['done']} items done, {counts['failed']} failed, {counts['pending']} not run; "
+               f"POST /tasks/{job.job_id}/resume runs the rest\n".encode('utf-8'))
+
+
+def queue_stats() -> dict:
+    return {"depth": _queue.qsize() if _queue is not None else 0,
+            "capacity": settings.queue_max_size, "workers": len(_workers)}
+
+
+async def _run_job(job: Job, warm=None) -> str:
+    _set_status(job.job_id, 'running', started_at=time.time())
+    if job.parallelism > 1:
+        return await _run_sharded(job, warm)
+    browser = browser_pool.acquire()
+    try:
+        return await _run_job_in(job, warm, browser)
+    finally:
+        if browser is not None:
+            await browser_pool.release(browser)
+
+
+async def _run_job_in(job: Job, warm, browser) -> str:
+    if browser is not None:
+        job.extra_env["OPSHUB_DEBUGGER_ADDRESS"] = browser.address
+    with job.out_path.open('ab', buffering=settings.log_buffer_bytes) as fout:
+        fout.write(f"--- JOB {job.job_id} START {time.asctime()}\n".encode('utf-8'))
+        if browser is not None:
+            fout.write(f"--- using pooled browser {browser.slot} at {browser.address}\n".encode('utf-8'))
+        fout.flush()
+        started = time.monotonic()
+        status, code = await _exec(job, warm, fout)
+        if status == 'timeout':
+            fout.write(b'\n--- TIMEOUT (killed) ---\n')
+        counts = await _write_timings(job, status, started, fout)
+        await _write_checkpoint(job, status, fout)
+        fout.write(f"\n--- JOB {job.job_id} END {time.asctime()} status={status}\n".encode('utf-8'))
+    _set_status(job.job_id, status, finished_at=time.time(), exit_code=code, **counts)
+    return status
+
+
+class _ShardLog:
+    """Write-through view of the job log that tags each line with its shard."""
+
+    def __init__(self, fout, shard: int):
+        self._fout = fout
+        self._prefix = f"[w{shard}] ".encode('utf-8')
+        self._line_start = True
+
+    def write(self, data: bytes):
+        for piece in data.splitlines(keepends=True):
+            if self._line_start:
+                self._fout.write(self._prefix)
+            self._fout.write(piece)
+            self._line_start = piece.endswith(b"\n")
+
+    def end_line(self):
+        if not self._line_start:
+            self.write(b"\n")
+
+    def flush(self):
+        self._fout.flush()
+
+
+async def _run_shard(shard: Job, n: int, items: int, warm, fout) -> dict:
+    log = _ShardLog(fout, n)
+    browser = browser_pool.acquire()
+    started = time.monotonic()
+    try:
+        if browser is not None:
+            shard.extra_env["OPSHUB_DEBUGGER_ADDRESS"] = browser.address
+            log.write(f"--- {items} items, pooled browser {browser.slot} at {browser.address}\n".encode('utf-8'))
+        else:
+            log.write(f"--- {items} items, own browser\n".encode('utf-8'))
+        status, code = await _exec(shard, warm, log)
+        if status == 'timeout':
+            log.write(b'\n--- TIMEOUT (killed) ---\n')
+        log.end_line()
+    finally:
+        if browser is not None:
+            await browser_pool.release(browser)
+    return {"shard": n, "items": items, "status": status, "exit_code": code,
+            "seconds": time.monotonic() - started}
+
+
+async def _run_sharded(job: Job, warm) -> str:
+    """Split the item list across job.parallelism script processes and merge their output.
+
+    Every shard is the same script with its own params file (holding a slice of
+    the items) and its own browser; their lines go into the one job log, tagged
+    [w0], [w1], ..., followed by a per-shard summary.
+    """
+    injects = json.loads(job.params_path.read_text(encoding='utf-8'))
+    name = _item_input(injects)
+    slices = _split(injects[name], job.parallelism)
+    shards = []
+    for n, items in enumerate(slices):
+        params_path = write_params(job.params_path.with_name(f"params.w{n}.json"), {**injects, name: items})
+        shards.append(Job(job_id=job.job_id, script_key=job.script_key, script_path=job.script_path,
+                          params_path=params_path, out_path=job.out_path))
+
+    started = time.monotonic()
+    with job.out_path.open('ab', buffering=settings.log_buffer_bytes) as fout:
+        fout.write(f"--- JOB {job.job_id} START {time.asctime()} "
+                   f"({len(slices)} workers, {len(injects[name])} items)\n".encode('utf-8'))
+        fout.flush()
+        # A preloader serves one child at a time: shard 0 uses this worker's, the rest start cold.
+        results = await asyncio.gather(*(
+            _run_shard(shard, n, len(slices[n]), warm if n == 0 else None, fout)
+            for n, shard in enumerate(shards)
+        ))
+        statuses = {r["status"] for r in results}
+        status = 'finished'
+        for worst in ('error', 'timeout', 'failed'):
+            if worst in statuses:
+                status = worst
+                break
+        code = next((r["exit_code"] for r in results if r["exit_code"]), 0)
+        fout.write(f"--- SUMMARY {len(results)} workers, {len(injects[name])} items "
+                   f"in {time.monotonic() - started:.1f}s\n".encode('utf-8'))
+        for r in results:
+            fout.write(f"---   w{r['shard']}: {r['items']} items {r['status']} "
+                       f"(exit {r['exit_code']}) in {r['seconds']:.1f}s\n".encode('utf-8'))
+        counts = await _write_timings(job, status, started, fout)
+        await _write_checkpoint(job, status, fout)
+        fout.write(f"\n--- JOB {job.job_id} END {time.asctime()} status={status}\n".encode('utf-8'))
+    _set_status(job.job_id, status, finished_at=time.time(), exit_code=code, **counts)
+    return status
+
+
+async def _worker(n: int):
+    warm = None
+    if settings.warm_workers and preloader.supported():
+        warm = preloader.WarmWorker(settings.preload_modules, settings.warm_worker_max_jobs)
+    try:
+        while True:
+            if warm is not None:
+                # Warm up (or recycle) while idle, so the next job does not pay for the preload.
+                try:
+                    async with _warmup_lock:
+                        await warm.ensure_started()
+                except Exception:
+                    logger.exception("worker %d: warm worker failed to start; next job will retry", n)
+                    await warm.stop()
+            job = await _queue.get()
+            try:
+                await _run_job(job, warm)
+            except Exception:
+                logger.exception("worker %d: job %s crashed", n, job.job_id)
+                _set_status(job.job_id, 'error', finished_at=time.time())
+            finally:
+                _queue.task_done()
+    finally:
+        if warm is not None:
+            await warm.stop()
+
+
+async def start_workers():
+    global _queue, _warmup_lock
+    if _queue is not None:
+        return
+    stale = job_store.mark_interrupted()
+    if stale:
+        logger.warning("Marked %d jobs from a previous run as interrupted", stale)
+    _queue = asyncio.Queue(maxsize=settings.queue_max_size)
+    _warmup_lock = asyncio.Lock()
+    for n in range(settings.worker_count):
+        _workers.append(asyncio.create_task(_worker(n)))
+    logger.info("Started %d job workers (queue size %d)", settings.worker_count, settings.queue_max_size)
+
+
+async def stop_workers():
+    global _queue
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    _queue = None
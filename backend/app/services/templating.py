@@ -1,2 +1,22 @@
-def safe_inject(original_source: str, injections: dict) -> str:
-    return original_source
+# backend/app/services/templating.py
+import json
+import os
+from pathlib import Path
+
+# Scripts read their inputs from the JSON file named by this env var
+# (see scripts/originals/toolkit/params.py); "-" means stdin.
+PARAMS_ENV = "OPSHUB_PARAMS"
+
+
+def write_params(path: Path, injections: dict) -> Path:
+    """Write a job's inputs as JSON next to the job; the script source is never touched."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open('w', encoding='utf-8') as f:
+        json.dump(injections, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    return path
+
+
+def params_env(path: Path) -> dict:
+    return {PARAMS_ENV: str(path)}
@@ -0,0 +1,77 @@
+# backend/app/services/timings.py
+"""
+Per-job timing summary built from the scripts' spans.
+
+Scripts append one JSON record per timed step to the job's spans file
+(toolkit.spans, OPSHUB_SPANS); every shard of a job writes to the same file.
+When the job ends the runner summarises it: items done/failed, items/sec over
+the job's wall time, and count/total/p50/p95/max seconds per phase.
+"""
+import json
+from pathlib import Path
+
+from ..core.settings import settings
+
+
+def spans_path(job_id: str) -> Path:
+    return settings.runtime_dir / job_id / "spans.jsonl"
+
+
+def read_spans(path: Path) -> list:
+    records = []
+    try:
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # a line cut short by a killed process
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(records: list, wall_seconds: float) -> dict:
+    by_phase = {}
+    for r in records:
+        by_phase.setdefault(r.get("phase") or "?", []).append(r)
+    phases = {}
+    for phase, rs in sorted(by_phase.items()):
+        secs = [float(r.get("seconds") or 0.0) for r in rs]
+        phases[phase] = {
+            "count": len(rs),
+            "failed": sum(1 for r in rs if not r.get("ok", True)),
+            "total": round(sum(secs), 3),
+            "p50": round(percentile(secs, 50), 3),
+            "p95": round(percentile(secs, 95), 3),
+            "max": round(max(secs), 3),
+        }
+    items = by_phase.get("item", [])
+    failed = sum(1 for r in items if not r.get("ok", True))
+    return {
+        "wall_seconds": round(wall_seconds, 3),
+        "items_done": len(items) - failed,
+        "items_failed": failed,
+        "items_per_sec": round(len(items) / wall_seconds, 3) if wall_seconds > 0 else 0.0,
+        "phases": phases,
+    }
+
+
+def format_summary(summary: dict) -> str:
+    lines = [f"--- TIMINGS {summary['items_done']} items ok, {summary['items_failed']} failed, "
+             f"{summary['items_per_sec']:.2f} items/s over {summary['wall_seconds']:.1f}s"]
+    for phase, p in summary["phases"].items():
+        lines.append(f"---   {phase:<24} n={p['count']:<5} p50={p['p50']:.3f}s p95={p['p95']:.3f}s "
+                     f"max={p['max']:.3f}s total={p['total']:.1f}s" + (f" failed={p['failed']}" if p["failed"] else ""))
+    return "\n".join(lines) + "\n"
+
+
+def job_summary(job_id: str, wall_seconds: float) -> dict:
+    return summarize(read_spans(spans_path(job_id)), wall_seconds)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# scripts/dev/bench.py
+"""
+Offline benchmark of the scripts in scripts/originals.
+
+Starts the stand-in admin (mock_admin.py) and stand-in Google Sheets
+(mock_sheets.py) in-process, then runs each task's script exactly as the
+backend does (a subprocess with its inputs in OPSHUB_PARAMS), pointed at the
+stand-ins through the "admin_base_url" param. Per-item latency is taken from
+the stand-in's request log: from the first to the last request that belongs
+to the item (its change page, or its ?q= search). Reported per task: items/sec
+over the job's wall time and p50/p95/max item latency.
+
+    python scripts/dev/bench.py --items 50 --latency 0.03 --jitter 0.02 --per-page 20
+    python scripts/dev/bench.py --tasks ppt-to-video,s3-updater --engine selenium --json bench.json
+
+Each run starts with empty caches (cookies, URL index, lookups) unless --warm.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import mock_admin
+import mock_sheets
+
+ORIGINALS = Path(__file__).resolve().parents[1] / "originals"
+
+
+class Task:
+    def __init__(self, script: str, model: str, inputs, single: bool = False):
+        self.script = script
+        self.model = model
+        self.inputs = inputs    # (items, sheet_url) -> job params
+        self.single = single    # the whole job is one item
+
+    def items(self, state: mock_admin.AdminState, count: int):
+        if self.single:
+            return ["job"]
+        objects = state.objects[self.model]
+        if self.model == "nkb_question/questiontag":
+            return sorted({obj["tag_name"] for obj in objects.values()})[:count]
+        return list(objects)[:count]
+
+    def item_key(self, path: str, query: str):
+        base = f"/admin/{self.model}/"
+        if not path.startswith(base):
+            return None
+        if self.single:
+            return "job"
+        rest = path[len(base):]
+        if rest.endswith("/change/"):
+            return rest[:-len("/change/")]
+        q = parse_qs(query).get("q")
+        return q[0] if q else None
+
+
+TASKS = {
+    "ppt-to-video": Task("ppt_to_video_updater.py", "nkb_learning_resource/learningresource",
+                         lambda items, _: {"uuid_list": items}),
+    "s3-updater": Task("s3_url_updater.py", "nkb_interactive_video/multimedia",
+                       lambda items, _: {"multimedia_data": [
+                           {"multimedia_id": pk, "s3_url": f"https://media.example.test/{pk}.mp4"} for pk in items]}),
+    "duration-remover": Task("duration_remover.py", "nkb_resources/unit",
+                             lambda items, _: {"uuid_list": items}),
+    "question-ids": Task("getting_question_ids_for_tags.py", "nkb_question/questiontag",
+                         lambda items, _: {"tags": items}),
+    "sheet-loading": Task("sheet_loading.py", "nkb_load_data/contentloading",
+                          lambda _, sheet_url: {"GOOGLE_SHEET_URL": sheet_url}, single=True),
+}
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def _serve(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def run_task(name, task, args, admin, admin_url, sheet_url, work_dir: Path) -> dict:
+    state = admin.state
+    items = task.items(state, args.items)
+    runtime = work_dir / ("runtime" if args.warm else f"runtime-{name}")
+    params = {"admin_base_url": admin_url, "engine": args.engine, "headless": True,
+              **task.inputs(items, sheet_url)}
+    params_path = work_dir / f"{name}.params.json"
+    params_path.write_text(json.dumps(params), encoding="utf-8")
+    env = {**os.environ, "PYTHONUNBUFFERED": "1", "OPSHUB_PARAMS": str(params_path),
+           "OPSHUB_RUNTIME_DIR": str(runtime), "OPSHUB_HEADLESS": "1",
+           "OPSHUB_LEAN_BROWSER": "0" if args.full_browser else "1",
+           "OPSHUB_ADMIN_USERNAME": mock_admin.USERNAME, "OPSHUB_ADMIN_PASSWORD": mock_admin.PASSWORD}
+
+    with state.lock:
+        first_request = len(state.requests)
+    started = time.perf_counter()
+    with open(work_dir / f"{name}.log", "wb") as log:
+        try:
+            proc = subprocess.run([sys.executable, task.script], cwd=ORIGINALS, env=env,
+                                  stdout=log, stderr=subprocess.STDOUT, timeout=args.timeout)
+            exit_code = proc.returncode
+        except subprocess.TimeoutExpired:
+            exit_code = "timeout"
+    wall = time.perf_counter() - started
+    with state.lock:
+        requests = state.requests[first_request:]
+
+    spans = {}
+    for _, path, query, _, req_started, req_ended in requests:
+        key = task.item_key(path, query)
+        if key is None:
+            continue
+        first, last = spans.get(key, (req_started, req_ended))
+        spans[key] = (min(first, req_started), max(last, req_ended))
+    latencies = [last - first for key, (first, last) in spans.items() if key in items]
+    return {
+        "task": name,
+        "exit_code": exit_code,
+        "items": len(items),
+        "items_seen": len(latencies),
+        "wall_seconds": round(wall, 3),
+        "items_per_sec": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50": round(percentile(latencies, 50), 4),
+        "p95": round(percentile(latencies, 95), 4),
+        "max": round(max(latencies, default=0.0), 4),
+        "requests": len(requests),
+        "server_errors": sum(1 for r in requests if (r[3] or 0) >= 500),
+        "log": str(work_dir / f"{name}.log"),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--tasks", default=",".join(TASKS), help="comma-separated: " + ", ".join(TASKS))
+    ap.add_argument("--items", type=int, default=20, help="items per task (objects seeded per model)")
+    ap.add_argument("--per-page", type=int, default=100, help="changelist rows per page")
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every admin request")
+    ap.add_argument("--jitter", type=float, default=0.0, help="up to this many extra random seconds")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="share of admin pages answered with a 500")
+    ap.add_argument("--engine", default="auto", choices=("auto", "http", "selenium"))
+    ap.add_argument("--full-browser", action="store_true", help="turn lean browser mode off")
+    ap.add_argument("--warm", action="store_true", help="share caches across tasks instead of starting cold")
+    ap.add_argument("--timeout", type=float, default=600, help="seconds before a task is killed")
+    ap.add_argument("--seed", type=int, default=1, help="random seed for jitter and errors")
+    ap.add_argument("--keep", action="store_true", help="keep the work dir (logs, params, caches)")
+    ap.add_argument("--json", help="also write the results here")
+    args = ap.parse_args()
+
+    names = [n.strip() for n in args.tasks.split(",") if n.strip()]
+    unknown = [n for n in names if n not in TASKS]
+    if unknown:
+        ap.error(f"unknown task(s): {', '.join(unknown)}")
+
+    state = mock_admin.AdminState(args.per_page, args.latency, args.jitter, args.error_rate,
+                                  any_password=True, seed=args.seed).seed(args.items)
+    admin = mock_admin.make_server(state=state)
+    sheets = mock_sheets.make_server()
+    sheets.state.add(mock_sheets.DEMO_ID, "Bench Sheet", ["Resources", "Units", "Questions"])
+    admin_url = _serve(admin)
+    sheet_url = f"{_serve(sheets)}/spreadsheets/d/{mock_sheets.DEMO_ID}/edit"
+
+    work_dir = Path(tempfile.mkdtemp(prefix="opshub-bench-"))
+    results = []
+    try:
+        for name in names:
+            print(f"… {name}", flush=True)
+            results.append(run_task(name, TASKS[name], args, admin, admin_url, sheet_url, work_dir))
+    finally:
+        admin.shutdown()
+        sheets.shutdown()
+
+    print(f"\n{'task':<18}{'exit':>8}{'items':>9}{'wall s':>9}{'items/s':>9}"
+          f"{'p50 s':>9}{'p95 s':>9}{'max s':>9}{'reqs':>7}{'5xx':>5}")
+    for r in results:
+        print(f"{r['task']:<18}{str(r['exit_code']):>8}{r['items_seen']:>4}/{r['items']:<4}{r['wall_seconds']:>9.2f}"
+              f"{r['items_per_sec']:>9.2f}{r['p50']:>9.3f}{r['p95']:>9.3f}{r['max']:>9.3f}"
+              f"{r['requests']:>7}{r['server_errors']:>5}")
+    if args.json:
+        Path(args.json).write_text(json.dumps({"args": vars(args), "results": results}, indent=2), encoding="utf-8")
+    if args.keep:
+        print(f"\nLogs and params in {work_dir}")
+    else:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    if any(r["exit_code"] != 0 for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+# scripts/dev/mock_admin.py
+"""
+Stand-in Django admin for exercising the automation without touching a real
+environment.
+
+It speaks just enough of the admin to look real to both Selenium and
+toolkit.admin_http: a login form, session and CSRF cookies, changelists with
+?q= search, change forms (text inputs, textareas, selects, labels) that
+validate, redirect and flash a success message, and a redirect to
+/admin/login/?next=... when the session is missing.
+
+Models served (all keyed by UUID):
+    /admin/nkb_learning_resource/learningresource/   (ppt_to_video_updater)
+    /admin/nkb_resources/unit/                       (duration_remover)
+    /admin/nkb_interactive_video/multimedia/         (s3_url_updater)
+    /admin/nkb_question/questiontag/                 (getting_question_ids_for_tags)
+    /admin/nkb_load_data/contentloading/add/         (sheet_loading)
+
+Changelists are paginated like Django's (?p=1.., list_per_page rows each) and
+search every column.
+
+For benchmarks (scripts/dev/bench.py) every request can be slowed down
+(latency + random jitter) and a share of admin pages answered with a 500;
+each request is recorded in state.requests with its timings.
+
+    python scripts/dev/mock_admin.py --port 8765 --seed 100 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import html
+import json
+import random
+import secrets
+import threading
+import time
+import uuid
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlencode, urlsplit
+
+USERNAME = "content_loader"
+PASSWORD = "secret"
+
+# model path -> [(field name, label, kind, choices)]
+MODELS = {
+    "nkb_learning_resource/learningresource": [
+        ("title", "Title", "text", None),
+        ("title_en", "Title en", "text", None),
+        ("content", "Content", "textarea", None),
+        ("content_en", "Content en", "textarea", None),
+        ("content_format", "Content format", "select", ("TEXT", "MARKDOWN", "HTML", "PPT")),
+        ("content_format_en", "Content format en", "select", ("TEXT", "MARKDOWN", "HTML", "PPT")),
+        ("learning_resource_type", "Learning resource type", "select",
+         ("LEARNING_SET", "INTERACTIVE_VIDEO", "PPT")),
+    ],
+    "nkb_resources/unit": [
+        ("unit_name", "Unit name", "text", None),
+        ("duration_in_sec", "Duration in sec", "number", None),
+    ],
+    "nkb_interactive_video/multimedia": [
+        ("multimedia_url", "Multimedia URL", "url", None),
+        ("multimedia_type", "Multimedia type", "select", ("VIDEO", "AUDIO")),
+    ],
+    "nkb_question/questiontag": [
+        ("question_id", "Question id", "text", None),
+        ("tag_name", "Tag name", "text", None),
+    ],
+    "nkb_load_data/contentloading": [
+        ("input_data", "Input data", "json", None),
+    ],
+}
+
+
+class AdminState:
+    """Objects, sessions and counters shared by all request handlers."""
+
+    def __init__(self, list_per_page: int = 100, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, any_password: bool = False, seed=None):
+        self.list_per_page = list_per_page
+        self.latency = latency          # seconds added to every request
+        self.jitter = jitter            # plus up to this much, uniformly random
+        self.error_rate = error_rate    # share of admin pages answered with a 500
+        self.any_password = any_password
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.objects = {model: {} for model in MODELS}
+        self.sessions = set()
+        self.counters = {"logins": 0, "gets": 0, "saves": 0, "rejected": 0, "errors": 0}
+        # (method, path, query, status, started, ended) per request, perf_counter seconds
+        self.requests = []
+
+    def seed(self, count: int):
+        for model, fields in MODELS.items():
+            for n in range(count):
+                pk = str(uuid.uuid4())
+                self.objects[model][pk] = {name: _initial(kind, choices, n) for name, _, kind, choices in fields}
+                if model == "nkb_question/questiontag":
+                    self.objects[model][pk].update(question_id=str(uuid.uuid4()), tag_name=f"TAG_{n % 10}")
+        return self
+
+    def add(self, model: str, pk: str, **values):
+        fields = MODELS[model]
+        obj = {name: _initial(kind, choices, 0) for name, _, kind, choices in fields}
+        obj.update(values)
+        self.objects[model][pk] = obj
+        return obj
+
+
+def _initial(kind, choices, n):
+    if kind == "select":
+        return choices[-1]
+    if kind == "number":
+        return str(60 + n)
+    if kind == "json":
+        return "{}"
+    return f"value {n}"
+
+
+def _page(title: str, body: str, messages=()) -> bytes:
+    items = "".join(f'<li class="{level}">{html.escape(text)}</li>' for level, text in messages)
+    msg = f'<ul class="messagelist">{items}</ul>' if items else ""
+    return (f"<!DOCTYPE html><html><head><title>{html.escape(title)} | Django site admin</title></head>"
+            f'<body><div id="container"><div id="header"><h1>Django administration</h1></div>'
+            f'{msg}<div id="content"><h1>{html.escape(title)}</h1>{body}</div></div></body></html>').encode("utf-8")
+
+
+class AdminHandler(BaseHTTPRequestHandler):
+    state: AdminState = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):
+        pass
+
+    # -- helpers ---------------------------------------------------------------
+    def _cookies(self) -> dict:
+        jar = SimpleCookie(self.headers.get("Cookie", ""))
+        return {k: m.value for k, m in jar.items()}
+
+    def _send(self, status: int, body: bytes = b"", headers=None):
+        self.send_response(status)
+        for k, v in headers or ():
+            self.send_header(k, v)
+        if body:
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _redirect(self, location: str, cookies=(), flash=None):
+        self.send_response(302)
+        self.send_header("Location", location)
+        for c in cookies:
+            self.send_header("Set-Cookie", c)
+        if flash:
+            self.send_header("Set-Cookie", f"messages={quote(flash)}; Path=/")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _form(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        ctype = self.headers.get("Content-Type", "")
+        if ctype.startswith("multipart/form-data"):
+            return _parse_multipart(raw, ctype)
+        return {k: v[-1] for k, v in parse_qs(raw.decode("utf-8"), keep_blank_values=True).items()}
+
+    def _csrf(self, headers: list) -> str:
+        token = self._cookies().get("csrftoken")
+        if not token:
+            token = secrets.token_hex(16)
+            headers.append(("Set-Cookie", f"csrftoken={token}; Path=/; SameSite=Lax"))
+        return token
+
+    def _csrf_ok(self, form: dict) -> bool:
+        token = self._cookies().get("csrftoken")
+        return bool(token) and form.get("csrfmiddlewaretoken") == token
+
+    def _logged_in(self) -> bool:
+        return self._cookies().get("sessionid") in self.state.sessions
+
+    def _route(self):
+        path = urlsplit(self.path).path
+        for model in MODELS:
+            base = f"/admin/{model}/"
+            if path == base:
+                return model, None
+            if path == base + "add/":
+                return model, "add"
+            if path.startswith(base) and path.endswith("/change/"):
+                return model, path[len(base):-len("/change/")]
+        return None, None
+
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+
+    def _timed(self, method, handle):
+        started = time.perf_counter()
+        self._status = None
+        state = self.state
+        with state.lock:
+            delay = state.latency + (state.random.uniform(0, state.jitter) if state.jitter else 0.0)
+            fail = state.error_rate and state.random.random() < state.error_rate
+        if delay:
+            time.sleep(delay)
+        parts = urlsplit(self.path)
+        try:
+            if fail and parts.path.startswith("/admin/") and parts.path != "/admin/login/":
+                if method == "POST":
+                    self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                with state.lock:
+                    state.counters["errors"] += 1
+                self._send(500, b"<h1>Server Error (500)</h1>")
+            else:
+                handle()
+        finally:
+            with state.lock:
+                state.requests.append((method, parts.path, parts.query, self._status, started, time.perf_counter()))
+
+    # -- HTTP ------------------------------------------------------------------
+    def do_GET(self):
+        self._timed("GET", self._get)
+
+    def do_POST(self):
+        self._timed("POST", self._post)
+
+    def _get(self):
+        with self.state.lock:
+            self.state.counters["gets"] += 1
+        parts = urlsplit(self.path)
+        if parts.path == "/admin/login/":
+            return self._login_page()
+        if not self._logged_in():
+            return self._redirect(f"/admin/login/?next={quote(parts.path)}")
+        model, pk = self._route()
+        if model is None:
+            return self._send(404, _page("Not found", "<p>Not found</p>"))
+        flash = self._cookies().get("messages")
+        messages = [("success", unquote(flash))] if flash else []
+        headers = [("Set-Cookie", "messages=; Path=/; Max-Age=0")] if flash else []
+        if pk == "add":
+            body = self._change_form(model, None, {}, self._csrf(headers))
+            self._send(200, _page(f"Add {model}", body, messages), headers)
+        elif pk is None:
+            query = parse_qs(parts.query)
+            q = query.get("q", [""])[0]
+            page = int(query.get("p", ["1"])[0] or 1)
+            self._send(200, _page(f"Select {model} to change", self._changelist(model, q, page), messages), headers)
+        elif pk not in self.state.objects[model]:
+            self._send(404, _page("Not found", "<p>Object does not exist</p>"))
+        else:
+            body = self._change_form(model, pk, self.state.objects[model][pk], self._csrf(headers))
+            self._send(200, _page(f"Change {model}", body, messages), headers)
+
+    def _post(self):
+        parts = urlsplit(self.path)
+        form = self._form()
+        if not self._csrf_ok(form):
+            return self._send(403, _page("Forbidden", "<p>CSRF verification failed. Request aborted.</p>"))
+        if parts.path == "/admin/login/":
+            return self._login(form, parse_qs(parts.query).get("next", ["/admin/"])[0])
+        if not self._logged_in():
+            return self._redirect(f"/admin/login/?next={quote(parts.path)}")
+        model, pk = self._route()
+        if model is None or pk is None or (pk != "add" and pk not in self.state.objects[model]):
+            return self._send(404, _page("Not found", "<p>Not found</p>"))
+        errors = _validate(model, form)
+        if errors:
+            with self.state.lock:
+                self.state.counters["rejected"] += 1
+            headers = []
+            body = self._change_form(model, None if pk == "add" else pk, form, self._csrf(headers), errors)
+            return self._send(200, _page(f"Change {model}", body), headers)
+        with self.state.lock:
+            if pk == "add":
+                pk = str(uuid.uuid4())
+                self.state.objects[model][pk] = {}
+            obj = self.state.objects[model][pk]
+            for name, _, _, _ in MODELS[model]:
+                obj[name] = form.get(name, "")
+            self.state.counters["saves"] += 1
+        if "_continue" in form or "_view" in form:
+            return self._redirect(f"/admin/{model}/{pk}/change/", flash=f'The object "{pk}" was saved successfully.')
+        self._redirect(f"/admin/{model}/", flash=f'The object "{pk}" was changed successfully.')
+
+    # -- pages -------------------------------------------------------------------
+    def _login_page(self, error=None):
+        headers = []
+        token = self._csrf(headers)
+        note = f'<p class="errornote">{html.escape(error)}</p>' if error else ""
+        body = (f'{note}<form action="" method="post" id="login-form">'
+                f'<input type="hidden" name="csrfmiddlewaretoken" value="{token}">'
+                '<label for="id_username">Username:</label><input type="text" name="username" id="id_username">'
+                '<label for="id_password">Password:</label><input type="password" name="password" id="id_password">'
+                '<input type="submit" value="Log in"></form>')
+        self._send(200, _page("Log in", body), headers)
+
+    def _login(self, form, next_url):
+        if form.get("username") != USERNAME or (form.get("password") != PASSWORD and not self.state.any_password):
+            return self._login_page("Please enter the correct username and password.")
+        sid = secrets.token_hex(16)
+        with self.state.lock:
+            self.state.sessions.add(sid)
+            self.state.counters["logins"] += 1
+        self._redirect(next_url or "/admin/", cookies=[f"sessionid={sid}; Path=/; HttpOnly; SameSite=Lax"])
+
+    def _changelist(self, model, q, page=1):
+        objects = self.state.objects[model]
+        rows = [pk for pk, obj in objects.items() if not q or q in pk or any(q in v for v in obj.values())]
+        per_page = self.state.list_per_page
+        pages = max(1, -(-len(rows) // per_page))
+        page = min(max(page, 1), pages)
+        fields = MODELS[model]
+        trs = "".join(
+            f'<tr><th class="field-id"><a href="/admin/{model}/{pk}/change/">{pk}</a></th>'
+            + "".join(f'<td class="field-{name}">{html.escape(objects[pk].get(name, ""))}</td>' for name, *_ in fields)
+            + "</tr>"
+            for pk in rows[(page - 1) * per_page:page * per_page]
+        )
+        heads = "".join(f"<th>{html.escape(label)}</th>" for _, label, *_ in fields)
+        return ('<div id="changelist"><form id="changelist-search" method="get">'
+                f'<input type="text" name="q" id="searchbar" value="{html.escape(q)}"></form>'
+                f'<table id="result_list"><thead><tr><th><a href="?o=1">ID</a></th>{heads}</tr></thead>'
+                f'<tbody>{trs}</tbody></table>{_paginator(q, page, pages, len(rows))}</div>')
+
+    def _change_form(self, model, pk, values, token, errors=None):
+        rows = []
+        for name, label, kind, choices in MODELS[model]:
+            value = html.escape(values.get(name, ""))
+            if kind in ("textarea", "json"):
+                widget = f'<textarea name="{name}" id="id_{name}" rows="10">\n{value}</textarea>'
+            elif kind == "select":
+                opts = "".join(f'<option value="{c}"{" selected" if c == values.get(name) else ""}>{c}</option>'
+                               for c in choices)
+                widget = f'<select name="{name}" id="id_{name}"><option value="">---------</option>{opts}</select>'
+            else:
+                widget = f'<input type="{kind}" name="{name}" value="{value}" id="id_{name}">'
+            err = (errors or {}).get(name)
+            err_html = f'<ul class="errorlist"><li>{html.escape(err)}</li></ul>' if err else ""
+            rows.append(f'<div class="form-row field-{name}">{err_html}'
+                        f'<label for="id_{name}">{label}:</label>{widget}</div>')
+        note = '<p class="errornote">Please correct the error below.</p>' if errors else ""
+        return (f'<form enctype="multipart/form-data" method="post" id="{model.split("/")[1]}_form" novalidate>'
+                f'<input type="hidden" name="csrfmiddlewaretoken" value="{token}">{note}'
+                f'<fieldset class="module aligned">{"".join(rows)}</fieldset>'
+                '<div class="submit-row"><input type="submit" value="Save" class="default" name="_save">'
+                '<input type="submit" value="Save and continue editing" name="_continue">'
+                '<input type="submit" value="Save and view" name="_view"></div></form>')
+
+
+def _paginator(q, page, pages, count) -> str:
+    """Django-style page links: first/last two pages and a window around the current one."""
+    links = []
+    shown = {n for n in range(1, pages + 1) if n <= 2 or n > pages - 2 or abs(n - page) <= 2}
+    for n in range(1, pages + 1):
+        if n not in shown:
+            if links and links[-1] != "…":
+                links.append("…")
+            continue
+        if n == page:
+            links.append(f'<span class="this-page">{n}</span>')
+        else:
+            links.append(f'<a href="?{html.escape(urlencode({"q": q, "p": n}))}">{n}</a>')
+    nav = " ".join(links) if pages > 1 else ""
+    return f'<p class="paginator">{nav} {count} results</p>'
+
+
+def _validate(model, form) -> dict:
+    errors = {}
+    for name, _, kind, choices in MODELS[model]:
+        value = form.get(name, "")
+        if kind == "select" and value and value not in choices:
+            errors[name] = f"Select a valid choice. {value} is not one of the available choices."
+        elif kind == "number" and value.strip() and not value.strip().isdigit():
+            errors[name] = "Enter a whole number."
+        elif kind == "json":
+            try:
+                json.loads(value)
+            except ValueError:
+                errors[name] = "Enter a valid JSON."
+    return errors
+
+
+def _parse_multipart(raw: bytes, ctype: str) -> dict:
+    from email.parser import BytesParser
+    from email.policy import HTTP
+    msg = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {ctype}\r\n\r\n".encode() + raw)
+    form = {}
+    for part in msg.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name and part.get_filename() is None:
+            form[name] = part.get_payload(decode=True).decode("utf-8")
+    return form
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, state: AdminState = None):
+    """A ready-to-serve stand-in admin; port 0 picks a free port (see server.server_port)."""
+    handler = type("Handler", (AdminHandler,), {"state": state or AdminState()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = handler.state
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--seed", type=int, default=20, help="objects to create per model")
+    ap.add_argument("--per-page", type=int, default=100, help="changelist rows per page")
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    ap.add_argument("--jitter", type=float, default=0.0, help="up to this many extra random seconds")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="share of admin pages answered with a 500")
+    ap.add_argument("--any-password", action="store_true", help=f"accept any password for {USERNAME}")
+    args = ap.parse_args()
+    state = AdminState(args.per_page, args.latency, args.jitter, args.error_rate, args.any_password)
+    server = make_server(args.host, args.port, state.seed(args.seed))
+    print(f"Stand-in admin on http://{args.host}:{server.server_port}/admin/ "
+          f"(login {USERNAME} / {PASSWORD})", flush=True)
+    for model, objects in server.state.objects.items():
+        print(f"  {model}: e.g. /admin/{model}/{next(iter(objects), '-')}/change/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# scripts/dev/mock_sheets.py
+"""
+Stand-in Google Sheets for exercising sheet_loading without a real sheet.
+
+Serves the two pages toolkit.google_sheets reads, with the same markup
+Google uses for the parts we care about:
+
+    /spreadsheets/d/<id>/edit       <title>NAME - Google Sheets</title> and the
+                                    .docs-sheet-tab-name tab bar
+    /spreadsheets/d/<id>/htmlview   the static viewer's li#sheet-button-N menu
+
+Sheets marked private redirect to /ServiceLogin, like a sheet that is not
+shared by link. Sheets with editor_tabs=False leave the tab bar out of the
+editor HTML (Google sometimes renders it client-side), so only the viewer
+has the names.
+
+    python scripts/dev/mock_sheets.py --port 8766
+"""
+import argparse
+import html
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, urlsplit
+
+DEMO_ID = "1demoSheetId_0123456789"
+
+
+class SheetsState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sheets = {}
+        self.counters = {"gets": 0, "signin": 0}
+
+    def add(self, sheet_id: str, title: str, tabs, public: bool = True, editor_tabs: bool = True):
+        self.sheets[sheet_id] = {"title": title, "tabs": list(tabs), "public": public, "editor_tabs": editor_tabs}
+        return self
+
+
+class SheetsHandler(BaseHTTPRequestHandler):
+    state: SheetsState = None
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers=None):
+        self.send_response(status)
+        for k, v in headers or ():
+            self.send_header(k, v)
+        if body:
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        with self.state.lock:
+            self.state.counters["gets"] += 1
+        path = urlsplit(self.path).path
+        if path == "/ServiceLogin":
+            with self.state.lock:
+                self.state.counters["signin"] += 1
+            return self._send(200, b"<html><head><title>Sign in - Google Accounts</title></head><body></body></html>")
+        bits = path.strip("/").split("/")
+        if len(bits) != 4 or bits[:2] != ["spreadsheets", "d"] or bits[3] not in ("edit", "htmlview"):
+            return self._send(404, b"<h1>Not found</h1>")
+        sheet = self.state.sheets.get(bits[2])
+        if sheet is None:
+            return self._send(404, b"<h1>Not found</h1>")
+        if not sheet["public"]:
+            return self._send(302, headers=[("Location", "/ServiceLogin?continue=" + quote(self.path, safe=""))])
+        page = self._editor(sheet) if bits[3] == "edit" else self._viewer(sheet)
+        self._send(200, page.encode())
+
+    def _editor(self, sheet) -> str:
+        title = html.escape(sheet["title"])
+        tabs = ""
+        if sheet["editor_tabs"]:
+            tabs = "".join(
+                f'<div class="docs-sheet-tab" role="tab" aria-label="{html.escape(t)}">'
+                f'<div class="docs-sheet-tab-name">{html.escape(t)}</div></div>'
+                for t in sheet["tabs"])
+        return (f'<!doctype html><html><head><title>{title} - Google Sheets</title>'
+                f'<meta property="og:title" content="{title}"></head>'
+                f'<body><div id="docs-editor"></div><div class="docs-sheet-container-bar">{tabs}</div></body></html>')
+
+    def _viewer(self, sheet) -> str:
+        title = html.escape(sheet["title"])
+        items = "".join(
+            f'<li id="sheet-button-{n}" class="switcherItem"><a href="#">{html.escape(t)}</a></li>'
+            for n, t in enumerate(sheet["tabs"]))
+        return (f'<!doctype html><html><head><title>{title} - Google Drive</title></head>'
+                f'<body><div id="doc-title"><span class="name">{title}</span></div>'
+                f'<ul id="sheet-menu">{items}</ul><div id="sheets-viewport"></div></body></html>')
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, state: SheetsState = None):
+    """A ready-to-serve stand-in; port 0 picks a free port (see server.server_port)."""
+    handler = type("Handler", (SheetsHandler,), {"state": state or SheetsState()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.state = handler.state
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8766)
+    args = ap.parse_args()
+    state = SheetsState()
+    state.add(DEMO_ID, "Demo Content Sheet", ["Resources", "Units", "Questions"])
+    state.add("private_" + DEMO_ID, "Private Sheet", ["Hidden"], public=False)
+    server = make_server(args.host, args.port, state)
+    print(f"Stand-in sheets on http://{args.host}:{server.server_port}/", flush=True)
+    for sheet_id in state.sheets:
+        print(f"  http://{args.host}:{server.server_port}/spreadsheets/d/{sheet_id}/edit")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
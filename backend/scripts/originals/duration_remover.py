@@ -1,19 +1,20 @@
 from flask import Flask, request, redirect, url_for, render_template_string
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException, ElementNotInteractableException
 import traceback
 import time
+import sys
 import os
 from typing import Optional
 from selenium.webdriver.chrome.options import Options
 
+from toolkit import params, browser, sessions, admin_http, waits, url_index, spans, retry
+
 chrome_opts = Options()
 # your existing args...
 chrome_opts.add_argument("--disable-extensions")  # ← disables all extensions
@@ -25,6 +26,11 @@ chrome_opts.add_argument(f"--user-data-dir={tmp_profile}")
 
 app = Flask(__name__)
 
+# Defaults for backend jobs (the Flask form below lets you override them by hand)
+LOGIN_URL = params.admin_url("https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/login/")
+TARGET_URL = params.admin_url("https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/nkb_resources/unit/")
+USERNAME = "content_loader"  # unless OPSHUB_ADMIN_USERNAME says otherwise (see params.admin_credentials)
+
 # ------------------ HTML TEMPLATES (inline for simplicity) ------------------
 FORM_HTML = """
 <!doctype html>
@@ -127,24 +133,30 @@ def make_driver(headless: bool = True, profile_dir: Optional[str] = None) -> web
     opts.add_argument("--disable-dev-shm-usage")
     if headless:
         opts.add_argument("--headless=new")
-    service = Service(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=opts)
+    return browser.make_chrome(opts)
 
 def login_if_needed(driver, wait, target_url: str, login_url: str, username: str, password: str, log):
     """Open target; if redirected to login, perform login and return to target."""
+    restored = sessions.restore(driver, login_url)
     driver.get(target_url)
-    time.sleep(1.0)
+    waits.page_ready(driver)
     cur = driver.current_url
     if "/login" in cur or "/login/" in cur:
         log.append(f"- Redirected to login; performing login at: {login_url}")
-        driver.get(login_url)
-        u = wait.until(EC.presence_of_element_located((By.ID, "id_username")))
-        u.clear(); u.send_keys(username)
-        p = wait.until(EC.presence_of_element_located((By.ID, "id_password")))
-        p.clear(); p.send_keys(password + Keys.RETURN)
-        wait.until(EC.url_contains("/admin/"))
+        with spans.span("login"):
+            sessions.forget(login_url)
+            driver.get(login_url)
+            u = wait.until(EC.presence_of_element_located((By.ID, "id_username")))
+            u.clear(); u.send_keys(username)
+            p = wait.until(EC.presence_of_element_located((By.ID, "id_password")))
+            p.clear(); p.send_keys(password + Keys.RETURN)
+            waits.after_login(driver, login_url)
+            sessions.save(driver, login_url)
         driver.get(target_url)
         wait.until(EC.url_contains("/admin/"))
+    elif restored:
+        spans.event("login_reused")
+        log.append("- Reused cached admin session (no login needed).")
     else:
         log.append("- Already authenticated (no login redirect).")
 
@@ -155,6 +167,7 @@ def recover_if_logged_out(driver, target_url: str, login_url: str, username: str
         log.append("- Detected logged-out state; recovering...")
         login_if_needed(driver, wait, target_url, login_url, username, password, log)
 
+@spans.timed("search_uuid")
 def search_uuid(driver, wait, uid: str, log) -> bool:
     """Search a UUID on the changelist and click the result. Returns True if opened."""
     # Scope strictly to the changelist search form to avoid header links.
@@ -197,6 +210,7 @@ def search_uuid(driver, wait, uid: str, log) -> bool:
     wait.until(EC.url_contains("/change/"))
     return True
 
+@spans.timed("clear_duration_and_save")
 def clear_duration_and_save(driver, wait, log):
     """On the change form page, clear 'Duration in sec:' and click Save."""
     duration_input = wait.until(
@@ -209,47 +223,159 @@ def clear_duration_and_save(driver, wait, log):
     except Exception:
         duration_input.send_keys(Keys.CONTROL, "a"); duration_input.send_keys(Keys.DELETE)
 
+    change_url = driver.current_url
     save_btn = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input[name='_save']")))
     save_btn.click()
-    wait.until(EC.url_contains("/admin/nkb_resources/unit/"))
+    # The change URL also lives under /admin/nkb_resources/unit/, so wait for Django's answer.
+    result = waits.save_result(driver, change_url)
+    if not result["ok"]:
+        raise RuntimeError("Save failed: " + ("; ".join(result["errors"]) or "no response from admin"))
     log.append("  - Cleared duration and saved")
 
+def clear_durations_http(login_url: str, target_url: str, username: str, password: str,
+                         uuids: list[str], log, index, policy) -> list[str]:
+    """Fast path: search + clear + save over plain HTTP. Returns the UUIDs that need the browser."""
+    client = admin_http.AdminClient(login_url, username, password)
+
+    def clear(uid: str):
+        """One attempt; returns "indexed" / "searched" for how the change page was found, None if not found."""
+        change_url = index.get(target_url, uid)
+        if change_url is not None:
+            try:
+                client.change(change_url, labels={"Duration in sec": ""})
+                return "indexed"
+            except admin_http.NotFound:
+                index.forget(target_url, uid)
+        # Index miss (or stale entry): find it through the changelist search
+        change_url = client.find_change_url(target_url, uid)
+        if change_url is None:
+            return None
+        index.put(target_url, uid, change_url)
+        client.change(change_url, labels={"Duration in sec": ""})
+        return "searched"
+
+    pending = []
+    for idx, uid in enumerate(uuids, 1):
+        with spans.span("item", item=uid, engine="http") as item:
+            try:
+                found = policy.run(lambda: clear(uid), item=uid)
+                if found is None:
+                    item["ok"] = False
+                    log.append(f"[{idx}/{len(uuids)}] ! Skipping {uid} (not found)")
+                else:
+                    log.append(f"[{idx}/{len(uuids)}] ✓ Done: {uid} (http{', indexed' if found == 'indexed' else ''})")
+            except admin_http.ChangeRejected as e:
+                item["ok"] = False
+                log.append(f"[{idx}/{len(uuids)}] ! Error with {uid}: {e}")
+            except admin_http.FormError as e:
+                # Handed to the browser, which records the item's outcome.
+                item["phase"] = "http_attempt"
+                log.append(f"[{idx}/{len(uuids)}] - {uid}: HTTP path unavailable ({e}); using the browser")
+                pending.append(uid)
+    return pending
+
 def run_job(login_url: str, target_url: str, username: str, password: str, uuids: list[str],
-            headless: bool = False, profile_dir: Optional[str] = None) -> str:
-    """Orchestrates the full workflow and returns a text log."""
-    log = []
+            headless: bool = False, profile_dir: Optional[str] = None, engine: str = "auto",
+            policy: Optional[retry.Policy] = None, log=None) -> str:
+    """Orchestrates the full workflow and returns a text log.
+
+    engine: "auto" tries the HTTP fast path first and falls back to Selenium per
+    UUID; "http" or "selenium" force one of them. Each UUID is retried per
+    policy (toolkit.retry); if its circuit breaker gives up on the admin the
+    job stops early and says so in the log.
+
+    log is where lines go as they happen (anything with append(); default a
+    list). Only a list is joined into the returned text; backend jobs pass a
+    StreamLog so each line reaches the job log immediately.
+    """
+    log = [] if log is None else log
+    if policy is None:
+        policy = retry.Policy(log=log.append)
+    # UUID -> change URL, shared across jobs, so the changelist search only runs on a miss
+    index = url_index.UrlIndex()
+    try:
+        if engine != "selenium":
+            log.append(f"Target list: {target_url}")
+            uuids = clear_durations_http(login_url, target_url, username, password, uuids, log, index, policy)
+            if engine == "http":
+                for uid in uuids:
+                    log.append(f"   ! Not done: {uid}")
+                uuids = []
+        if uuids:
+            clear_durations_selenium(login_url, target_url, username, password, uuids, log, index, policy,
+                                     headless=headless, profile_dir=profile_dir)
+    except retry.CircuitOpen as e:
+        log.append(f"! Stopped early: {e}. Resume the job to run the UUIDs that were not done.")
+    finally:
+        if policy.retries:
+            log.append(f"Retries: {policy.retries}")
+        log.append(f"URL index: {index.hits} hits, {index.misses} misses, {index.stale} stale")
+        index.close()
+    return "\n".join(log) if isinstance(log, list) else ""
+
+
+class StreamLog:
+    """run_job log sink for backend jobs: every line is printed and flushed at once."""
+
+    def append(self, line: str):
+        print(line, flush=True)
+
+@spans.timed("navigation")
+def open_change_page(driver, wait, change_url: str) -> bool:
+    """Go straight to an indexed change page; False if it no longer is one."""
+    driver.get(change_url)
+    try:
+        waits.element(driver, (By.CSS_SELECTOR, "form[method='post'] input[name='csrfmiddlewaretoken']"))
+    except TimeoutException:
+        return False
+    # A missing object sends Django back to the admin index instead.
+    return "/change/" in driver.current_url
+
+def clear_durations_selenium(login_url: str, target_url: str, username: str, password: str, uuids: list[str],
+                             log, index, policy, headless: bool = False, profile_dir: Optional[str] = None):
     driver = make_driver(headless=headless, profile_dir=profile_dir)
     wait = WebDriverWait(driver, 20)
 
+    def clear(uid: str) -> bool:
+        """One attempt; False if the UUID is not in the admin."""
+        recover_if_logged_out(driver, target_url, login_url, username, password, wait, log)
+        change_url = index.get(target_url, uid)
+        if change_url is not None and not open_change_page(driver, wait, change_url):
+            index.forget(target_url, uid)
+            change_url = None
+        if change_url is None:
+            driver.get(target_url)
+            wait.until(EC.presence_of_element_located((By.ID, "changelist-search")))
+            if not search_uuid(driver, wait, uid, log):
+                return False
+            index.put(target_url, uid, driver.current_url)
+        clear_duration_and_save(driver, wait, log)
+        return True
+
     try:
         log.append(f"Target list: {target_url}")
         login_if_needed(driver, wait, target_url, login_url, username, password, log)
 
         for idx, uid in enumerate(uuids, 1):
-            try:
-                recover_if_logged_out(driver, target_url, login_url, username, password, wait, log)
-                driver.get(target_url)
-                wait.until(EC.presence_of_element_located((By.ID, "changelist-search")))
+            with spans.span("item", item=uid, engine="selenium") as item:
                 log.append(f"[{idx}/{len(uuids)}] Processing {uid} …")
-
-                opened = search_uuid(driver, wait, uid, log)
-                if not opened:
-                    log.append(f"   ! Skipping {uid} (not found)")
-                    continue
-
-                clear_duration_and_save(driver, wait, log)
-
-                # Go back to base list (clear any filters)
-                driver.get(target_url)
-                wait.until(EC.presence_of_element_located((By.ID, "changelist-search")))
-                log.append(f"   ✓ Done: {uid}")
-            except Exception as e:
-                log.append(f"   ! Error with {uid}: {e}")
-                log.append(traceback.format_exc())
                 try:
-                    driver.get(target_url)
-                except Exception:
-                    pass
+                    if not policy.run(lambda: clear(uid), item=uid):
+                        item["ok"] = False
+                        log.append(f"   ! Skipping {uid} (not found)")
+                        continue
+                    log.append(f"   ✓ Done: {uid}")
+                except retry.CircuitOpen:
+                    raise
+                except Exception as e:
+                    item["ok"] = False
+                    item["error"] = type(e).__name__
+                    log.append(f"   ! Error with {uid}: {e}")
+                    log.append(traceback.format_exc())
+                    try:
+                        driver.get(target_url)
+                    except Exception:
+                        pass
     finally:
         try:
             # keep the browser open for a brief moment if not headless
@@ -259,8 +385,6 @@ def run_job(login_url: str, target_url: str, username: str, password: str, uuids
         except Exception:
             pass
 
-    return "\n".join(log)
-
 # ------------------ FLASK ROUTES ------------------
 
 @app.get("/")
@@ -306,5 +430,26 @@ def run_task():
     return render_template_string(RESULT_HTML, log=log_text)
 
 if __name__ == "__main__":
-    # Run locally
-    app.run(debug=True)
+    if params.provided():
+        # Backend job: inputs come from the job params, log lines stream to stdout
+        try:
+            username, password = params.admin_credentials(USERNAME)
+        except params.MissingCredentials as e:
+            sys.exit(str(e))
+        policy = retry.Policy()
+        run_job(
+            login_url=LOGIN_URL,
+            target_url=TARGET_URL,
+            username=username,
+            password=password,
+            uuids=params.get("uuid_list", []),
+            engine=params.get("engine", "auto"),
+            headless=params.headless(False),
+            policy=policy,
+            log=StreamLog(),
+        )
+        if policy.stopped:
+            sys.exit(1)
+    else:
+        # Run locally
+        app.run(debug=True)
@@ -4,28 +4,29 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict
 from threading import Thread
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import quote
 from datetime import datetime
+import time
 import uuid
 import traceback
 
 # ---------------- Selenium imports ----------------
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.keys import Keys
 
+from toolkit import params, browser, sessions, waits, admin_http, lookup_cache, spans
+
 # ---------------------------------------
 # 🔧 Your Constants
 # ---------------------------------------
-LOGIN_URL = "https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/login/"
-TARGET_URL = "https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/nkb_question/questiontag/?q={}"
-USERNAME = "content_loader"
-PASSWORD = "C"
+LOGIN_URL = params.admin_url("https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/login/")
+TARGET_URL = params.admin_url("https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/nkb_question/questiontag/?q={}")
+USERNAME = "content_loader"  # unless OPSHUB_ADMIN_USERNAME says otherwise (see params.admin_credentials)
 
 # ✅ UPDATED OUTPUT FILE PATH
 OUTPUT_FILE_PATH = "/home/nxtwavetech/Videos/config-ops-hub/backend/scripts/originals/question_ids.txt"
@@ -57,6 +58,7 @@ jobs: Dict[str, Job] = {}
 def _log(job: Job, msg: str):
     ts = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
     job.log += f"[{ts}] {msg}\n"
+    print(f"[{ts}] {msg}", flush=True)
 
 # ---------------------------------------
 # Request format coming from FRONTEND
@@ -69,6 +71,7 @@ class TagRequest(BaseModel):
 # ---------------------------------------
 # Selenium logic (unchanged)
 # ---------------------------------------
+@spans.timed("login")
 def login(driver, job: Job, username: str, password: str, timeout: int = 30):
     driver.get(LOGIN_URL)
     wait = WebDriverWait(driver, timeout)
@@ -93,51 +96,147 @@ def login(driver, job: Job, username: str, password: str, timeout: int = 30):
         except Exception:
             pass
 
-    wait.until(
-        EC.any_of(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "a[href*='logout']")),
-            EC.url_contains("/admin/"),
-        )
-    )
+    # The login page is under /admin/ too: wait until we have actually left it.
+    waits.after_login(driver, LOGIN_URL, seconds=timeout)
     _log(job, "Login successful.")
 
 
-def get_question_ids(driver, job: Job, tag: str, timeout: int = 60):
-    target_url = TARGET_URL.format(tag)
-    driver.get(target_url)
-
-    wait = WebDriverWait(driver, timeout)
-    try:
-        wait.until(EC.presence_of_element_located((By.CLASS_NAME, "field-question_id")))
-    except TimeoutException:
-        _log(job, f"Failed to load page for tag: {tag}")
-        return []
+def get_question_ids(driver, job: Job, tag: str, timeout: int = 60, session=None, on_page=None):
+    """Question IDs for one tag, following the changelist's pagination.
 
+    on_page(tag, page_number, ids) is called as each page is read. Returns
+    (ids, complete); complete is False if a page failed to load.
+    """
+    target_url = TARGET_URL.format(quote(tag))
     ids = []
-    elements = driver.find_elements(By.CLASS_NAME, "field-question_id")
-    for elem in elements:
-        qid = elem.text.strip()
-        if qid:
-            ids.append(qid)
-            _log(job, f"Found Question ID: {qid}")
-    return ids
-
-
-def save_question_ids_to_file(job: Job, question_ids, file_path):
-    try:
-        with open(file_path, 'w') as f:
-            for qid in question_ids:
-                f.write(f"{qid}\n")
-
-        _log(job, f"✅ Question IDs saved to: {file_path}")
-    except Exception:
-        _log(job, "❌ ERROR writing file:\n" + "".join(traceback.format_exc()))
-
+    urls = [target_url]
+    page = 0
+    while urls:
+        url = urls.pop(0)
+        page += 1
+        if session is not None:
+            session.get(url)
+        else:
+            driver.get(url)
 
-def selenium_worker(job_id: str, tags: List[str], headless: bool):
+        try:
+            # The paginator ("N results") is on every changelist, even an empty one.
+            waits.element(driver, (By.CSS_SELECTOR, "p.paginator"), seconds=timeout)
+        except TimeoutException:
+            _log(job, f"Failed to load page {page} for tag: {tag}")
+            return ids, False
+
+        page_ids = [e.text.strip() for e in driver.find_elements(By.CLASS_NAME, "field-question_id") if e.text.strip()]
+        ids.extend(page_ids)
+        if on_page is not None:
+            on_page(tag, page, page_ids)
+        if page == 1:
+            links = [(a.get_attribute("href"), a.text.strip())
+                     for a in driver.find_elements(By.CSS_SELECTOR, "p.paginator a")]
+            urls = admin_http.page_urls(driver.current_url, links)
+    return ids, True
+
+
+class TagResults:
+    """Question IDs gathered across tags, de-duplicated and streamed as pages arrive.
+
+    Every new ID goes to the log and is appended to the output file right away,
+    so a long lookup shows results while it runs.
+    """
+
+    def __init__(self, job: Job, file_path):
+        self.job = job
+        self.file_path = file_path
+        self.ids: List[str] = []
+        self.per_tag: Dict[str, List[str]] = {}
+        self._seen = set()
+        try:
+            self._out = open(file_path, 'w')
+        except OSError:
+            self._out = None
+            _log(job, "❌ ERROR opening output file:\n" + "".join(traceback.format_exc()))
+
+    def add(self, tag: str, page, ids: List[str]):
+        tag_ids = self.per_tag.setdefault(tag, [])
+        tag_ids.extend(q for q in ids if q not in tag_ids)
+        new = [q for q in dict.fromkeys(ids) if q not in self._seen]
+        self._seen.update(new)
+        self.ids.extend(new)
+        for qid in new:
+            _log(self.job, f"Found Question ID: {qid}")
+        if self._out is not None and new:
+            self._out.write("".join(f"{qid}\n" for qid in new))
+            self._out.flush()
+        where = f"page {page}" if isinstance(page, int) else page
+        _log(self.job, f"Tag '{tag}' {where} → {len(ids)} IDs ({len(new)} new)")
+
+    def close(self):
+        if self._out is not None:
+            self._out.close()
+            if self.ids:
+                _log(self.job, f"✅ Question IDs saved to: {self.file_path}")
+
+
+def fetch_tags_http(job: Job, tags: List[str], results: TagResults, concurrency: int,
+                    credentials) -> List[str]:
+    """Read every tag's changelist pages over HTTP, many at once. Returns the tags that failed."""
+    client = admin_http.AdminClient(LOGIN_URL, *credentials, pool_size=concurrency)
+    changelist_url = TARGET_URL.split("?", 1)[0]
+    failed: List[str] = []
+    # Per-tag start time and pages still in flight, for the tag's "item" span
+    started = {tag: (time.time(), time.perf_counter()) for tag in tags}
+    outstanding = dict.fromkeys(tags, 1)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = {pool.submit(client.changelist, changelist_url, {"q": tag}): (tag, 1) for tag in tags}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                tag, page = pending.pop(fut)
+                outstanding[tag] -= 1
+                try:
+                    result = fut.result()
+                except admin_http.FormError as e:
+                    _log(job, f"Tag '{tag}' page {page}: HTTP fetch failed ({e})")
+                    if tag not in failed:
+                        failed.append(tag)
+                    continue
+                if page == 1:
+                    # The first page tells us how many more there are; fetch them all at once.
+                    for n, url in enumerate(result["pages"], 2):
+                        pending[pool.submit(client.changelist, url)] = (tag, n)
+                        outstanding[tag] += 1
+                results.add(tag, page, result["columns"].get("field-question_id", []))
+                if not outstanding[tag] and tag not in failed:
+                    start, t0 = started[tag]
+                    spans.emit({"phase": "item", "item": tag, "engine": "http", "start": start,
+                                "ok": True, "seconds": round(time.perf_counter() - t0, 6)})
+    return failed
+
+
+def selenium_worker(job_id: str, tags: List[str], headless: bool, credentials):
+    """Look up every tag; credentials is the admin (username, password)."""
     job = jobs[job_id]
     _log(job, f"--- JOB {job_id} START ---")
 
+    tags = list(dict.fromkeys(t.strip() for t in tags if t.strip()))
+    results = TagResults(job, OUTPUT_FILE_PATH)
+
+    # Tags looked up recently on this admin are answered from the cache.
+    cache = lookup_cache.LookupCache(LOGIN_URL, "questiontag")
+    remaining = []
+    for tag in tags:
+        cached = cache.get(tag)
+        if cached is None:
+            remaining.append(tag)
+        else:
+            results.add(tag, "cached", cached)
+            # Done as far as the journal and items/sec are concerned.
+            spans.event("item", item=tag, engine="cache")
+    _log(job, f"Cache: {cache.hits} hits, {cache.misses} misses "
+              f"(ttl {cache.ttl:g}s{', forced refresh' if cache.force_refresh else ''})")
+    fetched = remaining
+    incomplete = set()
+
     options = Options()
     if headless:
         options.add_argument("--headless=new")
@@ -146,27 +245,44 @@ def selenium_worker(job_id: str, tags: List[str], headless: bool):
     options.add_argument("--window-size=1280,900")
 
     driver = None
-    all_ids: List[str] = []
 
     try:
-        _log(job, "Launching Chrome WebDriver...")
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-
-        login(driver, job, USERNAME, PASSWORD)
-
-        for tag in [t.strip() for t in tags if t.strip()]:
-            found_ids = get_question_ids(driver, job, tag)
-            all_ids.extend(found_ids)
-            _log(job, f"Tag '{tag}' → {len(found_ids)} IDs")
+        if params.get("engine", "auto") != "selenium":
+            remaining = fetch_tags_http(job, remaining, results, max(1, int(params.get("concurrency", 8))),
+                                        credentials)
+
+        if remaining:
+            _log(job, f"Launching Chrome WebDriver for {len(remaining)} tags...")
+            driver = browser.make_chrome(options)
+
+            # Logs in only if the cached admin session is missing or has expired.
+            session = sessions.AdminSession(driver, LOGIN_URL, lambda: login(driver, job, *credentials))
+
+            for tag in remaining:
+                with spans.span("item", item=tag, engine="selenium") as item:
+                    found_ids, complete = get_question_ids(driver, job, tag, session=session, on_page=results.add)
+                    item["ok"] = complete
+                if not complete:
+                    incomplete.add(tag)
+                _log(job, f"Tag '{tag}' → {len(found_ids)} IDs")
+            remaining = []
 
     except Exception:
         _log(job, "ERROR:\n" + "".join(traceback.format_exc()))
     finally:
         if driver:
             driver.quit()
+        results.close()
+
+    # Only answers read in full are worth remembering.
+    incomplete.update(remaining)
+    for tag in fetched:
+        if tag not in incomplete:
+            cache.put(tag, results.per_tag.get(tag, []))
+    cache.close()
 
-    if all_ids:
-        save_question_ids_to_file(job, all_ids, OUTPUT_FILE_PATH)
+    if results.ids:
+        _log(job, f"{len(results.ids)} unique IDs across {len(tags)} tags")
     else:
         _log(job, "⚠️ No IDs found.")
 
@@ -181,11 +297,15 @@ def selenium_worker(job_id: str, tags: List[str], headless: bool):
 def start_tags_job(payload: TagRequest):
     if not payload.tags:
         raise HTTPException(status_code=400, detail="No tags provided.")
+    try:
+        credentials = params.admin_credentials(USERNAME)
+    except params.MissingCredentials as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
     job_id = str(uuid.uuid4())
     jobs[job_id] = Job()
 
-    Thread(target=selenium_worker, args=(job_id, payload.tags, payload.headless), daemon=True).start()
+    Thread(target=selenium_worker, args=(job_id, payload.tags, payload.headless, credentials), daemon=True).start()
 
     return {"job_id": job_id, "status": "started"}
 
@@ -196,3 +316,14 @@ def get_log(job_id: str):
     if not job:
         raise HTTPException(status_code=404, detail="Unknown job_id")
     return {"log": job.log}
+
+
+if __name__ == "__main__":
+    # Backend job: tags come from the job params
+    try:
+        credentials = params.admin_credentials(USERNAME)
+    except params.MissingCredentials as e:
+        raise SystemExit(str(e))
+    job_id = uuid.uuid4().hex
+    jobs[job_id] = Job()
+    selenium_worker(job_id, params.get("tags", []), params.headless(True), credentials)
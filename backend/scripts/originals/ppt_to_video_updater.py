@@ -1,15 +1,14 @@
 from selenium import webdriver
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time, logging
+import time
+from toolkit import params, browser, sessions, admin_http, waits, spans
 
 # ---------------------------------------------
 # Configuration
 # ---------------------------------------------
-LOGIN_URL = "https://nkb-backend-ccbp-beta.earlywave.in/admin/login/"
-BASE_URL = "https://nkb-backend-ccbp-beta.earlywave.in/admin/nkb_learning_resource/learningresource/"
+LOGIN_URL = params.admin_url("https://nkb-backend-ccbp-beta.earlywave.in/admin/login/")
+BASE_URL = params.admin_url("https://nkb-backend-ccbp-beta.earlywave.in/admin/nkb_learning_resource/learningresource/")
 USERNAME = "content_loader"
 PASSWORD = "AB"
 
@@ -17,105 +16,178 @@ PASSWORD = "AB"
 # Chrome WebDriver Setup (No ChromeDriver path)
 # ---------------------------------------------
 chrome_options = webdriver.ChromeOptions()
-#chrome_options.add_argument("--headless=new")  # comment this if you want to see Chrome open
+if params.headless(False):  # the backend's `headless` setting, or the job's "headless" param
+    chrome_options.add_argument("--headless=new")
 chrome_options.add_argument("--no-sandbox")
 chrome_options.add_argument("--disable-dev-shm-usage")
 chrome_options.add_argument("--disable-gpu")
 chrome_options.add_argument("--window-size=1920,1080")
 
-# 👇 No Service(), No ChromeDriverManager, No local path checks
-driver = webdriver.Chrome(options=chrome_options)
+# Chrome is only started if an item needs the Selenium path (see selenium_session)
+driver = None
+session = None
+
+# Edits applied to every learning resource
+fields_to_clear_with_double_space = [
+    'title', 'title_en', 'content', 'content_en'
+]
+fields_to_fill = {
+    'content_format': 'TEXT',
+    'content_format_en': 'TEXT',
+    'learning_resource_type': 'INTERACTIVE_VIDEO'
+}
 
 # ---------------------------------------------
 # Core Automation Logic
 # ---------------------------------------------
-def modify_resource(uuid):
-    target_url = f"{BASE_URL}{uuid}/change/"
+def selenium_session():
+    global driver, session
+    if driver is None:
+        # 👇 No ChromeDriverManager: Selenium Manager finds the driver unless the backend
+        # passed one (or lent us an already-running browser)
+        driver = browser.make_chrome(chrome_options, use_driver_manager=False)
+        # Cached admin cookies: we only log in when the admin bounces us to /admin/login/
+        session = sessions.AdminSession(driver, LOGIN_URL, login)
+    return session
+
+@spans.timed("login")
+def login():
+    print("Navigating to login page...")
+    driver.get(LOGIN_URL)
+
+    username_field = waits.element(driver, (By.NAME, 'username'))
+    password_field = driver.find_element(By.NAME, 'password')
+
+    print(f"Entering credentials for username: {USERNAME}")
+    username_field.send_keys(USERNAME)
+    password_field.send_keys(PASSWORD)
+    password_field.send_keys(Keys.RETURN)
+
+    waits.after_login(driver, LOGIN_URL)
+    print("Login successful!")
+
+client = None
+
+def modify_resource_http(uuid):
+    """Fast path: submit the change form over HTTP. Raises admin_http.FormError if it can't."""
+    global client
+    if client is None:
+        client = admin_http.AdminClient(LOGIN_URL, USERNAME, PASSWORD)
+    values = {field: "  " for field in fields_to_clear_with_double_space}
+    values.update(fields_to_fill)
+    result = client.change(f"{BASE_URL}{uuid}/change/", values, required=False)
+    for field in result["skipped"]:
+        print(f"Could not find or set field {field}: not on the form")
+    for level, text in result["messages"]:
+        print(f"Admin message ({level}): {text}")
 
-    try:
-        # 1. Log in
-        print("Navigating to login page...")
-        driver.get(LOGIN_URL)
-        time.sleep(2)
-
-        username_field = driver.find_element(By.NAME, 'username')
-        password_field = driver.find_element(By.NAME, 'password')
-
-        print(f"Entering credentials for username: {USERNAME}")
-        username_field.send_keys(USERNAME)
-        password_field.send_keys(PASSWORD)
-        password_field.send_keys(Keys.RETURN)
-
-        time.sleep(3)
-        print("Login successful!")
-
-        # 2. Navigate to resource page
-        print(f"Navigating to target page for UUID: {uuid}")
-        driver.get(target_url)
-        time.sleep(3)
-
-        # 3. Clear specific fields and set double spaces
-        fields_to_clear_with_double_space = [
-            'title', 'title_en', 'content', 'content_en'
-        ]
-        for field in fields_to_clear_with_double_space:
-            try:
-                field_element = driver.find_element(By.NAME, field)
-                print(f"Setting field {field} to double spaces.")
-                field_element.clear()
-                field_element.send_keys("  ")
-                time.sleep(1)
-            except Exception as e:
-                print(f"Could not find or set field {field}: {e}")
-
-        # 4. Fill specific fields with values
-        fields_to_fill = {
-            'content_format': 'TEXT',
-            'content_format_en': 'TEXT',
-            'learning_resource_type': 'INTERACTIVE_VIDEO'
-        }
-        for field, value in fields_to_fill.items():
-            try:
-                field_element = driver.find_element(By.NAME, field)
-                print(f"Filling field: {field} with value: {value}")
-                field_element.clear()
-                field_element.send_keys(value)
-                time.sleep(1)
-            except Exception as e:
-                print(f"Could not find or fill field {field}: {e}")
-
-        # 5. Wait for and click Save
-        print("Waiting for Save button to be visible...")
-        save_button = WebDriverWait(driver, 20).until(
-            EC.visibility_of_element_located((By.XPATH, "//input[@value='Save']"))
-        )
-        print("Saving the changes...")
-        save_button.click()
+def modify_resource(uuid):
+    """Apply the PPT→video edits to one resource; returns (status, engine, detail).
 
-        # 6. Wait and verify result
-        print("Waiting 20 seconds for save result...")
-        time.sleep(20)
+    status is "ok", "rejected" (Django refused the save) or "failed".
+    """
+    if params.get("engine", "auto") != "selenium":
+        try:
+            print(f"Updating UUID {uuid} over HTTP...")
+            modify_resource_http(uuid)
+            print(f"Saved {uuid} over HTTP.")
+            return "ok", "http", ""
+        except admin_http.ChangeRejected as e:
+            print(f"Save rejected for {uuid}: {e}")
+            return "rejected", "http", "; ".join(e.errors)
+        except admin_http.FormError as e:
+            print(f"HTTP path unavailable for {uuid} ({e}); using the browser.")
+    return modify_resource_selenium(uuid)
+
+def modify_resource_selenium(uuid):
+    target_url = f"{BASE_URL}{uuid}/change/"
+    session = selenium_session()
 
-        current_url = driver.current_url
-        print(f"Current URL after save: {current_url}")
+    # 1.+2. Navigate to resource page (logging in only if needed)
+    print(f"Navigating to target page for UUID: {uuid}")
+    session.get(target_url)
+    waits.element(driver, (By.CSS_SELECTOR, "form[method='post'] input[name='csrfmiddlewaretoken']"))
 
+    # 3. Clear specific fields and set double spaces
+    for field in fields_to_clear_with_double_space:
         try:
-            success_message = driver.find_element(By.CLASS_NAME, "success-message-class-name")
-            print("Success message found:", success_message.text)
-        except Exception:
-            print("No success message found or unable to locate it.")
-
-        input("Press Enter to close browser after manual inspection...")
+            field_element = driver.find_element(By.NAME, field)
+            print(f"Setting field {field} to double spaces.")
+            field_element.clear()
+            field_element.send_keys("  ")
+        except Exception as e:
+            print(f"Could not find or set field {field}: {e}")
+
+    # 4. Fill specific fields with values
+    for field, value in fields_to_fill.items():
+        try:
+            field_element = driver.find_element(By.NAME, field)
+            print(f"Filling field: {field} with value: {value}")
+            field_element.clear()
+            field_element.send_keys(value)
+        except Exception as e:
+            print(f"Could not find or fill field {field}: {e}")
+
+    # 5. Wait for and click Save
+    print("Waiting for Save button to be visible...")
+    save_button = waits.element(driver, (By.XPATH, "//input[@value='Save']"), visible=True)
+    print("Saving the changes...")
+    with spans.span("save"):
+        save_button.click()
 
-    finally:
-        print("Closing the browser...")
-        driver.quit()
+        # 6. Wait for Django's answer (success message, redirect or form errors)
+        print("Waiting for save result...")
+        result = waits.save_result(driver, target_url)
+    print(f"Current URL after save: {result['url']}")
+
+    for message in result["messages"]:
+        print("Success message found:", message)
+    if result["errors"]:
+        print("Save rejected:", "; ".join(result["errors"]))
+        return "rejected", "selenium", "; ".join(result["errors"])
+    if result["timed_out"]:
+        print(f"No save result within {waits.timeout('save'):g}s.")
+        return "failed", "selenium", "no save result"
+    return "ok", "selenium", ""
 
 # ---------------------------------------------
-# Example usage
+# Batch entry point: one login, one browser, every UUID
 # ---------------------------------------------
-uuid_list = ["b31d7aa4-c7d2-4842-b945-d31f6cef9ee9"]
-
-for uuid in uuid_list:
-    modify_resource(uuid)
-
+def run_batch(uuids):
+    """Process every UUID on one session and print a per-item result with timings."""
+    results = []
+    started = time.perf_counter()
+    try:
+        for idx, uuid in enumerate(uuids, 1):
+            print(f"\n[{idx}/{len(uuids)}] {uuid}")
+            item_started = time.perf_counter()
+            with spans.span("item", item=uuid) as item:
+                try:
+                    status, engine, detail = modify_resource(uuid)
+                except Exception as e:
+                    # One broken item must not take the rest of the batch down with it.
+                    status, engine, detail = "failed", "-", str(e)
+                    item["error"] = type(e).__name__
+                    print(f"Error with {uuid}: {e}")
+                item.update(ok=status == "ok", engine=engine)
+            seconds = time.perf_counter() - item_started
+            results.append((uuid, status, engine, seconds, detail))
+            print(f"[{idx}/{len(uuids)}] {uuid}: {status} via {engine} in {seconds:.2f}s")
+    finally:
+        if driver is not None:
+            print("Closing the browser...")
+            driver.quit()
+
+    ok = sum(1 for r in results if r[1] == "ok")
+    print(f"\nSummary: {ok}/{len(results)} ok in {time.perf_counter() - started:.1f}s "
+          f"(logins: http {client.logins if client else 0}, browser {session.logins if session else 0})")
+    for uuid, status, engine, seconds, detail in results:
+        print(f"  {uuid}  {status:<8} {engine:<8} {seconds:6.2f}s  {detail}")
+    return results
+
+uuid_list = params.get("uuid_list", ["b31d7aa4-c7d2-4842-b945-d31f6cef9ee9"])
+
+if __name__ == "__main__":
+    batch = run_batch(uuid_list)
+    if any(status != "ok" for _, status, _, _, _ in batch):
+        raise SystemExit(1)
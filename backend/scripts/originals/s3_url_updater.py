@@ -1,254 +1,50 @@
-# from selenium import webdriver
-# from selenium.webdriver.chrome.service import Service
-# from selenium.webdriver.common.by import By
-# from selenium.webdriver.common.keys import Keys
-# from selenium.webdriver.chrome.options import Options
-# from webdriver_manager.chrome import ChromeDriverManager
-# from selenium.webdriver.support.ui import WebDriverWait
-# from selenium.webdriver.support import expected_conditions as EC
-# import time
+import sys
 
-# # Set up Selenium WebDriver (with a visible browser window)
-# def create_driver():
-#     options = Options()
-#     options.headless = False  # Ensure the browser is visible
-#     driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-#     return driver
-
-# # Login to the admin panel using Selenium
-# def login_to_admin_panel(driver, login_url, username, password):
-#     driver.get(login_url)
-#     print(f"Opened: {login_url}")
-
-#     # Wait for the login form to load
-#     WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.ID, "id_username")))
-    
-#     # Find the username and password fields and fill them in
-#     username_input = driver.find_element(By.ID, "id_username")
-#     password_input = driver.find_element(By.ID, "id_password")
-#     username_input.send_keys(username)
-#     password_input.send_keys(password)
-#     password_input.send_keys(Keys.RETURN)
-
-#     # Wait for the page to load and check for a successful login
-#     try:
-#         # Wait for the <body> element as a generic post-login check
-#         WebDriverWait(driver, 20).until(
-#             EC.presence_of_element_located((By.TAG_NAME, "body"))
-#         )
-#         print("Login successful!")
-#         return True
-#     except Exception as e:
-#         print(f"Error: Login failed or took too long. {e}")
-#         driver.save_screenshot("login_failed.png")  # Save screenshot for debugging
-#         print("Screenshot saved as 'login_failed.png'.")
-#         return False
-
-# # Open the target URL and update the multimedia URL
-# def update_multimedia_url(driver, base_url, multimedia_id, new_url):
-    
-#     # Construct the full target URL
-#     target_url = f"{base_url}{multimedia_id}/change/"
-    
-#     # Print the final target URL to check it
-#     print(f"Target URL: {target_url}")
-
-#     # Open the target URL
-#     driver.get(target_url)
-#     print(f"Opened: {target_url}")
-    
-#     # Wait for the page to load and the "Multimedia URL" input field to appear
-#     WebDriverWait(driver, 20).until(
-#         EC.presence_of_element_located((By.NAME, "multimedia_url"))
-#     )
-
-#     # Find the "Multimedia URL" field and change its value
-#     multimedia_url_input = driver.find_element(By.NAME, "multimedia_url")
-#     multimedia_url_input.clear()  # Clear any existing URL
-#     multimedia_url_input.send_keys(new_url)  # Enter the new S3 URL
-
-#     # Find and click the Save button
-#     save_button = driver.find_element(By.XPATH, "//input[@type='submit' or @value='Save']")
-#     save_button.click()  # Click the Save button
-
-#     print("Clicked the 'Save' button.")
-
-#     # Wait for the page to confirm the update (e.g., URL change confirmation)
-#     time.sleep(5)  # Wait for 5 seconds to observe the change
-
-# # Main function
-# def main():
-#     LOGIN_URL = "https://nkb-backend-ccbp-gamma.earlywave.in/admin/login/"
-#     USERNAME = "content_loader"
-#     PASSWORD = "ABIs"
-#     BASE_URL = "https://nkb-backend-ccbp-gamma.earlywave.in/admin/nkb_interactive_video/multimedia/"
-#     multimedia_id = "0d851f5c-da11-4e4c-b3f4-7784694297ed"  # Given multimedia ID
-#     new_url = "https://media-content.ccbp.in/ccbp_prod/media/video_content/niat/niat_classes/build_your_own_dynamic_web_application/english/23-10-2025-introductionToDynamicWebApplications-English-V1/video__extension__"  # S3 URL to change
-
-#     # Initialize the Selenium WebDriver
-#     driver = create_driver()
-
-#     # Login to the admin panel
-#     if login_to_admin_panel(driver, LOGIN_URL, USERNAME, PASSWORD):
-#         # Open the target URL and update the multimedia URL
-#         update_multimedia_url(driver, BASE_URL, multimedia_id, new_url)
-#     else:
-#         print("Failed to login. Please check the screenshot for debugging.")
-
-#     driver.quit()  # Close the browser after the process
-
-# if __name__ == "__main__":
-#     main()
-
-
-# from selenium import webdriver
-# from selenium.webdriver.chrome.service import Service
-# from selenium.webdriver.common.by import By
-# from selenium.webdriver.common.keys import Keys
-# from selenium.webdriver.chrome.options import Options
-# from webdriver_manager.chrome import ChromeDriverManager
-# from selenium.webdriver.support.ui import WebDriverWait
-# from selenium.webdriver.support import expected_conditions as EC
-# import time
-
-# # Set up Selenium WebDriver (with a visible browser window)
-# def create_driver():
-#     options = Options()
-#     options.headless = False  # Ensure the browser is visible
-#     driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-#     return driver
-
-# # Login to the admin panel using Selenium
-# def login_to_admin_panel(driver, login_url, username, password):
-#     driver.get(login_url)
-#     print(f"Opened: {login_url}")
-
-#     # Wait for the login form to load
-#     WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.ID, "id_username")))
-    
-#     # Find the username and password fields and fill them in
-#     username_input = driver.find_element(By.ID, "id_username")
-#     password_input = driver.find_element(By.ID, "id_password")
-#     username_input.send_keys(username)
-#     password_input.send_keys(password)
-#     password_input.send_keys(Keys.RETURN)
-
-#     # Wait for the page to load and check for a successful login
-#     try:
-#         # Wait for the <body> element as a generic post-login check
-#         WebDriverWait(driver, 20).until(
-#             EC.presence_of_element_located((By.TAG_NAME, "body"))
-#         )
-#         print("Login successful!")
-#         return True
-#     except Exception as e:
-#         print(f"Error: Login failed or took too long. {e}")
-#         driver.save_screenshot("login_failed.png")  # Save screenshot for debugging
-#         print("Screenshot saved as 'login_failed.png'.")
-#         return False
-
-# # Open the target URL and update the multimedia URL
-# def update_multimedia_url(driver, base_url, multimedia_id, new_url):
-#     # Construct the full target URL
-#     target_url = f"{base_url}{multimedia_id}/change/"
-    
-#     # Print the final target URL to check it
-#     print(f"Target URL: {target_url}")
-
-#     # Open the target URL
-#     driver.get(target_url)
-#     print(f"Opened: {target_url}")
-    
-#     # Wait for the page to load and the "Multimedia URL" input field to appear
-#     WebDriverWait(driver, 20).until(
-#         EC.presence_of_element_located((By.NAME, "multimedia_url"))
-#     )
-
-#     # Find the "Multimedia URL" field and change its value
-#     multimedia_url_input = driver.find_element(By.NAME, "multimedia_url")
-#     multimedia_url_input.clear()  # Clear any existing URL
-#     multimedia_url_input.send_keys(new_url)  # Enter the new S3 URL
-
-#     # Find and click the Save button
-#     save_button = driver.find_element(By.XPATH, "//input[@type='submit' or @value='Save']")
-#     save_button.click()  # Click the Save button
-
-#     print("Clicked the 'Save' button.")
-
-#     # Wait for the page to confirm the update (e.g., URL change confirmation)
-#     time.sleep(5)  # Wait for 5 seconds to observe the change
-
-# # Main function
-# def main():
-#     LOGIN_URL = "https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/login/"
-#     # Beta creds
-#     # USERNAME = "content_loader"
-#     # PASSWORD = "ABIsA9QTn9"
-#     # Gamma Creds
-#     # USERNAME = "content_loader"
-#     # PASSWORD = "iyKqn1h2BT"
-#     # prod creds
-#     USERNAME = "content_loader"
-#     PASSWORD = "CoNmsBzJKd"
-#     BASE_URL = "https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/nkb_interactive_video/multimedia/"
-
-#     # List of tuples containing (multimedia_id, new_url)
-#     multimedia_data = [
-#        (
-#           "81045cdb-bdb7-46d4-ac47-1524867e6b",
-#           "https://media-content.ccbp.in/ccbp_prod/media/video_content/niat/niat_classes/python/23-10-2025-inputOutputBasics-English-V1/video__extension__"
-#        ),
-#      ]
-#     # Initialize the Selenium WebDriver
-#     driver = create_driver()
-
-#     # Login to the admin panel
-#     if login_to_admin_panel(driver, LOGIN_URL, USERNAME, PASSWORD):
-#         # Loop through the multimedia data and update URLs
-#         for multimedia_id, new_url in multimedia_data:
-#             update_multimedia_url(driver, BASE_URL, multimedia_id, new_url)
-#     else:
-#         print("Failed to login. Please check the screenshot for debugging.")
-
-#     driver.quit()  # Close the browser after the process
-
-# if __name__ == "__main__":
-#     main()
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time
+from selenium.common.exceptions import TimeoutException
+
+from toolkit import params, browser, sessions, admin_http, waits, spans, retry
 
-# Set up Selenium WebDriver (with a visible browser window)
+LOGIN_URL = params.admin_url("https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/login/")
+USERNAME = "content_loader"
+PASSWORD = "CoN"
+BASE_URL = params.admin_url("https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/nkb_interactive_video/multimedia/")
+
+# Set up Selenium WebDriver (visible unless the backend runs browsers headless)
 def create_driver():
     options = Options()
-    options.headless = False  # Ensure the browser is visible
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    if params.headless(False):
+        options.add_argument("--headless=new")
+    driver = browser.make_chrome(options)
     return driver
 
+# Rows arrive either as (multimedia_id, new_url) or as the frontend's
+# {"multimedia_id": ..., "s3_url": ...} objects.
+def as_pair(row):
+    if isinstance(row, dict):
+        return row.get("multimedia_id"), row.get("s3_url")
+    return row[0], row[1]
+
 # Login to the admin panel using Selenium
+@spans.timed("login")
 def login_to_admin_panel(driver, login_url, username, password):
     driver.get(login_url)
     print(f"Opened: {login_url}")
 
     # Wait for the login form to load
-    WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.ID, "id_username")))
+    username_input = waits.element(driver, (By.ID, "id_username"))
     
-    # Find the username and password fields and fill them in
-    username_input = driver.find_element(By.ID, "id_username")
+    # Find the password field and fill both in
     password_input = driver.find_element(By.ID, "id_password")
     username_input.send_keys(username)
     password_input.send_keys(password)
     password_input.send_keys(Keys.RETURN)
 
-    # Wait for the page to load and check for a successful login
+    # Wait until we leave the login page (or Django shows a login error)
     try:
-        WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        waits.after_login(driver, login_url)
         print("Login successful!")
         return True
     except Exception as e:
@@ -258,18 +54,21 @@ def login_to_admin_panel(driver, login_url, username, password):
         return False
 
 # Open the target URL and update the multimedia URL
-def update_multimedia_url(driver, base_url, multimedia_id, new_url):
+@spans.timed("update_multimedia_url")
+def update_multimedia_url(driver, base_url, multimedia_id, new_url, session=None):
     # Construct the full target URL
     target_url = f"{base_url}{multimedia_id}/change/"
     
     print(f"Target URL: {target_url}")
-    driver.get(target_url)
+    if session is not None:
+        session.get(target_url)
+    else:
+        driver.get(target_url)
     
     # Wait for the "Multimedia URL" input field to appear
-    WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.NAME, "multimedia_url")))
+    multimedia_url_input = waits.element(driver, (By.NAME, "multimedia_url"))
 
     # Update the multimedia URL
-    multimedia_url_input = driver.find_element(By.NAME, "multimedia_url")
     multimedia_url_input.clear()
     multimedia_url_input.send_keys(new_url)
 
@@ -278,28 +77,80 @@ def update_multimedia_url(driver, base_url, multimedia_id, new_url):
     save_button.click()
 
     print("Clicked the 'Save' button.")
-    time.sleep(5)  # Wait to ensure the update is applied
+    # Wait for Django's answer instead of a fixed pause
+    result = waits.save_result(driver, target_url)
+    if result["ok"]:
+        print("Saved:", "; ".join(result["messages"]) or result["url"])
+    elif result["errors"]:
+        print("Save rejected:", "; ".join(result["errors"]))
+    else:
+        # Django never answered; worth another try (toolkit.retry treats it as a timeout).
+        raise TimeoutException(f"No save result within {waits.timeout('save'):g}s")
+    return result["ok"]
 
 # Main function
 def main():
-    # LOGIN_URL = "https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/login/"
-    # USERNAME = "content_loader"
-    # PASSWORD = "CoN"
-    # BASE_URL = "https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/nkb_interactive_video/multimedia/"
-
     # List of multimedia updates: (multimedia_id, new_url)
-    multimedia_data = [("81045cdb-bdb7-46d4-ac47-1524867e6b44","https://media-content.ccbp.in/ccbp_prod/media/video_content/niat/niat_classes/python/23-10-2025-inputOutputBasics-English-V1/video__extension__"),]
+    multimedia_data = params.get("multimedia_data", [("81045cdb-bdb7-46d4-ac47-1524867e6b44","https://media-content.ccbp.in/ccbp_prod/media/video_content/niat/niat_classes/python/23-10-2025-inputOutputBasics-English-V1/video__extension__"),])
+
+    # Every row gets bounded retries; the breaker stops the job if the admin keeps failing.
+    policy = retry.Policy()
+
+    # Fast path: submit the change form over HTTP; only rows it cannot handle need Chrome.
+    pending = []
+    client = None
+    if params.get("engine", "auto") != "selenium":
+        client = admin_http.AdminClient(LOGIN_URL, USERNAME, PASSWORD)
+    for row in multimedia_data:
+        multimedia_id, new_url = as_pair(row)
+        if client is not None:
+            with spans.span("item", item=multimedia_id, engine="http") as item:
+                try:
+                    policy.run(lambda: client.change(f"{BASE_URL}{multimedia_id}/change/", {"multimedia_url": new_url}),
+                               item=multimedia_id)
+                    print(f"Updated {multimedia_id} over HTTP.")
+                    continue
+                except admin_http.ChangeRejected as e:
+                    item["ok"] = False
+                    print(f"Update rejected for {multimedia_id}: {e}")
+                    continue
+                except admin_http.FormError as e:
+                    item["phase"] = "http_attempt"
+                    print(f"HTTP path unavailable for {multimedia_id} ({e}); using the browser.")
+        pending.append((multimedia_id, new_url))
+    if not pending:
+        return
 
     driver = create_driver()
 
-    if login_to_admin_panel(driver, LOGIN_URL, USERNAME, PASSWORD):
-        for multimedia_id, new_url in multimedia_data:
-            update_multimedia_url(driver, BASE_URL, multimedia_id, new_url)
-    else:
-        print("Failed to login. Please check the screenshot for debugging.")
+    def login():
+        if not login_to_admin_panel(driver, LOGIN_URL, USERNAME, PASSWORD):
+            raise RuntimeError("Failed to login. Please check the screenshot for debugging.")
 
-    driver.quit()
+    # Reuses the cached admin session; logs in only when redirected to the login page.
+    session = sessions.AdminSession(driver, LOGIN_URL, login)
+    try:
+        for multimedia_id, new_url in pending:
+            with spans.span("item", item=multimedia_id, engine="selenium") as item:
+                try:
+                    item["ok"] = policy.run(
+                        lambda: update_multimedia_url(driver, BASE_URL, multimedia_id, new_url, session=session),
+                        item=multimedia_id)
+                except RuntimeError:
+                    raise  # login failed, or the breaker gave up: the other rows would fail too
+                except Exception as e:
+                    # A stale element or a page that never loaded fails this row only.
+                    item["ok"] = False
+                    print(f"Failed to update {multimedia_id} ({retry.classify(e) or type(e).__name__}): {e}")
+    finally:
+        driver.quit()
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except retry.CircuitOpen as e:
+        sys.exit(f"Stopped early: {e}. Resume the job to run the rows that were not done.")
+    except RuntimeError as e:
+        # Login failed: none of the remaining rows can be updated.
+        sys.exit(f"Stopped: {e}. Resume the job to run the rows that were not done.")
 
@@ -16,17 +16,15 @@ from selenium.common.exceptions import (
     ElementNotInteractableException,
 )
 
-# --- Driver manager so you don't manually download chromedriver ---
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from toolkit import params, browser, sessions, waits, google_sheets, spans
 
 
 # ------------------- CONFIG PROD -------------------
 # ✅ URL of the Django Admin login page (the page where we type username & password)
-LOGIN_URL  = "https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/login/"
+LOGIN_URL  = params.admin_url("https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/login/")
 
 # ✅ URL of the Django Admin "Add" form for Content Loading (the page where we paste JSON and click Save)
-TARGET_URL = "https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/nkb_load_data/contentloading/add/"
+TARGET_URL = params.admin_url("https://nkb-backend-ccbp-prod-apis.ccbp.in/admin/nkb_load_data/contentloading/add/")
 
 # ⚠️ Credentials used to log into the Admin site (typed into the login form online)
 #    Consider moving these to environment variables or a secrets manager.
@@ -35,7 +33,10 @@ PASSWORD = "C"
 
 # ✅ Public/accessible Google Sheet URL that the script opens in a browser
 #    The script *reads live data* from this page: spreadsheet title + sheet tab names.
-GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1qF_z_uFJojvPHwI9b-o8_d5k-Yr7Moj95L6DRnYOVmQ/edit?gid=1613205683#gid=1613205683"
+GOOGLE_SHEET_URL = params.get(
+    "GOOGLE_SHEET_URL",
+    "https://docs.google.com/spreadsheets/d/1qF_z_uFJojvPHwI9b-o8_d5k-Yr7Moj95L6DRnYOVmQ/edit?gid=1613205683#gid=1613205683",
+)
 
 # (Optional) If you need to stay logged into Google, reuse a Chrome profile.
 # Set these to your local Chrome profile paths if desired.
@@ -74,8 +75,8 @@ def make_driver(headless: bool = False) -> webdriver.Chrome:
         options.add_argument(f"--profile-directory={USER_PROFILE_DIR}")
 
     # Spin up the driver with an auto-managed chromedriver binary
-    service = Service(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=options)
+    # Attaches to the backend's pooled browser when one was lent to this job
+    return browser.make_chrome(options)
 
 
 def get_sheets_info_via_selenium(driver, sheet_url: str, timeout: int = 40) -> Tuple[str, List[str]]:
@@ -163,6 +164,7 @@ def build_sheet_payload(spreadsheet_name: str, sheet_names: List[str]) -> str:
     return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
 
 
+@spans.timed("login")
 def flexible_login(driver, username: str, password: str, timeout: int = 30):
     """
     ONLINE FORM FILL: LOG INTO DJANGO ADMIN
@@ -172,11 +174,8 @@ def flexible_login(driver, username: str, password: str, timeout: int = 30):
     2) Find username and password inputs (by IDs)
     3) Type USERNAME and PASSWORD (these are your configured strings above)
     4) Submit (Enter or click submit)
-    5) Consider login successful if:
-        - URL changes, or
-        - a logout link appears, or
-        - we land on an admin page with 'Admin'/'Dashboard' title, or
-        - a form is present.
+    5) Consider login successful once the browser has left the login page
+       (a login error shown by Django fails fast).
     """
     driver.get(LOGIN_URL)
     wait = WebDriverWait(driver, timeout)
@@ -207,32 +206,26 @@ def flexible_login(driver, username: str, password: str, timeout: int = 30):
         except NoSuchElementException:
             pass
 
-    # Consider it a success if any of these indicators are found
+    # Success once we have left the login page (it is under /admin/ too, so a URL
+    # or title check alone passes before the login has gone through)
     try:
-        wait.until(
-            EC.any_of(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "a[href*='logout']")),
-                EC.url_contains("/admin/"),
-                EC.title_contains("Admin"),
-                EC.title_contains("Dashboard"),
-            )
-        )
-    except TimeoutException:
-        # Last resort: at least ensure a form is present
-        try:
-            WebDriverWait(driver, 3).until(EC.presence_of_element_located((By.CSS_SELECTOR, "form")))
-        except TimeoutException:
-            raise RuntimeError("Login may have failed; run with a visible window and check the page.")
+        waits.after_login(driver, LOGIN_URL, seconds=timeout)
+    except RuntimeError as e:
+        raise RuntimeError(f"Login may have failed ({e}); run with a visible window and check the page.")
 
 
-def open_add_form(driver, timeout: int = 10):
+@spans.timed("navigation")
+def open_add_form(driver, timeout: int = 10, session=None):
     """
     ONLINE NAVIGATION: OPEN THE 'ADD CONTENT LOADING' FORM
 
-    - Goes straight to the add form URL.
+    - Goes straight to the add form URL (through the cached admin session, if given).
     - Waits until a <form> exists on the page.
     """
-    driver.get(TARGET_URL)
+    if session is not None:
+        session.get(TARGET_URL)
+    else:
+        driver.get(TARGET_URL)
     WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, "form")))
 
 
@@ -269,6 +262,7 @@ def scroll_into_view(driver, element):
     )
 
 
+@spans.timed("fast_fill_textarea")
 def fast_fill_textarea(driver, payload_json: str, timeout: int = 0):
     """
     ONLINE FORM FILL: PASTE JSON PAYLOAD INTO TEXTAREA
@@ -298,6 +292,7 @@ def fast_fill_textarea(driver, payload_json: str, timeout: int = 0):
     )
 
 
+@spans.timed("robust_save_and_view")
 def robust_save_and_view(driver, timeout: int = 10):
     """
     ONLINE ACTION: CLICK 'SAVE AND VIEW' (or fallback to 'Save')
@@ -345,62 +340,80 @@ def run(headless: bool = False):
     MAIN ORCHESTRATION:
 
     Phase 1 (READ ONLINE):
-      - Open Google Sheets
-      - Read spreadsheet title + sheet tab names
+      - Read spreadsheet title + sheet tab names over plain HTTP
+        (a browser is only started for sheets that are not link-shared)
       - Build JSON payload
 
     Phase 2 (WRITE ONLINE):
       - New browser session
-      - Log into Django Admin (types USERNAME/PASSWORD)
+      - Log into Django Admin (reuses cached cookies; types USERNAME/PASSWORD only if needed)
       - Open the 'Add Content Loading' form
       - Paste JSON payload into textarea
       - Click 'Save and view'
     """
-    # -------- Phase 1: open sheet, read title + tabs (short-lived browser) --------
-    driver_sheet = make_driver(headless=headless)
-    try:
-        # ➜ ONLINE READ from Google Sheets page
-        spreadsheet_name, sheet_tabs = get_sheets_info_via_selenium(driver_sheet, GOOGLE_SHEET_URL)
-        print("📄 Spreadsheet:", spreadsheet_name)
-        print("🗂️ Tabs:", sheet_tabs)
-
-        # Build the JSON we will submit to the admin form
-        payload = build_sheet_payload(spreadsheet_name, sheet_tabs)
-        print("🧩 Payload to submit:", payload)
-    finally:
-        # Cleanly close the first browser (the Google Sheets reader)
+    # -------- Phase 1: read title + tabs (HTTP first, short-lived browser as fallback) --------
+    spreadsheet_name = sheet_tabs = None
+    if params.get("engine", "auto") != "selenium":
         try:
-            time.sleep(0.5)
-            driver_sheet.quit()
-        except Exception:
-            pass
+            # ➜ ONLINE READ from the sheet's HTML, no browser needed
+            with spans.span("read_sheet", engine="http"):
+                spreadsheet_name, sheet_tabs = google_sheets.read_info(GOOGLE_SHEET_URL)
+        except google_sheets.SheetUnavailable as e:
+            print(f"Sheet not readable over HTTP ({e}); opening it in the browser.")
+
+    if sheet_tabs is None:
+        driver_sheet = make_driver(headless=headless)
+        try:
+            # ➜ ONLINE READ from Google Sheets page
+            with spans.span("read_sheet", engine="selenium"):
+                spreadsheet_name, sheet_tabs = get_sheets_info_via_selenium(driver_sheet, GOOGLE_SHEET_URL)
+        finally:
+            # Cleanly close the first browser (the Google Sheets reader)
+            try:
+                driver_sheet.quit()
+            except Exception:
+                pass
+
+    print("📄 Spreadsheet:", spreadsheet_name)
+    print("🗂️ Tabs:", sheet_tabs)
+
+    # Build the JSON we will submit to the admin form
+    payload = build_sheet_payload(spreadsheet_name, sheet_tabs)
+    print("🧩 Payload to submit:", payload)
 
     # -------- Phase 2: fresh browser for admin form (no dropdown interactions) --------
     driver = make_driver(headless=headless)
     try:
-        # ➜ ONLINE FORM FILL: LOGIN (types username/password)
-        flexible_login(driver, USERNAME, PASSWORD)
+        # ➜ LOGIN only when the cached admin session is missing or expired
+        session = sessions.AdminSession(driver, LOGIN_URL, lambda: flexible_login(driver, USERNAME, PASSWORD))
 
         # ➜ ONLINE NAVIGATION: open the specific "Add" form
-        open_add_form(driver)
+        open_add_form(driver, session=session)
 
         # ➜ ONLINE FORM FILL: paste the payload JSON into the textarea
         fast_fill_textarea(driver, payload)
 
-        # ➜ ONLINE ACTION: click "Save and view" (or "Save")
+        # ➜ ONLINE ACTION: click "Save and view" (or "Save"), then wait for Django's answer
+        form_url = driver.current_url
         robust_save_and_view(driver)
+        result = waits.save_result(driver, form_url)
+        if not result["ok"]:
+            raise RuntimeError("Save failed: " + ("; ".join(result["errors"]) or "no response from admin"))
 
         # At this point, the form submission should be done.
         print("✅ Done! Submitted and saved successfully.")
         print("🔗 Final URL:", driver.current_url)
     finally:
-        # Leave the window open for 2s (useful if not headless) so you can see the result
-        time.sleep(2)
+        # Leave the window open for 2s when it is visible so you can see the result
+        if not headless:
+            time.sleep(2)
         # NOTE: driver.quit() is commented out intentionally to keep the window open after script ends.
         # driver.quit()
 
 
 if __name__ == "__main__":
-    # Set headless=False to watch the browser; set True for servers/automation.
-    run(headless=False)
+    # Headless follows the backend's `headless` setting (or the job's "headless" param);
+    # manual runs show the browser.
+    with spans.span("item", item=GOOGLE_SHEET_URL):
+        run(headless=params.headless(False))
 
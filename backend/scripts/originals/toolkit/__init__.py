@@ -0,0 +1,5 @@
+# Shared helpers for the scripts in scripts/originals.
+#
+# Scripts must keep working when run by hand (python sheet_loading.py), so
+# everything here falls back to the script's own defaults when the backend
+# has not provided anything.
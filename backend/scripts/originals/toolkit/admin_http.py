@@ -0,0 +1,412 @@
+# toolkit/admin_http.py
+"""
+HTTP fast path for Django admin change forms.
+
+Most of our edits only submit a plain admin form, so instead of rendering the
+page in Chrome we GET /<app>/<model>/<pk>/change/ on a pooled requests session,
+parse the form (CSRF token, every field with its current value), change the
+target fields and POST it back, exactly as the browser would.
+
+    client = admin_http.AdminClient(LOGIN_URL, USERNAME, PASSWORD)
+    try:
+        client.change(change_url, {"multimedia_url": new_url})
+    except admin_http.FormError:
+        ...  # fall back to the Selenium flow for this item
+
+FormError means the form could not be handled over HTTP (field missing, no
+CSRF token, unexpected page, network trouble) and the caller should fall back
+to Selenium; its NotFound subclass means the object itself is gone and
+LoggedOut that Django kept sending us to the login page. status is the HTTP
+status when the admin answered with an error page.
+ChangeRejected means Django answered with validation errors; a browser would
+get the same answer, so that item simply failed.
+
+The admin session cookies are shared with toolkit.sessions, so an HTTP login
+is reused by later browser jobs and vice versa.
+"""
+import threading
+from html.parser import HTMLParser
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import requests
+
+from . import sessions, spans
+
+
+class FormError(Exception):
+    """The change form could not be handled over HTTP; use Selenium instead."""
+
+    def __init__(self, message: str, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class NotFound(FormError):
+    """The admin has no such object (404, or Django redirected away from its change page)."""
+
+
+class LoggedOut(FormError):
+    """Django sent the request to the login page even after logging in again."""
+
+
+class ChangeRejected(RuntimeError):
+    """Django rejected the submitted form (validation errors)."""
+
+    def __init__(self, url: str, errors):
+        self.url = url
+        self.errors = list(errors)
+        super().__init__(f"{url}: " + "; ".join(self.errors))
+
+
+_SKIP_INPUTS = ("submit", "button", "image", "reset")
+
+
+def _label_key(text: str) -> str:
+    return " ".join(text.split()).rstrip(":").strip().lower()
+
+
+class _AdminPage(HTMLParser):
+    """Forms, labels, error lists, messages and changelist links of one admin page."""
+
+    def __init__(self, html: str):
+        super().__init__(convert_charrefs=True)
+        self.forms = []
+        self.labels = {}      # label text (normalised) -> element id
+        self.errors = []      # text of .errorlist / .errornote blocks
+        self.messages = []    # (level, text) from ul.messagelist
+        self.result_links = []
+        self.columns = {}     # changelist column ("field-question_id") -> cell texts, in row order
+        self.paginator = []   # (href, text) of the changelist's page links
+        self._form = None
+        self._select = None
+        self._capture = None  # [kind, extra, [text parts], tag]
+        self._in_messages = False
+        self._in_results = False
+        self._in_paginator = False
+        self.feed(html)
+        self.close()
+
+    # -- parsing -------------------------------------------------------------
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        classes = (a.get("class") or "").split()
+        if tag == "form":
+            self._form = {"action": a.get("action") or "", "method": (a.get("method") or "get").lower(),
+                          "id": a.get("id") or "", "enctype": a.get("enctype") or "",
+                          "fields": [], "names": set(), "ids": {}, "selects": {},
+                          "checkboxes": {}, "files": []}
+            self.forms.append(self._form)
+        elif tag == "input" and self._form is not None:
+            self._input(a)
+        elif tag == "textarea" and self._form is not None and a.get("name"):
+            self._register(a)
+            self._capture = ["textarea", a["name"], [], tag]
+        elif tag == "select" and self._form is not None and a.get("name"):
+            self._register(a)
+            self._select = {"name": a["name"], "options": [], "multiple": "multiple" in a, "selected": False}
+            self._form["selects"][a["name"]] = self._select
+        elif tag == "option" and self._select is not None:
+            self._capture = ["option", (a.get("value"), "selected" in a), [], tag]
+        elif tag == "label" and a.get("for"):
+            self._capture = ["label", a["for"], [], tag]
+        elif tag == "ul" and "messagelist" in classes:
+            self._in_messages = True
+        elif tag == "li" and self._in_messages:
+            self._capture = ["message", classes[0] if classes else "info", [], tag]
+        elif "errorlist" in classes or "errornote" in classes:
+            self._capture = ["error", None, [], tag]
+        elif tag == "table" and a.get("id") == "result_list":
+            self._in_results = True
+        elif tag in ("td", "th") and self._in_results and any(c.startswith("field-") for c in classes):
+            column = next(c for c in classes if c.startswith("field-"))
+            self._capture = ["cell", column, [], tag]
+        elif tag == "p" and "paginator" in classes:
+            self._in_paginator = True
+        elif tag == "a" and self._in_paginator and a.get("href"):
+            self._capture = ["pagelink", a["href"], [], tag]
+        if tag == "a" and self._in_results and a.get("href"):
+            self.result_links.append(a["href"])
+
+    def handle_data(self, data):
+        if self._capture is not None:
+            self._capture[2].append(data)
+
+    def handle_endtag(self, tag):
+        cap = self._capture
+        if cap is not None and cap[3] == tag:
+            self._capture = None
+            kind, extra, text = cap[0], cap[1], "".join(cap[2])
+            if kind == "textarea":
+                # Like browsers, drop the newline Django emits right after <textarea>.
+                self._form["fields"].append([extra, text[1:] if text.startswith("\n") else text])
+            elif kind == "option":
+                value, selected = extra
+                value = text.strip() if value is None else value
+                self._select["options"].append((value, text.strip()))
+                if selected:
+                    self._select["selected"] = True
+                    self._form["fields"].append([self._select["name"], value])
+            elif kind == "label":
+                self.labels.setdefault(_label_key(text), extra)
+            elif kind == "message":
+                self.messages.append((extra, " ".join(text.split())))
+            elif kind == "error" and text.strip():
+                self.errors.append(" ".join(text.split()))
+            elif kind == "cell":
+                self.columns.setdefault(extra, []).append(" ".join(text.split()))
+            elif kind == "pagelink":
+                self.paginator.append((extra, text.strip()))
+        if tag == "select" and self._select is not None:
+            sel = self._select
+            if not sel["selected"] and not sel["multiple"] and sel["options"]:
+                # A browser submits the first option of a single select with nothing selected.
+                self._form["fields"].append([sel["name"], sel["options"][0][0]])
+            self._select = None
+        elif tag == "form":
+            self._form = None
+        elif tag == "ul":
+            self._in_messages = False
+        elif tag == "table":
+            self._in_results = False
+        elif tag == "p":
+            self._in_paginator = False
+
+    def _register(self, a):
+        self._form["names"].add(a["name"])
+        if a.get("id"):
+            self._form["ids"][a["id"]] = a["name"]
+
+    def _input(self, a):
+        name = a.get("name")
+        if not name:
+            return
+        kind = (a.get("type") or "text").lower()
+        if kind in _SKIP_INPUTS:
+            return
+        self._register(a)
+        if kind == "file":
+            self._form["files"].append(name)
+        elif kind in ("checkbox", "radio"):
+            if kind == "checkbox":
+                self._form["checkboxes"][name] = a.get("value") or "on"
+            if "checked" in a:
+                self._form["fields"].append([name, a.get("value") or "on"])
+        else:
+            self._form["fields"].append([name, a.get("value") or ""])
+
+    # -- lookups ---------------------------------------------------------------
+    def change_form(self):
+        """The admin's model form: a POST form carrying the CSRF token."""
+        candidates = [f for f in self.forms
+                      if f["method"] == "post" and "csrfmiddlewaretoken" in f["names"]]
+        for f in candidates:
+            if f["id"].endswith("_form"):
+                return f
+        return candidates[0] if candidates else None
+
+
+def page_urls(page_url: str, links) -> list:
+    """URLs of a changelist's other pages, given its paginator links [(href, text)].
+
+    Django elides the middle of long paginators ("1 2 … 9 10"), so the pages
+    are rebuilt from the numbered links: the gap between a link's text and its
+    ?p= value tells whether this admin counts pages from 0 or 1.
+    """
+    numbered = []
+    for href, text in links:
+        query = dict(parse_qsl(urlsplit(href).query, keep_blank_values=True))
+        if text.isdigit() and query.get("p", "").isdigit():
+            numbered.append((int(text), int(query["p"]), href))
+    if not numbered:
+        return []
+    base = int(numbered[0][0]) - numbered[0][1]
+    last = max(n for n, _, _ in numbered)
+    current = dict(parse_qsl(urlsplit(page_url).query)).get("p")
+    current = int(current) + base if current and current.isdigit() else 1
+    template = urlsplit(urljoin(page_url, numbered[0][2]))
+    query = dict(parse_qsl(template.query, keep_blank_values=True))
+    urls = []
+    for n in range(1, last + 1):
+        if n != current:
+            query["p"] = str(n - base)
+            urls.append(urlunsplit(template._replace(query=urlencode(query))))
+    return urls
+
+
+class AdminClient:
+    """A logged-in requests session for one Django admin (one per script run).
+
+    Safe to share between threads for GETs: a login triggered by an expired
+    session happens once, whichever thread notices first.
+    """
+
+    def __init__(self, login_url: str, username: str, password: str, timeout: float = 30.0,
+                 pool_size: int = 8):
+        self.login_url = login_url
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.logins = 0
+        self._login_lock = threading.Lock()
+        self.http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.http.mount("http://", adapter)
+        self.http.mount("https://", adapter)
+        host = urlsplit(login_url).hostname
+        cached = sessions.load(login_url)
+        for c in cached:
+            self.http.cookies.set(c["name"], c["value"], domain=host, path=c.get("path", "/"))
+        # Counted once, on the first page the cached session opens without a login
+        self._reuse_pending = bool(cached)
+
+    # -- session ---------------------------------------------------------------
+    @spans.timed("login", engine="http")
+    def login(self):
+        sessions.forget(self.login_url)
+        resp = self._request("GET", self.login_url)
+        page = _AdminPage(resp.text)
+        form = page.change_form()
+        if form is None or "username" not in form["names"]:
+            raise FormError(f"No login form at {self.login_url}")
+        data = [(n, v) for n, v in form["fields"] if n not in ("username", "password")]
+        data += [("username", self.username), ("password", self.password)]
+        resp = self._request("POST", urljoin(resp.url, form["action"] or resp.url),
+                             data=data, headers={"Referer": resp.url})
+        if sessions.is_login_page(resp.url):
+            raise FormError("Admin login failed over HTTP")
+        self.logins += 1
+        sessions.save_cookies(self.login_url, [
+            {"name": c.name, "value": c.value, "path": c.path, "secure": bool(c.secure),
+             "httpOnly": c.has_nonstandard_attr("HttpOnly"), "expiry": c.expires}
+            for c in self.http.cookies
+        ])
+
+    def _request(self, method: str, url: str, **kwargs):
+        try:
+            return self.http.request(method, url, timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise FormError(f"{method} {url} failed: {e}") from e
+
+    @spans.timed("navigation", engine="http")
+    def open(self, url: str, **kwargs):
+        """GET an admin page, logging in first if Django redirects to the login page."""
+        resp = self._request("GET", url, **kwargs)
+        if sessions.is_login_page(resp.url) and not sessions.is_login_page(url):
+            with self._login_lock:
+                # Another thread may have logged in while this one waited.
+                resp = self._request("GET", url, **kwargs)
+                if sessions.is_login_page(resp.url):
+                    self.login()
+                    resp = self._request("GET", url, **kwargs)
+            if sessions.is_login_page(resp.url):
+                raise LoggedOut(f"Still redirected to login for {url}")
+        if self._reuse_pending:
+            with self._login_lock:
+                if self._reuse_pending and not self.logins:
+                    spans.event("login_reused", engine="http")
+                self._reuse_pending = False
+        if resp.status_code == 404:
+            raise NotFound(f"GET {url} returned HTTP 404", 404)
+        if resp.status_code >= 400:
+            raise FormError(f"GET {url} returned HTTP {resp.status_code}", resp.status_code)
+        return resp
+
+    # -- admin operations --------------------------------------------------------
+    @spans.timed("search", engine="http")
+    def find_change_url(self, changelist_url: str, query: str):
+        """Search a changelist (?q=) and return the first result's change URL, or None."""
+        resp = self.open(changelist_url, params={"q": query})
+        for href in _AdminPage(resp.text).result_links:
+            if "/change/" in href:
+                return urljoin(resp.url, href)
+        return None
+
+    def changelist(self, url: str, params=None) -> dict:
+        """One changelist page: {"url", "columns", "links", "pages"}.
+
+        columns maps "field-<name>" to that column's cell texts; pages lists
+        the URLs of the changelist's other pages (empty when there is one page).
+        """
+        resp = self.open(url, params=params)
+        page = _AdminPage(resp.text)
+        return {"url": resp.url, "columns": page.columns, "links": page.result_links,
+                "pages": page_urls(resp.url, page.paginator)}
+
+    def change(self, change_url: str, values=None, labels=None, required: bool = True,
+               save: str = "_save") -> dict:
+        """Submit the change form at change_url with some fields replaced.
+
+        values maps field names to new values, labels maps visible label text
+        ("Duration in sec") to new values. Select fields accept an option value
+        or its text; checkboxes take a bool. With required=False, fields missing
+        from the form are skipped instead of raising FormError.
+
+        Returns {"url", "messages", "skipped"} after Django accepted the save.
+        """
+        resp = self.open(change_url)
+        if resp.history and "/change/" not in urlsplit(resp.url).path:
+            # Django sends a missing object back to the admin index with a warning.
+            raise NotFound(f"{change_url} redirected to {resp.url}")
+        page = _AdminPage(resp.text)
+        form = page.change_form()
+        if form is None:
+            raise FormError(f"No admin change form at {change_url}")
+
+        updates = dict(values or {})
+        for label, value in (labels or {}).items():
+            name = form["ids"].get(page.labels.get(_label_key(label), ""))
+            if name is None:
+                if required:
+                    raise FormError(f"No field labelled {label!r} at {change_url}")
+                continue
+            updates[name] = value
+
+        fields = form["fields"]
+        skipped = []
+        for name, value in updates.items():
+            if name not in form["names"]:
+                if required:
+                    raise FormError(f"No field {name!r} at {change_url}")
+                skipped.append(name)
+                continue
+            fields = [f for f in fields if f[0] != name]
+            if name in form["checkboxes"]:
+                if value:
+                    fields.append([name, form["checkboxes"][name]])
+            elif name in form["selects"]:
+                fields.append([name, _option_value(form["selects"][name], value, change_url)])
+            else:
+                fields.append([name, "" if value is None else str(value)])
+
+        data = [tuple(f) for f in fields] + [(save, "Save")]
+        files = None
+        if "multipart" in form["enctype"]:
+            # Empty file parts, as a browser sends them: Django keeps the stored files.
+            files = [(name, ("", b"", "application/octet-stream")) for name in form["files"]] or None
+        with spans.span("save", engine="http"):
+            resp = self._request("POST", urljoin(resp.url, form["action"] or resp.url),
+                                 data=data, files=files, headers={"Referer": resp.url})
+        result = _AdminPage(resp.text)
+        if sessions.is_login_page(resp.url):
+            raise LoggedOut(f"Session lost while saving {change_url}")
+        if resp.status_code == 403:
+            raise FormError(f"POST {change_url} was refused (CSRF?)", 403)
+        if resp.status_code >= 400:
+            raise FormError(f"POST {change_url} returned HTTP {resp.status_code}", resp.status_code)
+        if result.errors:
+            raise ChangeRejected(change_url, result.errors)
+        if not resp.history:
+            # Django redirects after a successful save; staying put means it did not save.
+            raise FormError(f"Save of {change_url} did not redirect")
+        return {"url": resp.url, "messages": result.messages, "skipped": skipped}
+
+
+def _option_value(select: dict, value, change_url: str) -> str:
+    value = str(value)
+    for opt_value, text in select["options"]:
+        if opt_value == value:
+            return opt_value
+    for opt_value, text in select["options"]:
+        if text.lower() == value.lower():
+            return opt_value
+    raise FormError(f"{select['name']!r} has no option {value!r} at {change_url}")
@@ -0,0 +1,89 @@
+# toolkit/browser.py
+"""
+Chrome drivers for the scripts.
+
+make_chrome() builds a webdriver.Chrome from the script's own options, but:
+  - attaches to the browser the backend lent this job (OPSHUB_DEBUGGER_ADDRESS)
+    instead of launching a new Chrome, when there is one;
+  - uses the chromedriver binary the backend resolved (OPSHUB_CHROMEDRIVER)
+    before falling back to webdriver_manager;
+  - in lean mode (params.lean_browser()), uses the "eager" page-load strategy
+    (return at DOMContentLoaded), blocks images, fonts and stylesheets and
+    turns off background Chrome features. Admin forms, waits and the HTTP
+    fast path only need the DOM, so every navigation gets cheaper.
+
+quit() on an attached driver only ends the chromedriver session; the pooled
+browser keeps running for the next job.
+"""
+import os
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+
+from . import params
+from .chrome_flags import LEAN_ARGS
+
+DEBUGGER_ENV = "OPSHUB_DEBUGGER_ADDRESS"
+
+# URL patterns blocked per resource type (Network.setBlockedURLs)
+RESOURCE_PATTERNS = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "stylesheet": ["*.css", "*.css?*"],
+    "media": ["*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg"],
+}
+
+def pooled_address():
+    return os.environ.get(DEBUGGER_ENV) or None
+
+
+def _lean_options(options, launching: bool):
+    options.page_load_strategy = "eager"
+    if not launching:
+        return
+    for arg in LEAN_ARGS:
+        if arg not in options.arguments:
+            options.add_argument(arg)
+    if "image" in params.blocked_resources():
+        prefs = dict(options.experimental_options.get("prefs") or {})
+        prefs["profile.managed_default_content_settings.images"] = 2
+        options.add_experimental_option("prefs", prefs)
+
+
+def block_resources(driver, types=None):
+    """Stop the browser fetching these resource types (default: params.blocked_resources())."""
+    patterns = [p for t in (params.blocked_resources() if types is None else types)
+                for p in RESOURCE_PATTERNS.get(t, ())]
+    if not patterns:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except WebDriverException:
+        pass  # not fatal: the page just loads in full
+
+
+def make_chrome(options, use_driver_manager: bool = True) -> webdriver.Chrome:
+    address = pooled_address()
+    if address:
+        # Launch-time flags (headless, profile, window size) belong to the pool's browser.
+        options = webdriver.ChromeOptions()
+        options.debugger_address = address
+
+    lean = params.lean_browser()
+    if lean:
+        _lean_options(options, launching=not address)
+
+    driver_path = params.chromedriver_path()
+    if driver_path:
+        service = Service(driver_path)
+    elif use_driver_manager:
+        from webdriver_manager.chrome import ChromeDriverManager
+        service = Service(ChromeDriverManager().install())
+    else:
+        service = Service()
+    driver = webdriver.Chrome(service=service, options=options)
+    if lean:
+        block_resources(driver)
+    return driver
@@ -0,0 +1,21 @@
+# toolkit/chrome_flags.py
+"""
+Chrome launch flags for lean mode, in one place for both launchers: the
+scripts' own Chrome (toolkit.browser) and the backend's browser pool, which
+loads this file directly. Plain data, no imports, so the backend can read it
+without importing the rest of the toolkit.
+"""
+
+# Background services and features a job never needs
+LEAN_ARGS = (
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--mute-audio",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+)
+
+# Added when images are among the blocked resources
+NO_IMAGES_ARG = "--blink-settings=imagesEnabled=false"
@@ -0,0 +1,126 @@
+# toolkit/google_sheets.py
+"""
+Spreadsheet title and tab names over plain HTTP.
+
+A link-shared sheet serves its name and tab bar in the HTML of both the
+editor (/edit) and the static viewer (/htmlview), so reading them needs two
+GETs rather than a Chrome session:
+
+    try:
+        title, tabs = google_sheets.read_info(sheet_url)
+    except google_sheets.SheetUnavailable:
+        ...  # restricted sheet or unfamiliar markup: read it in the browser
+
+Requests go to the scheme and host of the URL given, so a local fixture
+server (scripts/dev/mock_sheets.py) can stand in for docs.google.com.
+"""
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+
+TITLE_SUFFIXES = (" - Google Sheets", " - Google Drive")
+
+_ID = re.compile(r"/spreadsheets/d/([A-Za-z0-9_-]+)")
+_HEADERS = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome Safari/537.36"}
+
+
+class SheetUnavailable(Exception):
+    """The sheet could not be read over HTTP (private, missing, or markup not recognised)."""
+
+
+def spreadsheet_id(sheet_url: str) -> str:
+    match = _ID.search(sheet_url)
+    if not match:
+        raise SheetUnavailable(f"Not a Google Sheets URL: {sheet_url}")
+    return match.group(1)
+
+
+def clean_title(title: str) -> str:
+    title = " ".join(title.split())
+    for suffix in TITLE_SUFFIXES:
+        if title.endswith(suffix):
+            return title[: -len(suffix)].strip()
+    return title
+
+
+class _SheetPage(HTMLParser):
+    """<title>, og:title and the tab names of an /edit or /htmlview page."""
+
+    def __init__(self, html: str):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.og_title = ""
+        self.tabs = []
+        self._capture = None  # [kind, [text parts], tag, open count]
+        self.feed(html)
+        self.close()
+
+    def handle_starttag(self, tag, attrs):
+        a = dict(attrs)
+        if tag == "meta" and a.get("property") == "og:title":
+            self.og_title = a.get("content") or ""
+        if self._capture is not None:
+            if tag == self._capture[2]:
+                self._capture[3] += 1
+            return
+        if tag == "title":
+            self._capture = ["title", [], tag, 1]
+        elif "docs-sheet-tab-name" in (a.get("class") or "").split():
+            # Editor tab bar
+            self._capture = ["tab", [], tag, 1]
+        elif tag == "li" and (a.get("id") or "").startswith("sheet-button-"):
+            # Static viewer tab menu
+            self._capture = ["tab", [], tag, 1]
+
+    def handle_endtag(self, tag):
+        if self._capture is None or tag != self._capture[2]:
+            return
+        self._capture[3] -= 1
+        if self._capture[3]:
+            return
+        kind, parts, _, _ = self._capture
+        self._capture = None
+        text = " ".join("".join(parts).split())
+        if kind == "title":
+            self.title = text
+        elif text and text not in self.tabs:
+            self.tabs.append(text)
+
+    def handle_data(self, data):
+        if self._capture is not None:
+            self._capture[1].append(data)
+
+
+def _fetch(http, url: str, timeout: float) -> str:
+    try:
+        resp = http.get(url, timeout=timeout, headers=_HEADERS)
+    except requests.RequestException as e:
+        raise SheetUnavailable(f"{url}: {e}") from e
+    final = urlsplit(resp.url)
+    # Sheets that are not shared publicly bounce to the Google sign-in page.
+    if final.netloc.startswith("accounts.") or "ServiceLogin" in final.path:
+        raise SheetUnavailable(f"{url}: sign-in required")
+    if resp.status_code >= 400:
+        raise SheetUnavailable(f"{url}: HTTP {resp.status_code}")
+    return resp.text
+
+
+def read_info(sheet_url: str, timeout: float = 15, http=None):
+    """Return (spreadsheet title, [tab names]) or raise SheetUnavailable."""
+    sheet_id = spreadsheet_id(sheet_url)
+    parts = urlsplit(sheet_url)
+    base = urlunsplit((parts.scheme, parts.netloc, f"/spreadsheets/d/{sheet_id}", "", ""))
+    http = http or requests.Session()
+
+    title, tabs = "", []
+    for url in (f"{base}/edit", f"{base}/htmlview"):
+        page = _SheetPage(_fetch(http, url, timeout))
+        title = title or clean_title(page.title) or clean_title(page.og_title)
+        tabs = tabs or page.tabs
+        if title and tabs:
+            return title, tabs
+    if not tabs:
+        raise SheetUnavailable(f"No sheet tabs found for {sheet_id}")
+    return title or "Untitled spreadsheet", tabs
@@ -0,0 +1,77 @@
+# toolkit/lookup_cache.py
+"""
+Persistent cache of admin lookups, per environment.
+
+Read-only lookups (tag -> question IDs, ...) are kept in a SQLite file under
+the runtime dir, keyed by the admin host, the kind of lookup and its key, so
+repeating a lookup within the TTL never touches the admin. Jobs control it
+through their params:
+
+    {"cache_ttl_seconds": 3600, "force_refresh": true}
+
+force_refresh skips cached answers but still stores the fresh ones.
+"""
+import json
+import sqlite3
+import time
+from urllib.parse import urlsplit
+
+from . import params
+
+DEFAULT_TTL_SECONDS = 6 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lookups (
+    env        TEXT NOT NULL,
+    kind       TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (env, kind, key)
+) WITHOUT ROWID;
+"""
+
+
+class LookupCache:
+    def __init__(self, admin_url: str, kind: str, ttl=None, force_refresh=None, path=None):
+        self.env = urlsplit(admin_url).netloc
+        self.kind = kind
+        self.ttl = float(params.get("cache_ttl_seconds", DEFAULT_TTL_SECONDS) if ttl is None else ttl)
+        self.force_refresh = bool(params.get("force_refresh", False) if force_refresh is None else force_refresh)
+        path = path or params.runtime_dir() / "lookup_cache.sqlite3"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """Cached value if there is a fresh one (and no forced refresh), else None."""
+        row = None
+        if not self.force_refresh and self.ttl > 0:
+            row = self._db.execute(
+                "SELECT value FROM lookups WHERE env = ? AND kind = ? AND key = ? AND fetched_at >= ?",
+                (self.env, self.kind, key, time.time() - self.ttl),
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value):
+        self._db.execute(
+            "INSERT OR REPLACE INTO lookups (env, kind, key, value, fetched_at) VALUES (?, ?, ?, ?, ?)",
+            (self.env, self.kind, key, json.dumps(value), time.time()),
+        )
+
+    def invalidate(self, key=None):
+        """Drop one key, or every entry of this kind for this environment."""
+        if key is None:
+            self._db.execute("DELETE FROM lookups WHERE env = ? AND kind = ?", (self.env, self.kind))
+        else:
+            self._db.execute("DELETE FROM lookups WHERE env = ? AND kind = ? AND key = ?", (self.env, self.kind, key))
+
+    def close(self):
+        self._db.close()
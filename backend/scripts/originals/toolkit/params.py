@@ -0,0 +1,114 @@
+# toolkit/params.py
+"""
+Job inputs for a script.
+
+The backend writes each job's inputs to a JSON file and names it in the
+OPSHUB_PARAMS env var ("-" reads the JSON from stdin instead). Scripts ask for
+the values they need and keep their own defaults for manual runs:
+
+    uuid_list = params.get("uuid_list", ["b31d7aa4-..."])
+
+Browser preferences (headless, lean mode) come from the backend's settings
+through env vars; a job's own "headless" / "lean_browser" params win.
+
+Admin credentials never live in the script source: admin_credentials() reads
+the job's "admin_username" / "admin_password" params, else the
+OPSHUB_ADMIN_USERNAME / OPSHUB_ADMIN_PASSWORD env vars (jobs inherit the
+backend's environment).
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+PARAMS_ENV = "OPSHUB_PARAMS"
+ADMIN_USERNAME_ENV = "OPSHUB_ADMIN_USERNAME"
+ADMIN_PASSWORD_ENV = "OPSHUB_ADMIN_PASSWORD"
+
+_params = None
+
+
+def load() -> dict:
+    global _params
+    if _params is None:
+        src = os.environ.get(PARAMS_ENV)
+        if not src:
+            _params = {}
+        elif src == "-":
+            _params = json.load(sys.stdin)
+        else:
+            with open(src, encoding="utf-8") as f:
+                _params = json.load(f)
+    return _params
+
+
+def provided() -> bool:
+    """True when the script is running as a backend job."""
+    return bool(os.environ.get(PARAMS_ENV))
+
+
+def get(name: str, default=None):
+    return load().get(name, default)
+
+
+def admin_url(url: str) -> str:
+    """url, moved onto the job's "admin_base_url" (e.g. a stand-in admin) when one is given."""
+    base = get("admin_base_url")
+    if not base:
+        return url
+    from urllib.parse import urlsplit, urlunsplit
+    target, parts = urlsplit(base), urlsplit(url)
+    return urlunsplit((target.scheme, target.netloc, parts.path, parts.query, parts.fragment))
+
+
+class MissingCredentials(RuntimeError):
+    """No admin password was configured for the job."""
+
+
+def admin_credentials(default_username: str):
+    """(username, password) for the Django admin; raises MissingCredentials without a password."""
+    username = get("admin_username") or os.environ.get(ADMIN_USERNAME_ENV) or default_username
+    password = get("admin_password") or os.environ.get(ADMIN_PASSWORD_ENV)
+    if not password:
+        raise MissingCredentials(f"No admin password: set {ADMIN_PASSWORD_ENV} in the backend's "
+                                 f"environment or pass \"admin_password\" in the job params")
+    return username, password
+
+
+def chromedriver_path():
+    """chromedriver binary resolved by the backend, if it found one."""
+    return os.environ.get("OPSHUB_CHROMEDRIVER") or None
+
+
+def runtime_dir() -> Path:
+    """Backend runtime directory (shared caches live here)."""
+    env = os.environ.get("OPSHUB_RUNTIME_DIR")
+    return Path(env) if env else Path(__file__).resolve().parents[3] / "runtime"
+
+
+def _flag(name: str, env: str, default: bool) -> bool:
+    value = load().get(name)
+    if value is not None:
+        return bool(value)
+    env_value = os.environ.get(env)
+    if env_value is None or env_value == "":
+        return default
+    return env_value.lower() not in ("0", "false", "no", "off")
+
+
+def headless(default: bool) -> bool:
+    """Run Chrome headless? Job param, else the backend's setting, else the script's default."""
+    return _flag("headless", "OPSHUB_HEADLESS", default)
+
+
+def lean_browser() -> bool:
+    """Lean browsing (eager loads, blocked assets); off for manual runs unless asked for."""
+    return _flag("lean_browser", "OPSHUB_LEAN_BROWSER", False)
+
+
+def blocked_resources():
+    """Resource types lean mode blocks ("image", "font", "stylesheet", "media")."""
+    env = os.environ.get("OPSHUB_BLOCK_RESOURCES")
+    if env is None:
+        return ["image", "font", "stylesheet"]
+    return [t.strip() for t in env.split(",") if t.strip()]
@@ -0,0 +1,183 @@
+# toolkit/retry.py
+"""
+Per-item retries and a circuit breaker for admin jobs.
+
+    policy = retry.Policy()
+    for uid in uuids:
+        try:
+            policy.run(lambda: process(uid), item=uid)
+        except retry.CircuitOpen:
+            raise            # the admin keeps failing: stop, the job can be resumed
+        except Exception:
+            ...              # this item failed for good
+
+run() retries an item only for errors worth another try:
+
+    timeout       Selenium wait or HTTP request timed out
+    stale         the page re-rendered under a Selenium element
+    logged_out    Django sent us back to the login page
+    server_error  the admin answered 5xx
+    connection    the admin could not be reached
+
+Anything else (validation errors, missing objects, bugs) fails the item at
+once. Retries wait with exponential backoff and jitter. Timeouts, 5xx and
+connection errors are the admin's fault: after "breaker_failures" of them in a
+row the breaker opens and the job pauses for "breaker_cooldown" seconds
+(doubling each time), then tries one item. A success closes it again; after
+"breaker_trips" pauses in a row run() raises CircuitOpen instead of burning
+through the rest of the list.
+
+Tuned per job through the "retry" param:
+
+    {"retry": {"attempts": 3, "backoff": 1.0, "max_backoff": 30,
+               "breaker_failures": 5, "breaker_cooldown": 30, "breaker_trips": 3}}
+"""
+import random
+import threading
+import time
+
+import requests
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+from . import admin_http, params, spans
+
+DEFAULTS = {"attempts": 3, "backoff": 1.0, "max_backoff": 30.0,
+            "breaker_failures": 5, "breaker_cooldown": 30.0, "breaker_trips": 3}
+
+# Errors that say the admin itself is struggling (these drive the breaker)
+ADMIN_ERRORS = ("timeout", "server_error", "connection")
+
+
+def _print(line: str):
+    print(line, flush=True)
+
+
+class CircuitOpen(RuntimeError):
+    """The admin kept failing through every breaker pause; stop the job."""
+
+
+def _chain(exc):
+    """exc and the errors it was raised from (raise ... from e)."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__
+
+
+def classify(exc):
+    """Kind of a retryable error (see the module doc), or None when retrying will not help."""
+    for e in _chain(exc):
+        if isinstance(e, StaleElementReferenceException):
+            return "stale"
+        if isinstance(e, admin_http.LoggedOut):
+            return "logged_out"
+        if isinstance(e, (TimeoutException, requests.Timeout, TimeoutError)):
+            return "timeout"
+        if (getattr(e, "status", None) or 0) >= 500:
+            return "server_error"
+        if isinstance(e, requests.ConnectionError):
+            return "connection"
+    return None
+
+
+class CircuitBreaker:
+    """Counts consecutive admin errors across items; pauses the job when they pile up."""
+
+    def __init__(self, failures: int, cooldown: float, max_trips: int, log=_print):
+        self.log = log
+        self.failures = max(1, failures)
+        self.cooldown = cooldown
+        self.max_trips = max_trips
+        self.consecutive = 0
+        self.trips = 0
+        self.open_until = None
+        self._lock = threading.Lock()
+
+    def before(self):
+        """Wait out an open breaker; raises CircuitOpen once it has tripped max_trips times in a row."""
+        with self._lock:
+            if self.open_until is None:
+                return
+            if self.trips > self.max_trips:
+                raise CircuitOpen(f"admin failed {self.consecutive} times in a row through "
+                                  f"{self.max_trips} pauses; stopping")
+            pause = self.open_until - time.monotonic()
+            # Half-open: the next attempt is a probe, one more admin error re-opens the breaker.
+            self.open_until = None
+            self.consecutive = self.failures - 1
+        if pause > 0:
+            self.log(f"⏸ Admin keeps failing; pausing {pause:.0f}s (pause {self.trips}/{self.max_trips})")
+            with spans.span("circuit_pause", trip=self.trips):
+                time.sleep(pause)
+
+    def record(self, ok: bool):
+        with self._lock:
+            if ok:
+                self.consecutive = 0
+                self.trips = 0
+                return
+            self.consecutive += 1
+            if self.consecutive >= self.failures and self.open_until is None:
+                self.trips += 1
+                self.open_until = time.monotonic() + self.cooldown * 2 ** (self.trips - 1)
+
+    @property
+    def stopped(self) -> bool:
+        return self.trips > self.max_trips
+
+
+class Policy:
+    """Bounded, jittered retries per item, sharing one circuit breaker across the job.
+
+    relogin, when given, is called before retrying a logged_out error; log
+    receives one line per retry or pause (default: printed).
+    """
+
+    def __init__(self, relogin=None, log=_print, **overrides):
+        config = {**DEFAULTS, **(params.get("retry") or {}), **overrides}
+        self.attempts = max(1, int(config["attempts"]))
+        self.backoff = float(config["backoff"])
+        self.max_backoff = float(config["max_backoff"])
+        self.relogin = relogin
+        self.log = log
+        self.breaker = CircuitBreaker(int(config["breaker_failures"]), float(config["breaker_cooldown"]),
+                                      int(config["breaker_trips"]), log)
+        self.retries = 0
+
+    @property
+    def stopped(self) -> bool:
+        """True once the breaker gave up on the admin."""
+        return self.breaker.stopped
+
+    def delay(self, attempt: int) -> float:
+        """Backoff before retry number `attempt`: half fixed, half random (equal jitter)."""
+        cap = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return cap / 2 + random.uniform(0, cap / 2)
+
+    def run(self, fn, item=None):
+        """fn() with retries; returns its result or raises its last error (or CircuitOpen)."""
+        attempt = 0
+        while True:
+            self.breaker.before()
+            attempt += 1
+            try:
+                result = fn()
+            except CircuitOpen:
+                raise
+            except Exception as e:
+                kind = classify(e)
+                if kind in ADMIN_ERRORS:
+                    self.breaker.record(False)
+                if kind is None or attempt >= self.attempts:
+                    raise
+                wait = self.delay(attempt)
+                self.retries += 1
+                spans.event("retry", item=item, kind=kind, attempt=attempt)
+                self.log(f"↻ {item or 'item'}: {kind} ({e}); retry {attempt}/{self.attempts - 1} in {wait:.1f}s")
+                time.sleep(wait)
+                if kind == "logged_out" and self.relogin is not None:
+                    self.relogin()
+                continue
+            self.breaker.record(True)
+            return result
@@ -0,0 +1,135 @@
+# toolkit/sessions.py
+"""
+Django admin session cache.
+
+After a successful login the admin's sessionid/csrftoken cookies are saved
+per environment (admin host) under <runtime>/sessions/. New drivers get them
+injected before their first admin page, and the session is only revalidated
+lazily: we log in again only when Django redirects a navigation to
+/admin/login/.
+
+    session = sessions.AdminSession(driver, LOGIN_URL, lambda: login(driver, ...))
+    session.get(change_url)   # logs in (and re-caches) only if bounced to login
+"""
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+from . import params, spans
+
+COOKIE_NAMES = ("sessionid", "csrftoken")
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _store_path(url: str):
+    return params.runtime_dir() / "sessions" / f"{_host(url).replace(':', '_')}.json"
+
+
+def is_login_page(url: str) -> bool:
+    return "/admin/login" in urlsplit(url or "").path
+
+
+def load(url: str):
+    """Cached admin cookies for this environment, dropping expired ones."""
+    try:
+        with open(_store_path(url), encoding="utf-8") as f:
+            cookies = json.load(f).get("cookies", [])
+    except (FileNotFoundError, ValueError):
+        return []
+    now = time.time()
+    cookies = [c for c in cookies if not c.get("expiry") or c["expiry"] > now]
+    return cookies if any(c["name"] == "sessionid" for c in cookies) else []
+
+
+def save(driver, url: str):
+    save_cookies(url, driver.get_cookies())
+
+
+def save_cookies(url: str, cookies):
+    """Cache admin cookies given as Selenium-style dicts (name, value, path, expiry, ...)."""
+    cookies = [c for c in cookies if c.get("name") in COOKIE_NAMES]
+    if not any(c["name"] == "sessionid" for c in cookies):
+        return
+    path = _store_path(url)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"saved_at": time.time(), "cookies": cookies}, f)
+    os.replace(tmp, path)
+
+
+def forget(url: str):
+    try:
+        os.remove(_store_path(url))
+    except FileNotFoundError:
+        pass
+
+
+def restore(driver, url: str) -> bool:
+    """Inject cached cookies into the driver; True if there were any."""
+    cookies = load(url)
+    if not cookies:
+        return False
+    origin = _origin(url)
+    try:
+        # CDP sets cookies without first loading a page on the admin's domain.
+        for c in cookies:
+            cookie = {"name": c["name"], "value": c["value"], "url": origin,
+                      "path": c.get("path", "/"), "secure": c.get("secure", False),
+                      "httpOnly": c.get("httpOnly", False)}
+            if c.get("expiry"):
+                cookie["expires"] = c["expiry"]
+            driver.execute_cdp_cmd("Network.setCookie", cookie)
+    except Exception:
+        driver.get(url)
+        for c in cookies:
+            driver.add_cookie({k: v for k, v in c.items() if k in ("name", "value", "path", "secure", "httpOnly", "expiry")})
+    return True
+
+
+class AdminSession:
+    """Logged-in navigation for one Django admin, backed by the cookie cache."""
+
+    def __init__(self, driver, login_url: str, login):
+        self.driver = driver
+        self.login_url = login_url
+        self._login = login
+        self.logins = 0
+        self.cache_hits = 0
+        self._restored = False
+
+    def login(self):
+        # The script's login callable records its own "login" span.
+        forget(self.login_url)
+        self._login()
+        self.logins += 1
+        save(self.driver, self.login_url)
+        print("🔑 Logged in to admin; session cached.", flush=True)
+
+    @spans.timed("navigation")
+    def get(self, url: str):
+        """Navigate to an admin page, logging in only if Django redirects to the login page."""
+        restored = False
+        if not self._restored:
+            self._restored = True
+            restored = restore(self.driver, self.login_url)
+        self.driver.get(url)
+        if is_login_page(self.driver.current_url) and not is_login_page(url):
+            self.login()
+            self.driver.get(url)
+            if is_login_page(self.driver.current_url):
+                raise RuntimeError("Admin login failed; still on the login page.")
+        elif restored:
+            self.cache_hits += 1
+            spans.event("login_reused")
+            print("🔐 Reused cached admin session; skipped login.", flush=True)
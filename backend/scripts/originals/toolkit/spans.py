@@ -0,0 +1,77 @@
+# toolkit/spans.py
+"""
+Timing spans for the steps of a job.
+
+Each span becomes one JSON record: phase, item, start (epoch seconds),
+seconds, ok and, on an exception, its type in error. Backend jobs append
+them to the file named in OPSHUB_SPANS (shared by every shard of the job)
+and the backend ends the job log with per-phase p50/p95/max and items/sec.
+Manual runs print them to stderr as "SPAN {...}" lines.
+
+    @spans.timed("login")
+    def login(): ...
+
+    with spans.span("item", item=uuid) as s:
+        ...
+        s["ok"] = False   # the item failed without raising
+
+The "item" phase marks one unit of work and drives items/sec; "login" and
+"login_reused" count real logins against cached sessions that saved one.
+Item records are also the job's checkpoint journal: give item= the UUID /
+multimedia_id / tag exactly as it appears in the job's inputs, so a resumed
+job can skip what is already done.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+SPANS_ENV = "OPSHUB_SPANS"
+
+_lock = threading.Lock()
+
+
+def emit(record: dict):
+    line = json.dumps(record, separators=(",", ":"), ensure_ascii=False)
+    path = os.environ.get(SPANS_ENV)
+    with _lock:
+        if path:
+            # One short append per record, so concurrent shards never interleave lines.
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        else:
+            print("SPAN " + line, file=sys.stderr, flush=True)
+
+
+@contextmanager
+def span(phase: str, item=None, **fields):
+    record = {"phase": phase, "item": item, **fields, "start": time.time(), "ok": True}
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["ok"] = False
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        record["seconds"] = round(time.perf_counter() - started, 6)
+        emit(record)
+
+
+def event(phase: str, item=None, **fields):
+    """A zero-length span, for things worth counting rather than timing."""
+    emit({"phase": phase, "item": item, **fields, "start": time.time(), "ok": True, "seconds": 0.0})
+
+
+def timed(phase: str, **fields):
+    """Decorator: run the function inside a span of this phase."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with span(phase, **fields):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
@@ -0,0 +1,70 @@
+# toolkit/url_index.py
+"""
+Persistent index of admin change URLs.
+
+Finding an object's change page through the changelist search costs a
+search page load and a click. The answer rarely changes, so it is kept in a
+small SQLite file under the runtime dir, keyed by (changelist URL, search
+term). Scripts look up first and only search on a miss; a cached URL that
+stops pointing at a change form is forgotten and searched again.
+
+    index = url_index.UrlIndex()
+    change_url = index.get(TARGET_URL, uid)   # None on a miss
+    index.put(TARGET_URL, uid, change_url)
+"""
+import sqlite3
+import time
+
+from . import params
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS change_urls (
+    changelist TEXT NOT NULL,
+    item       TEXT NOT NULL,
+    change_url TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (changelist, item)
+) WITHOUT ROWID;
+"""
+
+
+def default_path():
+    return params.runtime_dir() / "admin_urls.sqlite3"
+
+
+class UrlIndex:
+    def __init__(self, path=None):
+        path = path or default_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Parallel shards of one job share the file; WAL keeps readers off the writer's back.
+        self._db = sqlite3.connect(str(path), timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def get(self, changelist: str, item: str):
+        row = self._db.execute(
+            "SELECT change_url FROM change_urls WHERE changelist = ? AND item = ?", (changelist, item)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, changelist: str, item: str, change_url: str):
+        change_url = change_url.split("?", 1)[0]  # drop _changelist_filters from the search
+        self._db.execute(
+            "INSERT OR REPLACE INTO change_urls (changelist, item, change_url, updated_at) VALUES (?, ?, ?, ?)",
+            (changelist, item, change_url, time.time()),
+        )
+
+    def forget(self, changelist: str, item: str):
+        self.stale += 1
+        self._db.execute("DELETE FROM change_urls WHERE changelist = ? AND item = ?", (changelist, item))
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,104 @@
+# toolkit/waits.py
+"""
+Condition-based waits for Django admin pages.
+
+Instead of sleeping a fixed time, scripts wait for the thing they actually
+need (a form field, the URL leaving the login page, Django's answer to a
+save) and move on as soon as it is there. Every wait has an upper bound,
+taken from the job's "waits" param when given, else the defaults below:
+
+    {"waits": {"page": 20, "login": 20, "save": 30}}
+
+save_result() returns what Django answered instead of raising, so the caller
+decides how to log it.
+"""
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from . import params
+
+DEFAULT_TIMEOUTS = {"page": 20.0, "login": 20.0, "save": 30.0}
+POLL_SECONDS = 0.1
+
+_SUCCESS = (By.CSS_SELECTOR, "ul.messagelist li.success")
+_MESSAGES = (By.CSS_SELECTOR, "ul.messagelist li")
+_ERRORS = (By.CSS_SELECTOR, ".errornote, ul.errorlist li")
+
+
+def timeout(kind: str) -> float:
+    """Upper bound in seconds for one kind of wait ("page", "login", "save")."""
+    configured = params.get("waits") or {}
+    return float(configured.get(kind, DEFAULT_TIMEOUTS[kind]))
+
+
+def _wait(driver, kind: str, seconds=None) -> WebDriverWait:
+    return WebDriverWait(driver, timeout(kind) if seconds is None else seconds, poll_frequency=POLL_SECONDS)
+
+
+def page_ready(driver, seconds=None):
+    """Wait for the current document to finish loading."""
+    _wait(driver, "page", seconds).until(
+        lambda d: d.execute_script("return document.readyState") == "complete")
+
+
+def element(driver, locator, seconds=None, visible: bool = False):
+    """Wait for an element to be present (or visible) and return it."""
+    cond = EC.visibility_of_element_located if visible else EC.presence_of_element_located
+    return _wait(driver, "page", seconds).until(cond(locator))
+
+
+def clickable(driver, locator, seconds=None):
+    return _wait(driver, "page", seconds).until(EC.element_to_be_clickable(locator))
+
+
+def url_changes(driver, old_url: str, seconds=None):
+    _wait(driver, "page", seconds).until(EC.url_changes(old_url))
+
+
+def _texts(driver, locator):
+    try:
+        return [el.text.strip() for el in driver.find_elements(*locator) if el.text.strip()]
+    except WebDriverException:
+        return []
+
+
+def after_login(driver, login_url: str, seconds=None):
+    """Wait until the login form is submitted; raise RuntimeError if Django rejects it."""
+    def settled(d):
+        if "/admin/login" not in d.current_url:
+            return True
+        return bool(d.find_elements(*_ERRORS))
+    try:
+        _wait(driver, "login", seconds).until(settled)
+    except TimeoutException:
+        raise RuntimeError(f"Login did not complete within {timeout('login') if seconds is None else seconds:g}s")
+    if "/admin/login" in driver.current_url:
+        raise RuntimeError("Login rejected: " + "; ".join(_texts(driver, _ERRORS) or ["still on the login page"]))
+
+
+def save_result(driver, old_url: str, seconds=None) -> dict:
+    """Wait for Django's answer to a save and describe it.
+
+    Done when a success message shows up, the URL moves away from the change
+    form (Django redirects after saving), or the form comes back with errors.
+    Returns {"ok", "url", "messages", "errors", "timed_out"}.
+    """
+    def answered(d):
+        return (d.find_elements(*_SUCCESS) or d.current_url != old_url
+                or d.find_elements(*_ERRORS))
+    timed_out = False
+    try:
+        _wait(driver, "save", seconds).until(answered)
+    except TimeoutException:
+        timed_out = True
+    errors = _texts(driver, _ERRORS)
+    url = driver.current_url
+    return {
+        "ok": not timed_out and not errors,
+        "url": url,
+        "messages": _texts(driver, _MESSAGES),
+        "errors": errors,
+        "timed_out": timed_out,
+    }
@@ -0,0 +1,128 @@
+# backend/tests/conftest.py
+"""
+Shared fixtures. Run from backend/:  python -m pytest -q
+
+The backend (app), the scripts' toolkit and the dev stand-ins (mock_admin,
+mock_sheets) are imported the way they run: app from backend/, toolkit from
+scripts/originals/, the mocks from scripts/dev/.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+BACKEND = Path(__file__).resolve().parents[1]
+for path in (BACKEND, BACKEND / "scripts" / "originals", BACKEND / "scripts" / "dev"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+# Settings are read when app.core.settings is first imported (and the runner
+# creates its dirs on import): keep the suite out of backend/runtime.
+_RUNTIME = Path(tempfile.mkdtemp(prefix="opshub-tests-"))
+os.environ.setdefault("RUNTIME_DIR", str(_RUNTIME))
+os.environ.setdefault("OUTPUTS_DIR", str(_RUNTIME / "outputs"))
+os.environ.setdefault("JOBS_DB_PATH", str(_RUNTIME / "jobs.sqlite3"))
+
+# Stand-in for a script: sleeps for its "sleep" param, prints its items, exits with "exit".
+FAKE_SCRIPT = """\
+import json, os, sys, time
+params = json.load(open(os.environ["OPSHUB_PARAMS"]))
+time.sleep(float(params.get("sleep", 0)))
+print("items:", params.get("uuid_list"), flush=True)
+sys.exit(int(params.get("exit", 0)))
+"""
+
+
+@pytest.fixture
+def runtime_dir(tmp_path, monkeypatch):
+    """A throwaway runtime dir for the toolkit's caches (admin sessions, lookups), no job params."""
+    from toolkit import params
+
+    monkeypatch.setenv("OPSHUB_RUNTIME_DIR", str(tmp_path))
+    monkeypatch.delenv("OPSHUB_PARAMS", raising=False)
+    monkeypatch.delenv("OPSHUB_SPANS", raising=False)
+    monkeypatch.setattr(params, "_params", None)
+    return tmp_path
+
+
+@pytest.fixture
+def admin_server(runtime_dir):
+    """A stand-in admin on a free port; yields the server (state at server.state)."""
+    import mock_admin
+
+    server = mock_admin.make_server(state=mock_admin.AdminState())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def sheets_server(runtime_dir):
+    """Stand-in Google Sheets on a free port; yields the server (state at server.state)."""
+    import mock_sheets
+
+    server = mock_sheets.make_server(state=mock_sheets.SheetsState())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def job_store(tmp_path, monkeypatch):
+    """app.services.job_store on a fresh database."""
+    from app.core.settings import settings
+    from app.services import job_store
+
+    monkeypatch.setattr(settings, "jobs_db_path", tmp_path / "jobs.sqlite3")
+    monkeypatch.setattr(job_store, "_conn", None)
+    yield job_store
+    if job_store._conn is not None:
+        job_store._conn.close()
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch, job_store):
+    """Settings for running the backend in-process: a fresh runtime dir, cold
+    workers, no browser pool, and FAKE_SCRIPT under every task's script name.
+
+    Returns the settings; tests change worker_count / queue_max_size as needed.
+    """
+    from app.core.settings import settings
+
+    originals = tmp_path / "originals"
+    originals.mkdir()
+    for name in ("duration_remover.py", "ppt_to_video_updater.py", "s3_url_updater.py"):
+        (originals / name).write_text(FAKE_SCRIPT)
+    monkeypatch.setattr(settings, "runtime_dir", tmp_path / "runtime")
+    monkeypatch.setattr(settings, "outputs_dir", tmp_path / "runtime" / "outputs")
+    monkeypatch.setattr(settings, "originals_dir", originals)
+    monkeypatch.setattr(settings, "warm_workers", False)
+    monkeypatch.setattr(settings, "browser_pool_size", 0)
+    monkeypatch.setattr(settings, "chromedriver_auto_install", False)
+    monkeypatch.setattr(settings, "loop_lag_interval_seconds", 0)
+    monkeypatch.setattr(settings, "log_flush_seconds", 0.05)
+    settings.outputs_dir.mkdir(parents=True)
+    return settings
+
+
+async def wait_for_status(job_id: str, statuses=("finished", "failed", "timeout", "error"), timeout: float = 20):
+    """Poll the registry until the job reaches one of statuses; returns it."""
+    from app.services import job_store
+
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        status = job_store.get_status(job_id)
+        if status in statuses:
+            return status
+        await asyncio.sleep(0.05)
+    raise AssertionError(f"job {job_id} still {job_store.get_status(job_id)} after {timeout}s")
@@ -0,0 +1,222 @@
+# backend/tests/test_admin_http.py
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, parse_qsl, urlsplit
+
+import pytest
+
+import mock_admin
+from toolkit import admin_http
+
+UNIT = "nkb_resources/unit"
+RESOURCE = "nkb_learning_resource/learningresource"
+PK = "3f2b6a0e-0000-4000-8000-000000000001"
+
+
+@pytest.fixture
+def client(admin_server):
+    return admin_http.AdminClient(f"{admin_server.base_url}/admin/login/",
+                                  mock_admin.USERNAME, mock_admin.PASSWORD)
+
+
+def change_url(server, model, pk=PK):
+    return f"{server.base_url}/admin/{model}/{pk}/change/"
+
+
+# -- change forms against the stand-in admin -------------------------------------
+
+def test_change_by_label_updates_only_that_field(admin_server, client):
+    admin_server.state.add(UNIT, PK, unit_name="Fractions", duration_in_sec="95")
+
+    result = client.change(change_url(admin_server, UNIT), labels={"Duration in sec:": ""})
+
+    assert admin_server.state.objects[UNIT][PK] == {"unit_name": "Fractions", "duration_in_sec": ""}
+    assert any("changed successfully" in text for _, text in result["messages"])
+    assert client.logins == 1
+
+
+def test_unknown_label_raises_unless_optional(admin_server, client):
+    admin_server.state.add(UNIT, PK)
+
+    with pytest.raises(admin_http.FormError, match="Duration in minutes"):
+        client.change(change_url(admin_server, UNIT), labels={"Duration in minutes": "1"})
+    assert admin_server.state.counters["saves"] == 0
+
+    result = client.change(change_url(admin_server, UNIT), values={"bogus": "1"},
+                           labels={"Duration in minutes": "1"}, required=False)
+    assert result["skipped"] == ["bogus"]
+    assert admin_server.state.counters["saves"] == 1
+
+
+def test_textarea_and_select_round_trip(admin_server, client):
+    admin_server.state.add(RESOURCE, PK, content="\nfirst line\n<b>a & b</b>", content_format="TEXT")
+
+    client.change(change_url(admin_server, RESOURCE), values={"content_en": "x < y\n"},
+                  labels={"Content format": "markdown"})
+
+    obj = admin_server.state.objects[RESOURCE][PK]
+    # Untouched textarea: only the newline Django adds after <textarea> is dropped.
+    assert obj["content"] == "\nfirst line\n<b>a & b</b>"
+    assert obj["content_en"] == "x < y\n"
+    # Select matched by option text, case-insensitively; untouched selects keep their value.
+    assert obj["content_format"] == "MARKDOWN"
+    assert obj["learning_resource_type"] == "PPT"
+
+
+def test_unknown_select_option_fails_before_posting(admin_server, client):
+    admin_server.state.add(RESOURCE, PK)
+
+    with pytest.raises(admin_http.FormError, match="no option 'DOCX'"):
+        client.change(change_url(admin_server, RESOURCE), values={"content_format": "DOCX"})
+    assert admin_server.state.counters["saves"] == 0
+
+
+def test_missing_object_raises_not_found(admin_server, client):
+    with pytest.raises(admin_http.NotFound) as exc:
+        client.change(change_url(admin_server, UNIT, "no-such-pk"), values={"duration_in_sec": ""})
+    assert exc.value.status == 404
+
+
+def test_validation_errors_raise_change_rejected(admin_server, client):
+    admin_server.state.add(UNIT, PK, duration_in_sec="95")
+
+    with pytest.raises(admin_http.ChangeRejected) as exc:
+        client.change(change_url(admin_server, UNIT), values={"duration_in_sec": "ninety"})
+    assert "Enter a whole number." in exc.value.errors
+    assert admin_server.state.objects[UNIT][PK]["duration_in_sec"] == "95"
+
+    with pytest.raises(admin_http.ChangeRejected, match="Enter a valid JSON"):
+        client.change(f"{admin_server.base_url}/admin/nkb_load_data/contentloading/add/",
+                      values={"input_data": "{not json"})
+
+
+def test_changelist_pages_cover_every_row(admin_server, client):
+    admin_server.state.list_per_page = 2
+    admin_server.state.seed(5)
+
+    first = client.changelist(f"{admin_server.base_url}/admin/{UNIT}/")
+    assert len(first["pages"]) == 2
+    names = list(first["columns"]["field-unit_name"])
+    for url in first["pages"]:
+        names += client.changelist(url)["columns"]["field-unit_name"]
+    assert len(names) == 5
+
+
+# -- serialisation of widgets the stand-in admin does not render ----------------
+
+FORM = """<html><body>
+<form action="" method="post" id="thing_form">
+<input type="hidden" name="csrfmiddlewaretoken" value="tok">
+<label for="id_active">Active:</label><input type="checkbox" name="active" id="id_active" checked>
+<label for="id_archived">Archived:</label><input type="checkbox" name="archived" id="id_archived" value="yes">
+<label for="id_tags">Tags:</label>
+<select name="tags" id="id_tags" multiple>
+  <option value="1" selected>One</option><option value="2">Two</option><option value="3" selected>Three</option>
+</select>
+<select name="groups" multiple><option value="a">A</option></select>
+<select name="kind"><option value="x">X</option><option value="y">Y</option></select>
+<textarea name="notes">
+line one
+line two</textarea>
+<input type="submit" name="_save" value="Save">
+<input type="submit" name="_continue" value="Save and continue editing">
+</form></body></html>"""
+
+
+@pytest.fixture
+def form_server(runtime_dir):
+    """Serves FORM at /admin/app/thing/1/change/ and records each POST body as [(name, value)]."""
+    posts = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if "/change/" in self.path:
+                body = FORM.encode()
+            else:
+                body = b'<ul class="messagelist"><li class="success">Saved</li></ul>'
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            raw = self.rfile.read(int(self.headers["Content-Length"])).decode()
+            posts.append(parse_qsl(raw, keep_blank_values=True))
+            self.send_response(302)
+            self.send_header("Location", "/admin/app/thing/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    yield f"{base}/admin/app/thing/1/change/", admin_http.AdminClient(f"{base}/admin/login/", "u", "p"), posts
+    server.shutdown()
+    server.server_close()
+
+
+def test_untouched_form_posts_what_a_browser_would(form_server):
+    url, client, posts = form_server
+
+    client.change(url)
+
+    assert posts == [[("csrfmiddlewaretoken", "tok"), ("active", "on"), ("tags", "1"), ("tags", "3"),
+                      ("kind", "x"), ("notes", "line one\nline two"), ("_save", "Save")]]
+
+
+def test_checkboxes_and_selects_take_new_values(form_server):
+    url, client, posts = form_server
+
+    client.change(url, values={"active": False, "archived": True, "kind": "Y"}, labels={"Tags": "Two"},
+                  save="_continue")
+
+    sent = posts[0]
+    assert ("active", "on") not in sent
+    assert ("archived", "yes") in sent
+    assert [v for n, v in sent if n == "tags"] == ["2"]
+    assert ("kind", "y") in sent
+    assert sent[-1] == ("_continue", "Save")
+
+
+def test_page_parses_labels_and_form():
+    page = admin_http._AdminPage(FORM)
+    form = page.change_form()
+
+    assert page.labels == {"active": "id_active", "archived": "id_archived", "tags": "id_tags"}
+    assert form["checkboxes"] == {"active": "on", "archived": "yes"}
+    assert form["selects"]["tags"]["multiple"] and not form["selects"]["kind"]["multiple"]
+    assert "_save" not in form["names"]
+
+
+# -- pagination ----------------------------------------------------------------
+
+def _pages(urls):
+    return [parse_qs(urlsplit(u).query).get("p", [None])[0] for u in urls]
+
+
+def test_page_urls_one_based():
+    links = [("?q=ab&p=2", "2"), ("?q=ab&p=3", "3"), ("?q=ab&p=9", "9"), ("?q=ab&p=10", "10")]
+
+    urls = admin_http.page_urls("https://admin.example/admin/app/m/?q=ab", links)
+
+    assert _pages(urls) == [str(n) for n in range(2, 11)]
+    assert all(u.startswith("https://admin.example/admin/app/m/?q=ab&p=") for u in urls)
+
+
+def test_page_urls_zero_based():
+    # Older Django counts ?p= from 0: the link labelled "2" points at p=1.
+    links = [("?p=1", "2"), ("?p=2", "3"), ("?p=4", "5")]
+
+    assert _pages(admin_http.page_urls("https://admin.example/admin/app/m/", links)) == ["1", "2", "3", "4"]
+    # On page 2 (p=1) the current page is left out.
+    links = [("?p=0", "1"), ("?p=2", "3")]
+    assert _pages(admin_http.page_urls("https://admin.example/admin/app/m/?p=1", links)) == ["0", "2"]
+
+
+def test_page_urls_single_page():
+    assert admin_http.page_urls("https://admin.example/admin/app/m/", []) == []
+    assert admin_http.page_urls("https://admin.example/admin/app/m/", [("?o=1", "ID")]) == []
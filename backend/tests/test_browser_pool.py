@@ -0,0 +1,146 @@
+# backend/tests/test_browser_pool.py
+import asyncio
+
+import pytest
+
+from app.core.settings import settings
+from app.services import browser_pool
+
+
+class FakeProc:
+    returncode = None
+
+    def kill(self):
+        self.returncode = -9
+
+    async def wait(self):
+        return self.returncode
+
+
+@pytest.fixture
+def chrome(tmp_path, monkeypatch):
+    """PooledBrowser with Chrome stubbed out; records launches and resets per slot.
+
+    Slots in chrome.dead fail their health check; launching one revives it.
+    """
+    class Chrome:
+        launches = []
+        resets = []
+        dead = set()
+        checked_while_leased = []
+
+    async def launch(self, chrome_binary):
+        await self.kill()
+        self.proc = FakeProc()
+        self.port = 9200 + self.slot
+        self.leases = 0
+        Chrome.launches.append(self.slot)
+        Chrome.dead.discard(self.slot)
+
+    async def healthy(self):
+        Chrome.checked_while_leased.append(self.leased)
+        return self.alive and self.slot not in Chrome.dead
+
+    async def reset(self):
+        Chrome.resets.append(self.slot)
+
+    monkeypatch.setattr(browser_pool.PooledBrowser, "launch", launch)
+    monkeypatch.setattr(browser_pool.PooledBrowser, "healthy", healthy)
+    monkeypatch.setattr(browser_pool.PooledBrowser, "reset", reset)
+    monkeypatch.setattr(browser_pool, "find_chrome", lambda: "chrome")
+    monkeypatch.setattr(settings, "runtime_dir", tmp_path)
+    monkeypatch.setattr(settings, "browser_pool_size", 2)
+    monkeypatch.setattr(settings, "browser_max_jobs", 50)
+    monkeypatch.setattr(settings, "browser_health_interval_seconds", 3600)
+    return Chrome
+
+
+def run(coro_fn):
+    """Run coro_fn(pool) with a started pool, stopping it afterwards."""
+    async def main():
+        pool = browser_pool.BrowserPool()
+        await pool.start()
+        try:
+            return await coro_fn(pool)
+        finally:
+            await pool.stop()
+    return asyncio.run(main())
+
+
+def test_acquire_leases_each_browser_once(chrome):
+    async def go(pool):
+        first, second = pool.acquire(), pool.acquire()
+        assert {first.slot, second.slot} == {0, 1}
+        assert pool.acquire() is None
+        assert pool.stats() == {"size": 2, "in_use": 2, "idle": 0}
+
+        await pool.release(first)
+        assert pool.stats()["idle"] == 1
+        assert pool.acquire() is first and first.leases == 2
+
+    run(go)
+    assert chrome.launches == [0, 1]
+    assert chrome.resets == [0]
+
+
+def test_release_recycles_after_max_jobs(chrome, monkeypatch):
+    monkeypatch.setattr(settings, "browser_max_jobs", 2)
+
+    async def go(pool):
+        for _ in range(3):
+            b = pool.acquire()
+            assert b.slot == 0
+            await pool.release(b)
+
+    run(go)
+    # Reset after the first job, relaunched (leases back to 0) after the second.
+    assert chrome.launches == [0, 1, 0]
+    assert chrome.resets == [0, 0]
+
+
+def test_release_relaunches_an_unhealthy_or_unresettable_browser(chrome, monkeypatch):
+    async def go(pool):
+        b = pool.acquire()
+        chrome.dead.add(b.slot)
+        await pool.release(b)
+
+        async def broken_reset(self):
+            raise OSError("DevTools closed the connection")
+        monkeypatch.setattr(browser_pool.PooledBrowser, "reset", broken_reset)
+        b = pool.acquire()
+        await pool.release(b)
+        return b
+
+    b = run(go)
+    assert chrome.launches == [0, 1, 0, 0]
+    assert not b.leased
+
+
+def test_health_check_replaces_idle_unhealthy_browsers(chrome, monkeypatch):
+    monkeypatch.setattr(settings, "browser_health_interval_seconds", 0.01)
+
+    async def go(pool):
+        leased = pool.acquire()
+        chrome.dead.update({0, 1})
+        for _ in range(500):
+            if 1 not in chrome.dead:
+                break
+            await asyncio.sleep(0.01)
+        return leased
+
+    leased = run(go)
+    # The idle browser was relaunched; the leased one is left to its job.
+    assert leased.slot == 0 and 0 in chrome.dead
+    assert chrome.launches == [0, 1, 1]
+    # Browsers are out of rotation while the health check talks to them.
+    assert chrome.checked_while_leased and all(chrome.checked_while_leased)
+
+
+def test_pool_disabled_without_chrome(chrome, monkeypatch):
+    monkeypatch.setattr(browser_pool, "find_chrome", lambda: None)
+
+    async def go(pool):
+        return pool.enabled, pool.acquire()
+
+    assert run(go) == (False, None)
+    assert chrome.launches == []
@@ -0,0 +1,63 @@
+# backend/tests/test_chromedriver.py
+import os
+import stat
+import sys
+
+import pytest
+
+from app.core.settings import settings
+from app.services import chromedriver
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="fake drivers are shell scripts")
+
+
+def fake_driver(directory, version):
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / "chromedriver"
+    path.write_text(f"#!/bin/sh\necho 'ChromeDriver {version} (abc)'\n")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return path
+
+
+@pytest.fixture
+def chrome_131(tmp_path, monkeypatch):
+    """Chrome 131 installed, an empty PATH and webdriver_manager cache, no auto-install."""
+    monkeypatch.setattr(chromedriver, "_chrome_version", lambda: "131.0.6778.85")
+    monkeypatch.setattr(chromedriver, "_resolved", None)
+    monkeypatch.setattr(settings, "chromedriver_path", None)
+    monkeypatch.setattr(settings, "chromedriver_auto_install", False)
+    monkeypatch.setenv("PATH", str(tmp_path / "bin") + os.pathsep + "/bin:/usr/bin")
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    return tmp_path
+
+
+def test_pinned_driver_is_used_even_on_version_mismatch(chrome_131, monkeypatch):
+    fake_driver(chrome_131 / "bin", "131.0.6778.85")
+    pinned = fake_driver(chrome_131 / "pinned", "130.0.6723.58")
+    monkeypatch.setattr(settings, "chromedriver_path", str(pinned))
+
+    assert chromedriver.resolve() == pinned
+    assert chromedriver.driver_path() == pinned
+
+
+def test_unusable_pinned_driver_fails_startup(chrome_131, monkeypatch):
+    fake_driver(chrome_131 / "bin", "131.0.6778.85")
+    monkeypatch.setattr(settings, "chromedriver_path", str(chrome_131 / "missing" / "chromedriver"))
+
+    with pytest.raises(RuntimeError, match="chromedriver_path"):
+        chromedriver.resolve()
+
+
+def test_unpinned_lookup_skips_mismatched_drivers(chrome_131):
+    fake_driver(chrome_131 / "bin", "130.0.6723.58")
+    wdm = chrome_131 / "home" / ".wdm" / "drivers" / "chromedriver" / "linux64"
+    fake_driver(wdm / "129.0.6668.100" / "chromedriver-linux64", "129.0.6668.100")
+    match = fake_driver(wdm / "131.0.6778.85" / "chromedriver-linux64", "131.0.6778.85")
+
+    assert chromedriver.resolve() == match
+
+
+def test_no_matching_driver_leaves_scripts_to_resolve_their_own(chrome_131):
+    fake_driver(chrome_131 / "bin", "130.0.6723.58")
+
+    assert chromedriver.resolve() is None
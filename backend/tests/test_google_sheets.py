@@ -0,0 +1,87 @@
+# backend/tests/test_google_sheets.py
+import pytest
+
+import mock_sheets
+from toolkit import google_sheets
+
+SHEET = mock_sheets.DEMO_ID
+
+
+def sheet_url(server, sheet_id=SHEET):
+    return f"{server.base_url}/spreadsheets/d/{sheet_id}/edit?gid=0#gid=0"
+
+
+def test_read_info_from_the_editor_page(sheets_server):
+    sheets_server.state.add(SHEET, "Demo Content Sheet", ["Resources", "Units", "Questions"])
+
+    assert google_sheets.read_info(sheet_url(sheets_server)) == ("Demo Content Sheet", ["Resources", "Units", "Questions"])
+    assert sheets_server.state.counters["gets"] == 1
+
+
+def test_tabs_missing_from_the_editor_come_from_the_viewer(sheets_server):
+    sheets_server.state.add(SHEET, "Q & A <draft>", ["Sheet 1", "Sheet 2"], editor_tabs=False)
+
+    assert google_sheets.read_info(sheet_url(sheets_server)) == ("Q & A <draft>", ["Sheet 1", "Sheet 2"])
+    assert sheets_server.state.counters["gets"] == 2
+
+
+def test_sheet_not_shared_by_link_is_unavailable(sheets_server):
+    sheets_server.state.add(SHEET, "Private Sheet", ["Hidden"], public=False)
+
+    with pytest.raises(google_sheets.SheetUnavailable, match="sign-in required"):
+        google_sheets.read_info(sheet_url(sheets_server))
+    assert sheets_server.state.counters["signin"] == 1
+
+
+def test_missing_sheet_or_bad_url_is_unavailable(sheets_server):
+    with pytest.raises(google_sheets.SheetUnavailable, match="HTTP 404"):
+        google_sheets.read_info(sheet_url(sheets_server, "noSuchSheet"))
+    with pytest.raises(google_sheets.SheetUnavailable, match="Not a Google Sheets URL"):
+        google_sheets.read_info(f"{sheets_server.base_url}/document/d/{SHEET}/edit")
+
+
+def test_clean_title():
+    assert google_sheets.clean_title("  Demo\n Sheet - Google Sheets ") == "Demo Sheet"
+    assert google_sheets.clean_title("Demo - Google Drive") == "Demo"
+    assert google_sheets.clean_title("Demo") == "Demo"
+
+
+# -- sheet_loading: HTTP first, the browser only when the sheet is unavailable ----
+
+class BrowserStarted(Exception):
+    pass
+
+
+@pytest.fixture
+def sheet_loading(sheets_server, monkeypatch):
+    """sheet_loading with make_driver stubbed to stop the run at the first browser it starts."""
+    import sheet_loading
+
+    def make_driver(headless=False):
+        raise BrowserStarted()
+    monkeypatch.setattr(sheet_loading, "make_driver", make_driver)
+    return sheet_loading
+
+
+def test_link_shared_sheet_is_read_without_a_browser(sheets_server, sheet_loading, monkeypatch, capsys):
+    sheets_server.state.add(SHEET, "Demo Content Sheet", ["Resources", "Units"])
+    monkeypatch.setattr(sheet_loading, "GOOGLE_SHEET_URL", sheet_url(sheets_server))
+
+    with pytest.raises(BrowserStarted):     # the admin phase's browser
+        sheet_loading.run(headless=True)
+
+    out = capsys.readouterr().out
+    assert "Sheet not readable over HTTP" not in out
+    assert '"data_sets_to_be_loaded":["Resources","Units"]' in out
+
+
+def test_private_sheet_falls_back_to_the_browser(sheets_server, sheet_loading, monkeypatch, capsys):
+    sheets_server.state.add(SHEET, "Private Sheet", ["Hidden"], public=False)
+    monkeypatch.setattr(sheet_loading, "GOOGLE_SHEET_URL", sheet_url(sheets_server))
+
+    with pytest.raises(BrowserStarted):     # the sheet reader's browser
+        sheet_loading.run(headless=True)
+
+    out = capsys.readouterr().out
+    assert "Sheet not readable over HTTP" in out and "sign-in required" in out
+    assert "Payload to submit" not in out
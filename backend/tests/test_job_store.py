@@ -0,0 +1,87 @@
+# backend/tests/test_job_store.py
+import time
+
+import pytest
+
+from app.core.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def windows(monkeypatch):
+    monkeypatch.setattr(settings, "coalesce_window_seconds", 300.0)
+    monkeypatch.setattr(settings, "idempotency_key_ttl_seconds", 3600.0)
+
+
+def submit(store, job_id, script="s3_url_updater", inputs=None, key=None):
+    digest = store.inputs_digest(script, inputs or {"uuid_list": ["a", "b"]})
+    store.create(job_id, script, digest, 2, idempotency_key=key)
+    return digest
+
+
+def test_digest_ignores_surrounding_whitespace_and_key_order(job_store):
+    a = job_store.inputs_digest("tags", {"tags": [" T1 ", "T2"], "headless": True})
+    b = job_store.inputs_digest("tags", {"headless": True, "tags": ["T1", "T2\n"]})
+
+    assert a == b
+    assert a != job_store.inputs_digest("tags", {"tags": ["T1"], "headless": True})
+    assert a != job_store.inputs_digest("other", {"tags": ["T1", "T2"], "headless": True})
+
+
+@pytest.mark.parametrize("status", ["queued", "running"])
+def test_active_job_is_found_whatever_its_age(job_store, status):
+    digest = submit(job_store, "j1")
+    job_store.update("j1", status=status, created_at=time.time() - 10 * 3600)
+
+    assert job_store.find_duplicate("s3_url_updater", digest) == ("j1", status)
+
+
+def test_finished_job_coalesces_only_within_the_window(job_store):
+    digest = submit(job_store, "j1")
+    job_store.update("j1", status="finished", finished_at=time.time() - 299)
+    assert job_store.find_duplicate("s3_url_updater", digest) == ("j1", "finished")
+
+    job_store.update("j1", finished_at=time.time() - 301)
+    assert job_store.find_duplicate("s3_url_updater", digest) is None
+
+
+@pytest.mark.parametrize("status", ["failed", "timeout", "cancelled", "interrupted"])
+def test_unsuccessful_jobs_never_coalesce(job_store, status):
+    digest = submit(job_store, "j1")
+    job_store.update("j1", status=status, finished_at=time.time())
+
+    assert job_store.find_duplicate("s3_url_updater", digest) is None
+
+
+def test_newest_matching_job_wins(job_store):
+    digest = submit(job_store, "old")
+    job_store.update("old", status="finished", finished_at=time.time() - 60, created_at=time.time() - 120)
+    submit(job_store, "new")
+
+    assert job_store.find_duplicate("s3_url_updater", digest) == ("new", "queued")
+
+
+def test_coalesce_off_ignores_identical_inputs(job_store):
+    digest = submit(job_store, "j1")
+
+    assert job_store.find_duplicate("s3_url_updater", digest, coalesce=False) is None
+
+
+def test_idempotency_key_reuse_returns_the_first_job(job_store):
+    submit(job_store, "j1", key="req-42")
+    job_store.update("j1", status="failed", finished_at=time.time())
+    other = job_store.inputs_digest("s3_url_updater", {"uuid_list": ["c"]})
+
+    # Same key: the original job, even with different inputs, a failed status or coalescing off.
+    assert job_store.find_duplicate("s3_url_updater", other, "req-42") == ("j1", "failed")
+    assert job_store.find_duplicate("s3_url_updater", other, "req-42", coalesce=False) == ("j1", "failed")
+    # Keys are per script, and a new key is a new submission.
+    assert job_store.find_duplicate("tags", other, "req-42") is None
+    assert job_store.find_duplicate("s3_url_updater", other, "req-43") is None
+
+
+def test_idempotency_key_expires(job_store):
+    submit(job_store, "j1", key="req-42")
+    job_store.update("j1", created_at=time.time() - 3601)
+    other = job_store.inputs_digest("s3_url_updater", {"uuid_list": ["c"]})
+
+    assert job_store.find_duplicate("s3_url_updater", other, "req-42") is None
@@ -0,0 +1,106 @@
+# backend/tests/test_journal.py
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import job_store, journal, timings
+
+ITEMS = ["u1", "u2", "u3", "u4"]
+
+
+def record_items(job_id, results):
+    """Write item records for job_id as a script's spans would."""
+    path = timings.spans_path(job_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a", encoding="utf-8") as f:
+        for item, ok in results:
+            f.write(json.dumps({"phase": "item", "item": item, "ok": ok, "seconds": 0.1}) + "\n")
+
+
+def make_job(settings, job_id, status, inputs, results=()):
+    job_store.create(job_id, "duration_remover.py", job_store.inputs_digest("duration_remover.py", inputs), 4)
+    job_store.update(job_id, status=status)
+    job_dir = settings.runtime_dir / job_id
+    job_dir.mkdir(parents=True, exist_ok=True)
+    (job_dir / "params.json").write_text(json.dumps(inputs), encoding="utf-8")
+    (settings.outputs_dir / f"{job_id}.log").write_text("--- JOB\n", encoding="utf-8")
+    record_items(job_id, results)
+
+
+@pytest.mark.parametrize("entry, key", [
+    (" u1 ", "u1"),
+    ({"uuid": "u1", "new_ppt_url": "https://x"}, "u1"),
+    ({"multimedia_id": 42, "url": "https://x"}, "42"),
+    ({"tag": "TAG_1"}, "TAG_1"),
+    (["u1", "https://x"], "u1"),
+    ([], ""),
+    (None, ""),
+])
+def test_item_key(entry, key):
+    assert journal.item_key(entry) == key
+
+
+def test_state_splits_items_and_last_record_wins(backend):
+    # u2 failed, then succeeded on a retry; u3 failed; u4 never ran.
+    record_items("j1", [("u1", True), ("u2", False), ("u3", False), ("u2", True)])
+
+    split = journal.state("j1", ITEMS)
+
+    assert split == {"done": ["u1", "u2"], "failed": ["u3"], "pending": ["u4"]}
+    assert journal.summary(split) == {"done": 2, "failed": 1, "pending": 1}
+
+
+def test_state_matches_dict_rows(backend):
+    rows = [{"uuid": "a", "new_ppt_url": "x"}, {"uuid": "b", "new_ppt_url": "y"}]
+    record_items("j1", [("a", True)])
+
+    assert journal.state("j1", rows) == {"done": [rows[0]], "failed": [], "pending": [rows[1]]}
+
+
+@pytest.fixture
+def client(backend):
+    from app.main import app
+
+    backend.worker_count = 0     # resumed jobs stay queued where the test can read them
+    with TestClient(app) as client:
+        yield client
+
+
+def resumed_items(settings, response):
+    assert response.status_code == 200, response.text
+    body = response.json()
+    params = json.loads((settings.runtime_dir / body["job_id"] / "params.json").read_text())
+    return body, params["uuid_list"]
+
+
+def test_resume_reruns_pending_and_failed_items(backend, client):
+    make_job(backend, "src", "timeout", {"uuid_list": ITEMS, "headless": True},
+             [("u1", True), ("u3", False)])
+
+    body, items = resumed_items(backend, client.post("/tasks/src/resume"))
+
+    assert items == ["u2", "u3", "u4"]
+    assert body["resumed_from"] == "src" and body["status"] == "queued"
+    assert job_store.get(body["job_id"])["resumed_from"] == "src"
+    assert client.get("/tasks/src/journal").json() == {"done": 1, "failed": 1, "pending": 2}
+
+
+def test_resume_without_retry_failed_skips_failed_items(backend, client):
+    make_job(backend, "src", "failed", {"uuid_list": ITEMS}, [("u1", True), ("u3", False)])
+
+    _, items = resumed_items(backend, client.post("/tasks/src/resume", json={"retry_failed": False}))
+
+    assert items == ["u2", "u4"]
+
+
+def test_resume_refuses_active_finished_and_unknown_jobs(backend, client):
+    make_job(backend, "running", "running", {"uuid_list": ITEMS})
+    make_job(backend, "done", "failed", {"uuid_list": ITEMS}, [(u, True) for u in ITEMS])
+    make_job(backend, "failed-only", "failed", {"uuid_list": ITEMS}, [(u, u != "u2") for u in ITEMS])
+
+    assert client.post("/tasks/running/resume").status_code == 409
+    assert client.post("/tasks/done/resume").status_code == 400
+    assert client.post("/tasks/failed-only/resume", json={"retry_failed": False}).status_code == 400
+    assert client.post("/tasks/nope/resume").status_code == 404
+    assert client.post("/tasks/done/resume", json={"retry_failed": "yes"}).status_code == 400
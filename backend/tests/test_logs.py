@@ -0,0 +1,79 @@
+# backend/tests/test_logs.py
+import pytest
+
+from app.services import logs
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "job.log"
+
+    def write(data):
+        path.write_bytes(data.encode("utf-8") if isinstance(data, str) else data)
+        return path
+    return write
+
+
+@pytest.mark.parametrize("content, lines, expected", [
+    ("a\nb\nc\n", 2, "b\nc\n"),
+    ("a\nb\nc", 2, "b\nc"),           # last line still being written
+    ("a\nb\nc\n", 5, "a\nb\nc\n"),
+    ("a\nb\nc", 3, "a\nb\nc"),
+    ("a\nb\nc\n", 0, ""),
+    ("a\n\n", 1, "\n"),              # a blank last line is still a line
+    ("", 3, ""),
+])
+def test_read_tail(log_file, content, lines, expected):
+    path = log_file(content)
+
+    result = logs.read_tail(path, lines, 1024)
+
+    assert result["log"] == expected
+    assert result["offset"] == result["size"] == len(content)
+    assert result["more"] is False
+
+
+def test_read_tail_across_blocks(log_file):
+    content = "".join(f"line {n}\n" for n in range(5000))   # well over one 8 KiB block
+    path = log_file(content)
+
+    assert logs.read_tail(path, 3, 1 << 20)["log"] == "line 4997\nline 4998\nline 4999\n"
+    assert logs.read_tail(path, 3000, 1 << 20)["log"] == "".join(f"line {n}\n" for n in range(2000, 5000))
+
+
+def test_read_tail_is_bounded_by_max_bytes(log_file):
+    path = log_file("".join(f"line {n}\n" for n in range(100)))
+
+    result = logs.read_tail(path, 50, 40)
+
+    assert len(result["log"].encode()) <= 40
+    assert result["log"].endswith("line 98\nline 99\n")
+
+
+def test_read_since_pages_through_the_log(log_file):
+    path = log_file("first\nsecond\n")
+
+    first = logs.read_since(path, 0, 6)
+    assert first == {"log": "first\n", "offset": 6, "size": 13, "more": True}
+    rest = logs.read_since(path, first["offset"], 100)
+    assert rest == {"log": "second\n", "offset": 13, "size": 13, "more": False}
+    # An offset past the end (log rotated, client confused) reads nothing.
+    assert logs.read_since(path, 99, 100) == {"log": "", "offset": 13, "size": 13, "more": False}
+
+
+def test_read_since_keeps_a_cut_character_for_the_next_read(log_file):
+    path = log_file("hé✓")                 # 1 + 2 + 3 bytes
+
+    first = logs.read_since(path, 0, 2)     # ends inside "é"
+    assert (first["log"], first["offset"], first["more"]) == ("h", 1, True)
+    second = logs.read_since(path, first["offset"], 4)
+    assert (second["log"], second["offset"]) == ("é", 3)
+    third = logs.read_since(path, second["offset"], 4)
+    assert (third["log"], third["offset"], third["more"]) == ("✓", 6, False)
+
+
+def test_log_etag_differs_per_window(log_file):
+    st = log_file("a\n").stat()
+
+    assert logs.log_etag(st, "t100-100000-running") != logs.log_etag(st, "s0-100000-running")
+    assert logs.log_etag(st, "t100-100000-running") == logs.log_etag(st, "t100-100000-running")
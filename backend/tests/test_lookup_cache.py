@@ -0,0 +1,124 @@
+# backend/tests/test_lookup_cache.py
+import pytest
+
+import mock_admin
+from toolkit import lookup_cache, params
+
+ADMIN = "https://admin.example/admin/login/"
+
+
+class FakeTime:
+    """Stands in for the time module: time() returns now, which tests move forward."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(lookup_cache, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def open_cache(runtime_dir):
+    caches = []
+
+    def open_cache(admin_url=ADMIN, kind="questiontag", **kwargs):
+        cache = lookup_cache.LookupCache(admin_url, kind, **kwargs)
+        caches.append(cache)
+        return cache
+    yield open_cache
+    for cache in caches:
+        cache.close()
+
+
+def test_hit_within_the_ttl_and_miss_after_it(open_cache, clock):
+    cache = open_cache(ttl=60)
+    assert cache.get("TAG_1") is None
+
+    cache.put("TAG_1", ["q1", "q2"])
+    clock.now += 60
+    assert cache.get("TAG_1") == ["q1", "q2"]
+    clock.now += 1
+    assert cache.get("TAG_1") is None
+
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_force_refresh_skips_cached_answers_but_stores_fresh_ones(open_cache, clock):
+    open_cache(ttl=60).put("TAG_1", ["old"])
+
+    refreshing = open_cache(ttl=60, force_refresh=True)
+    assert refreshing.get("TAG_1") is None
+    refreshing.put("TAG_1", ["new"])
+
+    assert open_cache(ttl=60).get("TAG_1") == ["new"]
+
+
+def test_zero_ttl_never_answers_from_the_cache(open_cache, clock):
+    cache = open_cache(ttl=0)
+    cache.put("TAG_1", [])
+
+    assert cache.get("TAG_1") is None
+
+
+def test_ttl_and_refresh_come_from_the_job_params(open_cache, monkeypatch):
+    assert (open_cache().ttl, open_cache().force_refresh) == (lookup_cache.DEFAULT_TTL_SECONDS, False)
+
+    monkeypatch.setattr(params, "_params", {"cache_ttl_seconds": 30, "force_refresh": True})
+
+    cache = open_cache()
+    assert (cache.ttl, cache.force_refresh) == (30.0, True)
+
+
+def test_entries_are_per_environment_and_kind(open_cache, clock):
+    open_cache().put("TAG_1", ["prod"])
+
+    assert open_cache("https://staging.example/admin/login/").get("TAG_1") is None
+    assert open_cache(kind="unit").get("TAG_1") is None
+    assert open_cache().get("TAG_1") == ["prod"]
+
+
+def test_invalidate_one_key_or_the_whole_kind(open_cache, clock):
+    cache = open_cache()
+    for tag in ("TAG_1", "TAG_2", "TAG_3"):
+        cache.put(tag, [tag])
+
+    cache.invalidate("TAG_1")
+    assert [cache.get(t) for t in ("TAG_1", "TAG_2")] == [None, ["TAG_2"]]
+    cache.invalidate()
+    assert cache.get("TAG_3") is None
+
+
+# -- getting_question_ids_for_tags: a repeated tag is answered from the cache ------
+
+def test_repeated_tag_lookup_skips_the_admin(admin_server, monkeypatch, tmp_path):
+    import getting_question_ids_for_tags as tags_script
+
+    admin_server.state.seed(20)     # TAG_0 .. TAG_9, two questions each
+    monkeypatch.setattr(tags_script, "LOGIN_URL", f"{admin_server.base_url}/admin/login/")
+    monkeypatch.setattr(tags_script, "TARGET_URL", f"{admin_server.base_url}/admin/nkb_question/questiontag/?q={{}}")
+    monkeypatch.setattr(tags_script, "OUTPUT_FILE_PATH", str(tmp_path / "question_ids.txt"))
+    credentials = (mock_admin.USERNAME, mock_admin.PASSWORD)
+
+    def lookup(job_id):
+        tags_script.jobs[job_id] = tags_script.Job()
+        try:
+            tags_script.selenium_worker(job_id, ["TAG_3"], True, credentials)
+            return tags_script.jobs[job_id].log
+        finally:
+            del tags_script.jobs[job_id]
+
+    first = lookup("first")
+    gets = admin_server.state.counters["gets"]
+    second = lookup("second")
+
+    assert "Cache: 0 hits, 1 misses" in first and "Cache: 1 hits, 0 misses" in second
+    assert "2 unique IDs across 1 tags" in second
+    assert admin_server.state.counters["gets"] == gets
+    assert (tmp_path / "question_ids.txt").read_text().count("\n") == 2
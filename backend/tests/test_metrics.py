@@ -0,0 +1,106 @@
+# backend/tests/test_metrics.py
+import re
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services import metrics
+
+# A job that logged in once, reused a cached session once and did two items, one failed.
+SPANS_SCRIPT = """\
+import json, os
+with open(os.environ["OPSHUB_SPANS"], "a") as f:
+    for phase, ok in (("login", True), ("login_reused", True), ("item", True), ("item", False)):
+        f.write(json.dumps({"phase": phase, "seconds": 0.1, "ok": ok}) + "\\n")
+"""
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch):
+    """Counters live for the process: start each test from zero."""
+    for name in ("_job_duration", "_jobs_finished", "_items", "_logins", "_login_reuse"):
+        monkeypatch.setattr(metrics, name, {})
+    monkeypatch.setattr(metrics, "_loop_lag", metrics._Histogram(metrics.LOOP_LAG_BUCKETS))
+    monkeypatch.setattr(metrics, "_loop_lag_last", 0.0)
+
+
+def sample(text, name, **labels):
+    """Value of one series in an exposition, or None."""
+    want = "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}" if labels else ""
+    for line in text.splitlines():
+        if line.startswith(name + want + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = metrics._Histogram((0.1, 1))
+    for value in (0.05, 0.5, 5):
+        hist.observe(value)
+    out = []
+
+    metrics._histogram(out, "lag", hist)
+
+    assert out == ['lag_bucket{le="0.1"} 1', 'lag_bucket{le="1.0"} 2', 'lag_bucket{le="+Inf"} 3',
+                   "lag_sum 5.55", "lag_count 3"]
+
+
+def test_render_reports_jobs_queue_and_script_counters():
+    metrics.observe_job("duration_remover.py", "finished", 12.0, {
+        "items_done": 3, "items_failed": 1,
+        "phases": {"login": {"count": 1}, "login_reused": {"count": 2}}})
+    metrics.observe_job("duration_remover.py", "failed", 0.5)
+
+    text = metrics.render([("duration_remover.py", "finished", 4)], 2, 100, 3, {"in_use": 1, "idle": 2})
+
+    task = "duration_remover.py"
+    assert sample(text, "opshub_jobs", task=task, status="finished") == 4
+    assert sample(text, "opshub_jobs_finished_total", task=task, status="failed") == 1
+    assert (sample(text, "opshub_queue_depth"), sample(text, "opshub_queue_capacity")) == (2, 100)
+    assert sample(text, "opshub_workers") == 3
+    assert sample(text, "opshub_job_duration_seconds_count", task=task) == 2
+    assert sample(text, "opshub_items_total", task=task, result="ok") == 3
+    assert sample(text, "opshub_items_total", task=task, result="failed") == 1
+    assert sample(text, "opshub_admin_logins_total", task=task) == 1
+    assert sample(text, "opshub_admin_session_reuse_total", task=task) == 2
+    assert sample(text, "opshub_browser_pool_browsers", state="idle") == 2
+    # Every series is declared before it is used.
+    declared = set(re.findall(r"^# TYPE (\S+) ", text, re.M))
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            assert re.sub(r"(_bucket|_sum|_count)?[{ ].*", "", line) in declared
+
+
+def test_label_values_are_escaped():
+    assert metrics._labels(task='a"b\\c\nd') == '{task="a\\"b\\\\c\\nd"}'
+
+
+def test_metrics_endpoint_after_a_job(backend):
+    from app.main import app
+
+    (backend.originals_dir / "duration_remover.py").write_text(SPANS_SCRIPT)
+    backend.worker_count = 1
+    backend.loop_lag_interval_seconds = 0.01
+
+    with TestClient(app) as client:
+        job_id = client.post("/tasks/duration-remover", json={"uuids": ["a", "b"]}).json()["job_id"]
+        deadline = time.monotonic() + 20
+        while client.get(f"/tasks/{job_id}").json()["status"] != "finished":
+            assert time.monotonic() < deadline
+            time.sleep(0.05)
+        time.sleep(0.05)   # a few loop-lag samples
+        resp = client.get("/metrics")
+
+    assert resp.status_code == 200 and resp.headers["content-type"].startswith("text/plain")
+    text, task = resp.text, "duration_remover.py"
+    assert sample(text, "opshub_jobs", task=task, status="finished") == 1
+    assert sample(text, "opshub_jobs_finished_total", task=task, status="finished") == 1
+    assert (sample(text, "opshub_queue_depth"), sample(text, "opshub_workers")) == (0, 1)
+    assert sample(text, "opshub_queue_capacity") == backend.queue_max_size
+    assert sample(text, "opshub_items_total", task=task, result="ok") == 1
+    assert sample(text, "opshub_items_total", task=task, result="failed") == 1
+    assert sample(text, "opshub_admin_logins_total", task=task) == 1
+    assert sample(text, "opshub_admin_session_reuse_total", task=task) == 1
+    assert sample(text, "opshub_event_loop_lag_seconds_count") > 0
+    assert sample(text, "opshub_event_loop_lag_last_seconds") is not None
@@ -0,0 +1,43 @@
+# backend/tests/test_params.py
+import json
+
+import pytest
+
+from toolkit import params
+
+
+@pytest.fixture
+def job_params(tmp_path, monkeypatch, runtime_dir):
+    """Run as a backend job with the given params."""
+    monkeypatch.delenv(params.ADMIN_USERNAME_ENV, raising=False)
+    monkeypatch.delenv(params.ADMIN_PASSWORD_ENV, raising=False)
+
+    def use(values):
+        path = tmp_path / "params.json"
+        path.write_text(json.dumps(values), encoding="utf-8")
+        monkeypatch.setenv(params.PARAMS_ENV, str(path))
+        monkeypatch.setattr(params, "_params", None)
+    return use
+
+
+def test_credentials_come_from_the_environment(job_params, monkeypatch):
+    job_params({"uuid_list": []})
+    monkeypatch.setenv(params.ADMIN_PASSWORD_ENV, "from-env")
+
+    assert params.admin_credentials("content_loader") == ("content_loader", "from-env")
+    monkeypatch.setenv(params.ADMIN_USERNAME_ENV, "ops")
+    assert params.admin_credentials("content_loader") == ("ops", "from-env")
+
+
+def test_job_params_win_over_the_environment(job_params, monkeypatch):
+    job_params({"admin_username": "loader2", "admin_password": "from-params"})
+    monkeypatch.setenv(params.ADMIN_PASSWORD_ENV, "from-env")
+
+    assert params.admin_credentials("content_loader") == ("loader2", "from-params")
+
+
+def test_missing_password_is_an_error(job_params):
+    job_params({"uuid_list": []})
+
+    with pytest.raises(params.MissingCredentials, match=params.ADMIN_PASSWORD_ENV):
+        params.admin_credentials("content_loader")
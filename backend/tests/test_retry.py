@@ -0,0 +1,156 @@
+# backend/tests/test_retry.py
+import pytest
+import requests
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+from toolkit import admin_http, retry
+
+pytestmark = pytest.mark.usefixtures("runtime_dir")
+
+
+class FakeClock:
+    """Stands in for the time module: sleep() advances monotonic() and is recorded."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(retry, "time", fake)
+    return fake
+
+
+def _wrapped(cause):
+    try:
+        raise admin_http.FormError("POST failed") from cause
+    except admin_http.FormError as e:
+        return e
+
+
+@pytest.mark.parametrize("exc, kind", [
+    (TimeoutException("wait"), "timeout"),
+    (requests.Timeout("read"), "timeout"),
+    (requests.ConnectTimeout("connect"), "timeout"),
+    (StaleElementReferenceException("gone"), "stale"),
+    (admin_http.LoggedOut("login"), "logged_out"),
+    (admin_http.FormError("HTTP 502", 502), "server_error"),
+    (_wrapped(requests.ConnectionError("refused")), "connection"),
+    (admin_http.NotFound("HTTP 404", 404), None),
+    (admin_http.ChangeRejected("url", ["Enter a whole number."]), None),
+    (ValueError("bug"), None),
+])
+def test_classify(exc, kind):
+    assert retry.classify(exc) == kind
+
+
+def test_breaker_opens_then_half_open_probe_reopens_or_closes(clock):
+    log = []
+    breaker = retry.CircuitBreaker(failures=2, cooldown=10, max_trips=3, log=log.append)
+
+    breaker.record(False)
+    breaker.before()
+    assert clock.sleeps == []            # one failure: still closed
+
+    breaker.record(False)                # second in a row: opens for 10s
+    breaker.before()
+    assert clock.sleeps == [10]
+    assert breaker.trips == 1
+
+    breaker.record(False)                # the half-open probe failed: re-opens, cooldown doubled
+    breaker.before()
+    assert clock.sleeps == [10, 20]
+    assert breaker.trips == 2
+
+    breaker.record(True)                 # the next probe succeeded: closed again
+    assert (breaker.consecutive, breaker.trips) == (0, 0)
+    breaker.record(False)
+    breaker.before()
+    assert clock.sleeps == [10, 20]
+    assert len(log) == 2 and not breaker.stopped
+
+
+def test_breaker_gives_up_after_max_trips(clock):
+    breaker = retry.CircuitBreaker(failures=1, cooldown=5, max_trips=1, log=lambda line: None)
+
+    breaker.record(False)
+    breaker.before()
+    breaker.record(False)
+
+    with pytest.raises(retry.CircuitOpen):
+        breaker.before()
+    assert breaker.stopped
+    assert clock.sleeps == [5]
+
+
+def test_policy_retries_transient_errors(clock):
+    policy = retry.Policy(log=lambda line: None, attempts=3, backoff=2, max_backoff=30)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise admin_http.FormError("HTTP 503", 503)
+        return "saved"
+
+    assert policy.run(flaky, item="u1") == "saved"
+    assert policy.retries == 2
+    assert 1 <= clock.sleeps[0] <= 2 and 2 <= clock.sleeps[1] <= 4
+    assert policy.breaker.consecutive == 0
+
+
+def test_policy_does_not_retry_other_errors(clock):
+    policy = retry.Policy(log=lambda line: None)
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise admin_http.ChangeRejected("url", ["Enter a valid JSON."])
+
+    with pytest.raises(admin_http.ChangeRejected):
+        policy.run(broken)
+    assert len(calls) == 1 and clock.sleeps == []
+
+
+def test_policy_gives_up_after_attempts_and_relogs_in(clock):
+    logins = []
+    policy = retry.Policy(relogin=lambda: logins.append(1), log=lambda line: None, attempts=2)
+
+    def logged_out():
+        raise admin_http.LoggedOut("login page")
+
+    with pytest.raises(admin_http.LoggedOut):
+        policy.run(logged_out)
+    assert logins == [1]
+    # Session trouble is not the admin failing: the breaker is untouched.
+    assert policy.breaker.consecutive == 0
+
+
+def test_policy_stops_the_job_once_the_breaker_gives_up(clock):
+    policy = retry.Policy(log=lambda line: None, attempts=1, breaker_failures=1, breaker_trips=0)
+
+    def down():
+        raise admin_http.FormError("HTTP 500", 500)
+
+    with pytest.raises(admin_http.FormError):
+        policy.run(down, item="u1")
+    with pytest.raises(retry.CircuitOpen):
+        policy.run(down, item="u2")
+    assert policy.stopped
+
+
+def test_delay_is_capped_with_equal_jitter():
+    policy = retry.Policy(log=lambda line: None, backoff=1, max_backoff=4)
+
+    for _ in range(50):
+        assert 0.5 <= policy.delay(1) <= 1
+        assert 2 <= policy.delay(6) <= 4
@@ -0,0 +1,146 @@
+# backend/tests/test_runner.py
+import asyncio
+import os
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from conftest import wait_for_status
+from app.services import job_store, runner
+
+
+def run(coro_fn):
+    """Run coro_fn() with the job workers started around it."""
+    async def main():
+        await runner.start_workers()
+        try:
+            return await coro_fn()
+        finally:
+            await runner.stop_workers()
+    return asyncio.run(main())
+
+
+def test_workers_bound_concurrency(backend):
+    backend.worker_count = 2
+
+    async def go():
+        ids = []
+        for n in range(5):
+            job_id, _, status, coalesced = await runner.submit_job(
+                "duration_remover.py", {"uuid_list": [str(n)], "sleep": 0.4})
+            assert (status, coalesced) == ("queued", False)
+            ids.append(job_id)
+        return [(job_id, await wait_for_status(job_id)) for job_id in ids]
+
+    results = run(go)
+
+    assert [status for _, status in results] == ["finished"] * 5
+    spans = [(job_store.get(job_id)["started_at"], job_store.get(job_id)["finished_at"]) for job_id, _ in results]
+    overlap = max(sum(1 for s, f in spans if s <= t < f) for t, _ in spans)
+    assert overlap == 2
+    log = (backend.outputs_dir / f"{results[3][0]}.log").read_text()
+    assert "items: ['3']" in log and "status=finished" in log
+
+
+def test_full_queue_refuses_new_jobs_before_writing_them(backend):
+    backend.worker_count = 0
+    backend.queue_max_size = 2
+
+    async def go():
+        first = await runner.submit_job("duration_remover.py", {"uuid_list": ["a"]})
+        await runner.submit_job("duration_remover.py", {"uuid_list": ["b"]})
+        with pytest.raises(runner.QueueFull):
+            await runner.submit_job("duration_remover.py", {"uuid_list": ["c"]})
+        # A repeat of a waiting job still attaches to it.
+        again = await runner.submit_job("duration_remover.py", {"uuid_list": ["a"]})
+        return first, again, runner.queue_stats()
+
+    first, again, stats = run(go)
+
+    assert again[0] == first[0] and again[3] is True
+    assert stats["depth"] == 2
+    assert len(job_store.list_jobs()) == 2
+    assert len([p for p in backend.runtime_dir.iterdir() if (p / "params.json").exists()]) == 2
+
+
+def test_full_queue_answers_503_with_retry_after(backend):
+    from app.main import app
+
+    backend.worker_count = 0
+    backend.queue_max_size = 1
+
+    with TestClient(app) as client:
+        ok = client.post("/tasks/duration-remover", json={"uuids": ["a"]})
+        full = client.post("/tasks/duration-remover", json={"uuids": ["b"]})
+
+    assert ok.status_code == 200 and ok.json()["status"] == "queued"
+    assert full.status_code == 503
+    assert full.headers["Retry-After"] == str(backend.queue_full_retry_after_seconds)
+    assert "queue is full" in full.json()["detail"]
+
+
+def test_failing_script_is_recorded_as_failed(backend):
+    backend.worker_count = 1
+
+    async def go():
+        job_id, *_ = await runner.submit_job("duration_remover.py", {"uuid_list": ["x"], "exit": 3})
+        return job_id, await wait_for_status(job_id)
+
+    job_id, status = run(go)
+
+    assert status == "failed"
+    assert job_store.get(job_id)["exit_code"] == 3
+
+
+def test_restart_marks_unfinished_jobs_interrupted(backend):
+    for job_id, status in (("q", "queued"), ("r", "running"), ("f", "finished")):
+        job_store.create(job_id, "duration_remover.py", "digest-" + job_id, 1)
+        job_store.update(job_id, status=status)
+
+    async def nothing():
+        pass
+
+    run(nothing)
+
+    assert {j["job_id"]: j["status"] for j in job_store.list_jobs()} == {
+        "q": "interrupted", "r": "interrupted", "f": "finished"}
+    assert job_store.get("q")["finished_at"] is not None
+    assert job_store.get("f")["finished_at"] is None
+
+
+LEAKY_SCRIPT = """\
+import os, subprocess, sys, time
+child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+open(os.path.join(os.path.dirname(os.environ["OPSHUB_PARAMS"]), "child.pid"), "w").write(str(child.pid))
+time.sleep(60)
+"""
+
+
+def _alive(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            return "\nState:\tZ" not in f.read()
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_timeout_kills_what_a_cold_job_started(backend):
+    (backend.originals_dir / "leaky.py").write_text(LEAKY_SCRIPT)
+    backend.worker_count = 1
+    backend.script_timeout_seconds = 1
+
+    async def go():
+        job_id, *_ = await runner.submit_job("leaky.py", {"uuid_list": ["x"]})
+        return job_id, await wait_for_status(job_id)
+
+    job_id, status = run(go)
+
+    assert status == "timeout"
+    pid = int((backend.runtime_dir / job_id / "child.pid").read_text())
+    for _ in range(50):
+        if not _alive(pid):
+            break
+        time.sleep(0.05)
+    assert not _alive(pid)
@@ -0,0 +1,74 @@
+# backend/tests/test_stream.py
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Logs a line, then another half a second later, so the stream sees the job running.
+SLOW_SCRIPT = """\
+import time
+print("first", flush=True)
+time.sleep(0.5)
+print("second", flush=True)
+"""
+
+
+@pytest.fixture
+def client(backend):
+    from app.main import app
+
+    backend.worker_count = 1
+    with TestClient(app) as client:
+        yield client
+
+
+def read_events(client, job_id, **kwargs):
+    """[(event, data)] from the job's stream, up to and including "end"."""
+    events, event, data = [], None, None
+    with client.stream("GET", f"/tasks/{job_id}/stream", **kwargs) as resp:
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        for line in resp.iter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+            elif not line and event:
+                events.append((event, data))
+                if event == "end":
+                    break
+                event = data = None
+    return events
+
+
+def test_stream_pushes_log_and_status_until_the_job_ends(backend, client):
+    (backend.originals_dir / "duration_remover.py").write_text(SLOW_SCRIPT)
+    job_id = client.post("/tasks/duration-remover", json={"uuids": ["a"]}).json()["job_id"]
+
+    events = read_events(client, job_id)
+
+    kinds = [e for e, _ in events]
+    statuses = [d["status"] for e, d in events if e == "status"]
+    log = "".join(d["log"] for e, d in events if e == "log")
+    assert kinds[-1] == "end" and events[-1][1]["status"] == "finished"
+    assert "running" in statuses and statuses[-1] == "finished"
+    assert log.index("first\n") < log.index("second\n")
+    assert len([e for e in kinds if e == "log"]) >= 2
+    # Offsets only grow, and the end event reports how far the log was sent.
+    offsets = [d["offset"] for e, d in events if e == "log"]
+    assert offsets == sorted(offsets) and events[-1][1]["offset"] == offsets[-1]
+
+
+def test_reconnect_resumes_from_last_event_id(client):
+    job_id = client.post("/tasks/duration-remover", json={"uuids": ["a"]}).json()["job_id"]
+    first = read_events(client, job_id)
+    end = first[-1][1]["offset"]
+
+    again = read_events(client, job_id, headers={"Last-Event-ID": str(end)})
+
+    assert [e for e, _ in again] == ["status", "end"]
+    assert again[-1][1] == {"status": "finished", "offset": end}
+
+
+def test_stream_of_unknown_job_is_404(client):
+    assert client.get("/tasks/no-such-job/stream").status_code == 404
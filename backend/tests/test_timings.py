@@ -0,0 +1,86 @@
+# backend/tests/test_timings.py
+import asyncio
+import re
+
+import pytest
+
+from conftest import wait_for_status
+from app.services import job_store, runner, timings
+
+# Records spans the way toolkit.spans does: a login, then one item per UUID ("bad" fails).
+SPANS_SCRIPT = """\
+import json, os
+params = json.load(open(os.environ["OPSHUB_PARAMS"]))
+with open(os.environ["OPSHUB_SPANS"], "a") as f:
+    f.write(json.dumps({"phase": "login", "seconds": 0.5, "ok": True}) + "\\n")
+    for uid in params["uuid_list"]:
+        f.write(json.dumps({"phase": "item", "item": uid, "seconds": 0.1, "ok": uid != "bad"}) + "\\n")
+"""
+
+
+def record(phase, seconds, ok=True, **fields):
+    return {"phase": phase, "seconds": seconds, "ok": ok, **fields}
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    ([3.0], 95, 3.0),
+    ([1.0, 2.0, 3.0, 4.0], 50, 2.0),
+    ([1.0, 2.0, 3.0, 4.0], 95, 4.0),
+    ([float(n) for n in range(1, 101)], 95, 95.0),
+])
+def test_percentile_is_nearest_rank(values, pct, expected):
+    assert timings.percentile(values, pct) == expected
+
+
+def test_summary_aggregates_spans_per_phase():
+    records = [record("login", 0.5), record("login_reused", 0.01), record("login_reused", 0.02)]
+    records += [record("item", s, item=f"u{n}") for n, s in enumerate((0.1, 0.2, 0.3, 0.4))]
+    records.append(record("item", 1.0, ok=False, item="u4", error="TimeoutException"))
+
+    summary = timings.summarize(records, wall_seconds=2.0)
+
+    assert (summary["items_done"], summary["items_failed"], summary["items_per_sec"]) == (4, 1, 2.5)
+    assert list(summary["phases"]) == ["item", "login", "login_reused"]
+    assert summary["phases"]["item"] == {"count": 5, "failed": 1, "total": 2.0, "p50": 0.3, "p95": 1.0, "max": 1.0}
+    assert summary["phases"]["login_reused"]["count"] == 2
+
+
+def test_format_summary():
+    summary = timings.summarize([record("item", 0.25), record("item", 0.75, ok=False)], wall_seconds=4.0)
+
+    text = timings.format_summary(summary)
+
+    assert text.startswith("--- TIMINGS 1 items ok, 1 failed, 0.50 items/s over 4.0s\n")
+    assert "item" in text and "n=2" in text and "p95=0.750s" in text and "failed=1" in text
+
+
+def test_read_spans_skips_cut_lines(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    path.write_text('{"phase": "item", "ok": true}\n{"phase": "it', encoding="utf-8")
+
+    assert timings.read_spans(path) == [{"phase": "item", "ok": True}]
+    assert timings.read_spans(tmp_path / "missing.jsonl") == []
+
+
+@pytest.mark.parametrize("parallelism", [1, 2])
+def test_job_log_ends_with_the_summary_of_every_shard(backend, parallelism):
+    (backend.originals_dir / "duration_remover.py").write_text(SPANS_SCRIPT)
+    backend.worker_count = 1
+
+    async def go():
+        await runner.start_workers()
+        try:
+            job_id, *_ = await runner.submit_job(
+                "duration_remover.py", {"uuid_list": ["u1", "u2", "bad", "u3"]}, parallelism)
+            return job_id, await wait_for_status(job_id)
+        finally:
+            await runner.stop_workers()
+
+    job_id, status = asyncio.run(go())
+
+    assert status == "finished"
+    log = (backend.outputs_dir / f"{job_id}.log").read_text(encoding="utf-8")
+    assert "--- TIMINGS 3 items ok, 1 failed" in log
+    assert re.search(rf"^---\s+login\s+n={parallelism} ", log, re.M)
+    job = job_store.get(job_id)
+    assert (job["items_done"], job["items_failed"]) == (3, 1)
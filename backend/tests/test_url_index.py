@@ -0,0 +1,70 @@
+# backend/tests/test_url_index.py
+import pytest
+
+import mock_admin
+from toolkit import admin_http, url_index
+
+UNIT = "nkb_resources/unit"
+CHANGELIST = "https://admin.example/admin/nkb_resources/unit/"
+PK = "3f2b6a0e-0000-4000-8000-000000000001"
+
+
+@pytest.fixture
+def index(runtime_dir):
+    index = url_index.UrlIndex()
+    yield index
+    index.close()
+
+
+def test_lookup_counts_hits_and_misses(index):
+    assert index.get(CHANGELIST, PK) is None
+
+    index.put(CHANGELIST, PK, f"{CHANGELIST}{PK}/change/?_changelist_filters=q%3D{PK}")
+
+    # The search's filters are not part of the change URL.
+    assert index.get(CHANGELIST, PK) == f"{CHANGELIST}{PK}/change/"
+    assert index.get("https://admin.example/admin/other/model/", PK) is None
+    assert (index.hits, index.misses) == (1, 2)
+
+
+def test_forget_drops_a_stale_entry(index):
+    index.put(CHANGELIST, PK, f"{CHANGELIST}{PK}/change/")
+
+    index.forget(CHANGELIST, PK)
+
+    assert index.get(CHANGELIST, PK) is None
+    assert index.stale == 1
+
+
+def test_index_is_shared_through_the_runtime_dir(runtime_dir, index):
+    index.put(CHANGELIST, PK, f"{CHANGELIST}{PK}/change/")
+
+    later = url_index.UrlIndex()
+    try:
+        assert later.get(CHANGELIST, PK) == f"{CHANGELIST}{PK}/change/"
+    finally:
+        later.close()
+    assert url_index.default_path().parent == runtime_dir
+
+
+def test_index_built_from_searches_replaces_them(admin_server, index):
+    """The duration_remover pattern: search on a miss, then the index answers without one."""
+    admin_server.state.add(UNIT, PK, duration_in_sec="95")
+    client = admin_http.AdminClient(f"{admin_server.base_url}/admin/login/",
+                                    mock_admin.USERNAME, mock_admin.PASSWORD)
+    changelist = f"{admin_server.base_url}/admin/{UNIT}/"
+
+    def searches():
+        return sum(1 for _, path, query, status, *_ in admin_server.state.requests
+                   if path == f"/admin/{UNIT}/" and query.startswith("q=") and status == 200)
+
+    assert index.get(changelist, PK) is None
+    index.put(changelist, PK, client.find_change_url(changelist, PK))
+    assert searches() == 1
+
+    change_url = index.get(changelist, PK)
+    client.change(change_url, labels={"Duration in sec": ""})
+
+    assert change_url == f"{changelist}{PK}/change/"
+    assert admin_server.state.objects[UNIT][PK]["duration_in_sec"] == ""
+    assert searches() == 1